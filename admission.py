@@ -0,0 +1,171 @@
+"""
+admission.py — Admission Control for /chat
+-------------------------------------------
+When the model or SQLite slows down, every /chat request used to wait its
+turn, so every student got a slow reply. The controller tracks how many chat
+requests are in flight and how long they take, and turns that into a
+pressure: the largest of in-flight / ADMISSION_MAX_IN_FLIGHT, recent latency
+/ ADMISSION_TARGET_LATENCY_MS, and the age of the oldest running request /
+ADMISSION_TARGET_LATENCY_MS. The last one reacts as soon as requests start
+piling up behind a slow model, before any of them has finished. As pressure
+rises, work is given up in order of cost:
+
+- throttle_logins (ADMISSION_LOGIN_THROTTLE): PIN checks are the most
+  expensive step, so login attempts are asked to resend in a moment
+- degraded (ADMISSION_DEGRADE): questions are only answered if the fast
+  path, the linear tier or the prediction cache knows them, and student
+  records only from a warm session snapshot; anything else gets a
+  "try again shortly" reply instead of a model or SQLite call
+- shed (ADMISSION_MAX_IN_FLIGHT requests already running): the request is
+  refused with 503 and Retry-After. Slow replies alone never shed, since
+  degraded replies are cheap and keep most students answered.
+
+Every decision is counted (GET /stats/admission and chatbot_degraded_total
+in /metrics). Latency only counts requests that do their full work, leaves
+out logins (auth.py bounds PIN checks with its own pool), and decays with
+ADMISSION_LATENCY_HALF_LIFE, so the controller recovers by itself once the
+slowdown is over. Each worker process has its own counters.
+ADMISSION_MAX_IN_FLIGHT=0 turns admission control off.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "64"))
+ADMISSION_TARGET_LATENCY_MS = float(os.environ.get("ADMISSION_TARGET_LATENCY_MS", "500"))
+ADMISSION_LOGIN_THROTTLE = float(os.environ.get("ADMISSION_LOGIN_THROTTLE", "0.5"))
+ADMISSION_DEGRADE = float(os.environ.get("ADMISSION_DEGRADE", "0.8"))
+ADMISSION_LATENCY_HALF_LIFE = float(os.environ.get("ADMISSION_LATENCY_HALF_LIFE", "2"))
+ADMISSION_RETRY_AFTER_SECONDS = 1
+
+NORMAL, THROTTLE_LOGINS, DEGRADED, SHED = range(4)
+LEVEL_NAMES = ("normal", "throttle_logins", "degraded", "shed")
+DECISIONS = ("login_deferred", "lookup_deferred", "snapshot_reply", "faq_from_cache", "busy", "shed")
+
+BUSY_REPLY = "The chatbot is very busy right now. Please try again shortly."
+
+
+class Overloaded(Exception):
+    """Raised by admit() when a request is shed; the caller answers 503."""
+
+
+class Ticket:
+    """One admitted request: the level it runs at, and whether its time counts as recent latency."""
+
+    def __init__(self, controller, level):
+        self.controller = controller
+        self.level = level
+        self.track_latency = True
+
+    def record(self, decision):
+        """Counts a degradation decision taken for this request."""
+        self.track_latency = False
+        self.controller.record(decision)
+
+
+class AdmissionController:
+    """Thread-safe in-flight counter and latency estimate that decide each request's level."""
+
+    def __init__(self, max_in_flight=64, target_latency_ms=500.0, login_throttle=0.5, degrade=0.8,
+                 half_life_seconds=2.0):
+        self.enabled = max_in_flight > 0
+        self.max_in_flight = max_in_flight
+        self.target_seconds = target_latency_ms / 1000.0
+        self.login_throttle = login_throttle
+        self.degrade = degrade
+        self.half_life = half_life_seconds
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._running = {}  # Ticket -> start time, for the oldest running request
+        self._latency = 0.0
+        self._latency_at = time.monotonic()
+        self.levels = dict.fromkeys(LEVEL_NAMES, 0)
+        self.decisions = dict.fromkeys(DECISIONS, 0)
+        self._lock = threading.Lock()
+
+    def _recent_latency(self, now):
+        # Exponentially weighted, and fading towards zero while nothing completes
+        return self._latency * 0.5 ** ((now - self._latency_at) / self.half_life)
+
+    def _oldest_age(self, now):
+        started = [start for ticket, start in self._running.items() if ticket.track_latency]
+        return now - min(started) if started else 0.0
+
+    def _pressure(self, now):
+        latency = max(self._recent_latency(now), self._oldest_age(now))
+        return max(self.in_flight / self.max_in_flight, latency / self.target_seconds)
+
+    def _level(self, now):
+        if self.in_flight >= self.max_in_flight:
+            return SHED
+        pressure = self._pressure(now)
+        if pressure >= self.degrade:
+            return DEGRADED
+        if pressure >= self.login_throttle:
+            return THROTTLE_LOGINS
+        return NORMAL
+
+    @contextmanager
+    def admit(self):
+        """
+        Admits one request for the duration of the block and yields its
+        Ticket. Raises Overloaded instead when the request should be shed.
+        """
+        if not self.enabled:
+            yield Ticket(self, NORMAL)
+            return
+        with self._lock:
+            started = time.monotonic()
+            level = self._level(started)
+            self.levels[LEVEL_NAMES[level]] += 1
+            if level == SHED:
+                self.decisions["shed"] += 1
+            else:
+                ticket = Ticket(self, level)
+                self._running[ticket] = started
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        if level == SHED:
+            metrics.record_degradation("shed")
+            raise Overloaded()
+
+        try:
+            yield ticket
+        finally:
+            with self._lock:
+                del self._running[ticket]
+                self.in_flight -= 1
+                if ticket.track_latency:
+                    now = time.monotonic()
+                    self._latency = 0.8 * self._recent_latency(now) + 0.2 * (now - started)
+                    self._latency_at = now
+
+    def record(self, decision):
+        with self._lock:
+            self.decisions[decision] += 1
+        metrics.record_degradation(decision)
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "max_in_flight": self.max_in_flight,
+                "recent_latency_ms": round(self._recent_latency(now) * 1000, 2),
+                "target_latency_ms": self.target_seconds * 1000,
+                "pressure": round(self._pressure(now), 3) if self.enabled else 0.0,
+                "oldest_running_ms": round(self._oldest_age(now) * 1000, 2),
+                "level": LEVEL_NAMES[self._level(now)] if self.enabled else "normal",
+                "requests_by_level": dict(self.levels),
+                "decisions": dict(self.decisions),
+            }
+
+
+controller = AdmissionController(ADMISSION_MAX_IN_FLIGHT, ADMISSION_TARGET_LATENCY_MS, ADMISSION_LOGIN_THROTTLE,
+                                 ADMISSION_DEGRADE, ADMISSION_LATENCY_HALF_LIFE)
+admit = controller.admit
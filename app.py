@@ -1,8 +1,10 @@
 import os
-import sqlite3
+import json
+import atexit
+import secrets
 from dotenv import load_dotenv
-from werkzeug.security import check_password_hash
-from flask import Flask, render_template, request, jsonify, session
+from flask import (Flask, Response, render_template, request, jsonify, session, g, has_app_context,
+                   stream_with_context)
 # Load environment variables from .env file
 load_dotenv()
 
@@ -14,161 +16,547 @@ if not secret_key:
     raise RuntimeError("FLASK_SECRET_KEY is not set. Please add it to your .env file.")
 app.secret_key = secret_key
 
-# 1. Load AI model, tokenizer and intents from the shared predictor module
-from predictor import predict_intent, get_text_response, intents_data, CONFIDENCE_THRESHOLD
+# Conversation state lives in the signed session cookie unless SESSION_BACKEND
+# is memory or sqlite; then it stays on the server and the cookie only holds
+# a session id (see session_store.py).
+from session_store import create_session_interface
+server_sessions = create_session_interface()
+if server_sessions is not None:
+    app.session_interface = server_sessions
+
+# 1. AI model, tokenizer and intents come from the shared predictor module.
+# They load lazily on the first prediction; PREDICTOR_WARMUP=1 loads them on a
+# background thread at startup instead, and /ready reports when that is done.
+# PREDICTOR_WATCH_MODEL=1 hot-reloads the model bundle when train.py writes new
+# files; /admin/reload-model and /admin/rollback-model do the same on demand.
+from predictor import (predict_intent, get_text_response, requires_auth, get_batching_stats, get_cache_stats,
+                       is_ready, start_warmup, get_startup_report, CONFIDENCE_THRESHOLD,
+                       reload_model, rollback_model, get_model_versions, start_model_watcher,
+                       reset_served_version, served_version, get_fast_path_stats, get_cascade_stats,
+                       retrieve_intent, get_retrieval_stats, MODEL_UNAVAILABLE)
+
+if os.environ.get("PREDICTOR_WARMUP", "0") == "1":
+    start_warmup()
+if os.environ.get("PREDICTOR_WATCH_MODEL", "0") == "1":
+    start_model_watcher()
+
+# Stage timings and counters behind /metrics (see metrics.py)
+import metrics
+
+# Under overload /chat throttles logins, then answers only from caches, then
+# sheds requests with 503 (see admission.py)
+import admission
+from admission import admit, Overloaded, THROTTLE_LOGINS, DEGRADED
+
+# 2. Database Helper Functions
+# Connections come from a shared pool (see database.py). Each request borrows
+# one connection the first time it queries and hands it back on teardown.
+from database import pool as db_pool
+
+def get_db():
+    if 'db' not in g:
+        g.db = db_pool.acquire()
+    return g.db
+
+@app.teardown_appcontext
+def release_db(exception):
+    conn = g.pop('db', None)
+    if conn is not None:
+        db_pool.release(conn)
+
+atexit.register(db_pool.close_all)
 
-# 2. Database Helper Function
 def query_db(query, args=(), one=False):
-    conn = sqlite3.connect('university.db')
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    cur.execute(query, args)
-    rv = cur.fetchall()
-    conn.close()
+    with metrics.span("sqlite"):
+        if has_app_context():
+            rv = get_db().execute(query, args).fetchall()
+        else:
+            with db_pool.connection() as conn:
+                rv = conn.execute(query, args).fetchall()
     return (rv[0] if rv else None) if one else rv
 
+def execute_db(query, args=()):
+    # Single write statement, committed immediately
+    with metrics.span("sqlite"):
+        if has_app_context():
+            conn = get_db()
+            conn.execute(query, args)
+            conn.commit()
+        else:
+            with db_pool.connection() as conn:
+                conn.execute(query, args)
+                conn.commit()
+
 # 3. Action Handlers (The magic that talks to the database)
-def handle_database_action(action_tag, matric_no):
-    if action_tag == "check_fees":
-        finance = query_db('SELECT * FROM finances WHERE matric_no = ?', [matric_no], one=True)
-        if finance:
-            return (f"Your total billed fees are ₦{finance['total_billed']:,.2f}. "
-                    f"You have paid ₦{finance['amount_paid']:,.2f}. "
-                    f"Your outstanding balance is ₦{finance['balance']:,.2f}. "
-                    f"Clearance Status: {finance['clearance_status']}.")
-        return "I could not find a fee record for your account. Please visit the Bursary office."
-    
-    elif action_tag == "check_results":
-        result = query_db('SELECT * FROM results WHERE matric_no = ? ORDER BY session DESC LIMIT 1', [matric_no], one=True)
-        if result:
-            cgpa = result['cgpa']
-            if cgpa >= 4.5:
-                standing = "First Class 🏆"
-            elif cgpa >= 3.5:
-                standing = "Second Class Upper"
-            elif cgpa >= 2.4:
-                standing = "Second Class Lower"
-            elif cgpa >= 1.5:
-                standing = "Third Class"
-            else:
-                standing = "on Academic Probation ⚠️ — please see your academic advisor immediately"
-            return (f"For the {result['session']} {result['semester']}, your GPA was {result['gpa']}. "
-                    f"Your Cumulative CGPA is {cgpa} ({standing}).")
-        return "No result record found for your account. Please contact the Academic Affairs office."
-
-    elif action_tag == "check_accommodation":
-        hostel = query_db('SELECT * FROM accommodation WHERE matric_no = ?', [matric_no], one=True)
-        if hostel:
-            if hostel['status'] == 'Allocated':
-                return (f"Accommodation Status: Allocated ✅. "
-                        f"You are assigned to {hostel['hostel_name']}, {hostel['room_number']}.")
-            else:
-                return ("Accommodation Status: Not Allocated. "
-                        "You currently do not have a room on campus. "
-                        "Log into your student portal and apply under Student Services. "
-                        "Spaces are limited so apply as soon as possible.")
-        return "No accommodation record found. Please visit the Student Affairs office."
-
-    elif action_tag == "check_courses":
-        courses = query_db('SELECT * FROM course_registration WHERE matric_no = ?', [matric_no])
-        if courses:
-            course_list = ", ".join([c['course_code'] for c in courses])
-            total_units = sum([c['units'] for c in courses])
-            return (f"You are currently registered for {len(courses)} course(s): {course_list}. "
-                    f"Total units: {total_units}.")
-
-    elif action_tag == "check_payment_history":
-        payment = query_db('SELECT * FROM payments_history WHERE matric_no = ? ORDER BY date DESC LIMIT 1', [matric_no], one=True)
-        if payment:
-            return f"Your last transaction was on {payment['date']}. Amount: ₦{payment['amount']:,.2f} for {payment['payment_type']}. Receipt No: {payment['receipt_no']}. Status: {payment['status']}."
-
-    return "I couldn't find those specific records for your account. Please visit the admin office."
+# The first personal question of a session loads every record for the student
+# in one pass (see student_snapshot.py); follow-up questions are answered from
+# that snapshot until it expires or is invalidated.
+from student_snapshot import load_student_snapshot, iter_student_rows, store as snapshot_store
+
+def get_student_snapshot(matric_no, session_id=None):
+    snapshot = snapshot_store.get(session_id, matric_no) if session_id else None
+    if snapshot is None:
+        if has_app_context():
+            snapshot = load_student_snapshot(get_db(), matric_no)
+        else:
+            with db_pool.connection() as conn:
+                snapshot = load_student_snapshot(conn, matric_no)
+        if session_id:
+            snapshot_store.put(session_id, snapshot)
+    return snapshot
+
+def invalidate_student_snapshot(matric_no=None):
+    """Hook for the Bursary/Records offices: call after changing a student's data."""
+    return snapshot_store.invalidate(matric_no)
+
+# One reply builder per personal-data intent. Each takes the student's
+# snapshot and returns None when the records it needs are missing.
+def fees_reply(snapshot):
+    finance = snapshot['finance']
+    if finance:
+        return (f"Your total billed fees are ₦{finance['total_billed']:,.2f}. "
+                f"You have paid ₦{finance['amount_paid']:,.2f}. "
+                f"Your outstanding balance is ₦{finance['balance']:,.2f}. "
+                f"Clearance Status: {finance['clearance_status']}.")
+    return "I could not find a fee record for your account. Please visit the Bursary office."
+
+def results_reply(snapshot):
+    result = snapshot['latest_result']
+    if result:
+        cgpa = result['cgpa']
+        if cgpa >= 4.5:
+            standing = "First Class 🏆"
+        elif cgpa >= 3.5:
+            standing = "Second Class Upper"
+        elif cgpa >= 2.4:
+            standing = "Second Class Lower"
+        elif cgpa >= 1.5:
+            standing = "Third Class"
+        else:
+            standing = "on Academic Probation ⚠️ — please see your academic advisor immediately"
+        return (f"For the {result['session']} {result['semester']}, your GPA was {result['gpa']}. "
+                f"Your Cumulative CGPA is {cgpa} ({standing}).")
+    return "No result record found for your account. Please contact the Academic Affairs office."
+
+def accommodation_reply(snapshot):
+    hostel = snapshot['accommodation']
+    if hostel:
+        if hostel['status'] == 'Allocated':
+            return (f"Accommodation Status: Allocated ✅. "
+                    f"You are assigned to {hostel['hostel_name']}, {hostel['room_number']}.")
+        else:
+            return ("Accommodation Status: Not Allocated. "
+                    "You currently do not have a room on campus. "
+                    "Log into your student portal and apply under Student Services. "
+                    "Spaces are limited so apply as soon as possible.")
+    return "No accommodation record found. Please visit the Student Affairs office."
+
+def courses_reply(snapshot):
+    courses = snapshot['courses']
+    if courses:
+        course_list = ", ".join([c['course_code'] for c in courses])
+        total_units = sum([c['units'] for c in courses])
+        return (f"You are currently registered for {len(courses)} course(s): {course_list}. "
+                f"Total units: {total_units}.")
+    return None
+
+def payment_history_reply(snapshot):
+    payment = snapshot['latest_payment']
+    if payment:
+        return f"Your last transaction was on {payment['date']}. Amount: ₦{payment['amount']:,.2f} for {payment['payment_type']}. Receipt No: {payment['receipt_no']}. Status: {payment['status']}."
+    return None
+
+DATABASE_HANDLERS = {
+    "check_fees": fees_reply,
+    "check_results": results_reply,
+    "check_accommodation": accommodation_reply,
+    "check_courses": courses_reply,
+    "check_payment_history": payment_history_reply,
+}
+
+def handle_database_action(action_tag, matric_no, session_id=None):
+    handler = DATABASE_HANDLERS.get(action_tag)
+    with metrics.span("db_action"):
+        reply = handler(get_student_snapshot(matric_no, session_id)) if handler else None
+    return reply or "I couldn't find those specific records for your account. Please visit the admin office."
+
+# Streamed replies for /chat/stream. Full course lists and payment histories
+# are sent one line per row as the SQLite cursor reads them, after a first
+# line that goes out immediately.
+class StreamedReply:
+    """A reply whose first line is ready now and whose remaining lines come from lines()."""
+
+    def __init__(self, intro, lines):
+        self.intro = intro
+        self.lines = lines
+
+def stream_courses(matric_no):
+    count = units = 0
+    with db_pool.connection() as conn:
+        for row in iter_student_rows(conn, 'courses', matric_no):
+            count += 1
+            units += row['units']
+            yield (f"{row['course_code']}: {row['course_title']} "
+                   f"({row['units']} units, {row['session']} {row['semester']})")
+    if count:
+        yield f"Total: {count} course(s), {units} units."
+    else:
+        yield "You are not registered for any courses yet."
+
+def stream_payments(matric_no):
+    count = 0
+    with db_pool.connection() as conn:
+        for row in iter_student_rows(conn, 'payments', matric_no):
+            count += 1
+            yield (f"{row['date']}: ₦{row['amount']:,.2f} for {row['payment_type']}. "
+                   f"Receipt No: {row['receipt_no']}. Status: {row['status']}.")
+    if not count:
+        yield "No payments have been recorded for your account yet."
+
+STREAM_HANDLERS = {
+    "check_courses": ("Here are all your registered courses:", stream_courses),
+    "check_payment_history": ("Here is your payment history, newest first:", stream_payments),
+}
+
+def database_reply(action_tag, matric_no, session_id=None, stream=False):
+    """handle_database_action(), or a StreamedReply for long lists when the client can stream."""
+    if stream and action_tag in STREAM_HANDLERS:
+        intro, lines = STREAM_HANDLERS[action_tag]
+        return StreamedReply(intro, lambda: lines(matric_no))
+    return handle_database_action(action_tag, matric_no, session_id)
 
 # 4. Deep Learning Prediction Logic
-def get_bot_response(user_text):
+# PIN checks run on a bounded worker pool with per-matric and per-IP rate
+# limits (see auth.py), so a login storm cannot stall everyone else's chat.
+from auth import login_allowed, verify_pin, upgrade_pin_hash, AuthBusy
+
+def get_bot_response(user_text, client_ip=None, state=None, stream=False, ticket=None):
+    # state is the conversation's session mapping; Flask's session by default,
+    # a plain dict when called from the ASGI server (see asgi_app.py).
+    # stream=True lets long database replies come back as a StreamedReply.
+    # ticket is the admission.Ticket of this request; its level says how much
+    # work the server can afford right now.
+    if state is None:
+        state = session
+    level = ticket.level if ticket is not None else admission.NORMAL
+    # Until the model has loaded, slow replies mean a cold start, not overload
+    if ticket is not None and not is_ready():
+        ticket.track_latency = False
+
     if not user_text or not user_text.strip():
         return "Please enter a valid question."
 
     # --- SESSION MANAGEMENT: Check if the bot is currently waiting for login details ---
-    if session.get('awaiting_login'):
+    if state.get('awaiting_login'):
         # Expecting format: MatricNo, PIN (e.g., 22/03CYB059, 1234)
         parts = user_text.split(',')
         if len(parts) == 2:
             matric_no = parts[0].strip().upper()
             pin = parts[1].strip()
-            
+
+            # PIN checks are the most expensive step, so logins are the first to wait
+            if level >= THROTTLE_LOGINS:
+                ticket.record("login_deferred")
+                return "The login service is busy right now. Please send your details again in a moment."
+
+            # PIN checks have their own bounded pool (auth.py); their time is
+            # not a sign that the model or SQLite is slowing down
+            if ticket is not None:
+                ticket.track_latency = False
+
+            if not login_allowed(matric_no, client_ip):
+                metrics.record_auth_failure("rate_limited")
+                return "Too many login attempts. Please wait a few minutes and try again."
+
             student = query_db('SELECT * FROM students WHERE matric_no = ?', [matric_no], one=True)
-            if student and check_password_hash(student['pin_hash'], pin):
-                session['logged_in_user'] = matric_no
-                session['awaiting_login'] = False
-                pending_action = session.get('pending_action')
-                session.pop('pending_action', None)
+            try:
+                with metrics.span("verify_pin"):
+                    authenticated = bool(student) and verify_pin(student['pin_hash'], pin)
+            except AuthBusy:
+                metrics.record_auth_failure("busy")
+                return "The login service is busy right now. Please send your details again in a moment."
+
+            if authenticated:
+                # Upgrade hashes made under an older AUTH_HASH_METHOD policy, on
+                # the auth pool, after this reply has gone out
+                upgrade_pin_hash(student['pin_hash'], pin, lambda new_hash: execute_db(
+                    'UPDATE students SET pin_hash = ? WHERE matric_no = ?', [new_hash, matric_no]))
+
+                state['logged_in_user'] = matric_no
+                state['awaiting_login'] = False
+                # Fresh id for this login's server-side snapshot
+                state['sid'] = secrets.token_urlsafe(16)
+                pending_action = state.get('pending_action')
+                state.pop('pending_action', None)
                 
                 # Execute the database query they originally asked for
-                data_response = handle_database_action(pending_action, matric_no)
-                return (f"Login successful, {student['full_name']}. "
-                        f"[PROFILE: {matric_no} | {student['department']} | Level {student['level']}] "
-                        f"{data_response}")
+                data_response = database_reply(pending_action, matric_no, state['sid'], stream)
+                greeting = (f"Login successful, {student['full_name']}. "
+                            f"[PROFILE: {matric_no} | {student['department']} | Level {student['level']}] ")
+                if isinstance(data_response, StreamedReply):
+                    data_response.intro = greeting + data_response.intro
+                    return data_response
+                return greeting + data_response
             else:
+                metrics.record_auth_failure("wrong_pin" if student else "unknown_matric")
                 return "Authentication failed. Invalid Matric Number or PIN. Please try again or ask another question."
         else:
+            metrics.record_auth_failure("bad_format")
             return "Invalid format. Please provide your details exactly like this: MatricNumber, PIN (e.g., 22/03CYB059, 1234)"
 
     # --- NORMAL AI PREDICTION (via shared predictor module) ---
-    tag, confidence = predict_intent(user_text)
+    with metrics.span("predict"):
+        prediction = predict_intent(user_text, allow_model=level < DEGRADED)
+    if prediction is MODEL_UNAVAILABLE:
+        ticket.record("busy")
+        return admission.BUSY_REPLY
+    tag, confidence = prediction
+    metrics.record_intent(tag, confidence)
+
+    # Before asking the student to rephrase, look for the closest training
+    # patterns: answer if one is very close, otherwise suggest a few
+    suggestions = []
+    if tag and confidence <= CONFIDENCE_THRESHOLD:
+        if level >= DEGRADED:
+            # No retrieval under overload, and never act on an unsure intent
+            ticket.record("busy")
+            return admission.BUSY_REPLY
+        tag, suggestions = retrieve_intent(user_text)
 
-    if tag and confidence > CONFIDENCE_THRESHOLD:
-        # Check if this tag requires database authentication
-        if tag in ["check_fees", "check_results", "check_accommodation", "check_courses", "check_payment_history"]:
-            if 'logged_in_user' in session:
-                return handle_database_action(tag, session['logged_in_user'])
+    if tag:
+        # Check if this tag requires database authentication ("requires_auth" in intents.json)
+        if requires_auth(tag):
+            if 'logged_in_user' in state:
+                if level >= DEGRADED:
+                    # Only answer from a warm session snapshot; SQLite can wait
+                    if not snapshot_store.get(state.get('sid'), state['logged_in_user']):
+                        ticket.record("lookup_deferred")
+                        return "Your records are taking longer than usual to load. Please try again shortly."
+                    ticket.record("snapshot_reply")
+                    return handle_database_action(tag, state['logged_in_user'], state.get('sid'))
+                return database_reply(tag, state['logged_in_user'], state.get('sid'), stream)
             else:
-                session['awaiting_login'] = True
-                session['pending_action'] = tag
+                state['awaiting_login'] = True
+                state['pending_action'] = tag
                 return "🔒 This request requires authentication. Please enter your Matric Number and PIN separated by a comma (e.g., 22/03CYB059, 1234)."
 
         # Otherwise, return a standard text response
         response = get_text_response(tag)
         if response:
+            if level >= DEGRADED:
+                ticket.record("faq_from_cache")
             return response
 
+    metrics.record_fallback()
+    if suggestions:
+        return "I am not entirely sure about that. Did you mean:\n" + "\n".join(
+            f"• {pattern}" for _, _, pattern in suggestions)
     return "I am not entirely sure about that. Could you rephrase your question or contact the administrative office."
 
+LOGOUT_COMMANDS = ["logout", "log out", "sign out", "signout"]
+
+def log_out(state, not_logged_in_message):
+    """Clears the conversation state and returns the goodbye message."""
+    student_name = None
+    if 'logged_in_user' in state:
+        student = query_db('SELECT full_name FROM students WHERE matric_no = ?', [state['logged_in_user']], one=True)
+        if student:
+            student_name = student['full_name']
+    snapshot_store.discard(state.get('sid'))
+    state.clear()
+    return f"Goodbye, {student_name}! You have been logged out successfully." if student_name else not_logged_in_message
+
+def handle_chat_message(user_message, client_ip=None, state=None, stream=False, ticket=None):
+    """Everything /chat does for one message, shared by the Flask and ASGI servers."""
+    if state is None:
+        state = session
+
+    # Allow students to log out by typing a command mid-conversation
+    if user_message and user_message.strip().lower() in LOGOUT_COMMANDS:
+        return log_out(state, "You are not currently logged in.")
+
+    return get_bot_response(user_message, client_ip, state, stream, ticket)
+
+def chat_payload(user_message, client_ip=None, state=None, ticket=None):
+    """The JSON body of a /chat reply, tagged with the model version that served it."""
+    reset_served_version()
+    with metrics.request("chat") as details:
+        reply = handle_chat_message(user_message, client_ip, state, ticket=ticket)
+        details["model_version"] = served_version()
+    return {"reply": reply, "model_version": details["model_version"]}
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def chat_events(user_message, client_ip=None, state=None, ticket=None):
+    """
+    The Server-Sent Events of a /chat/stream reply: a 'message' event with the
+    reply (or its first line) straight away, one 'row' event per line of a
+    streamed database reply, then 'done' with the model version. The
+    conversation state is updated before this returns, so the session is
+    saved before the body starts streaming.
+    """
+    reset_served_version()
+    with metrics.request("chat_stream"):
+        reply = handle_chat_message(user_message, client_ip, state, stream=True, ticket=ticket)
+        model_version = served_version()
+
+    def events():
+        if not isinstance(reply, StreamedReply):
+            yield sse_event("message", {"text": reply})
+        else:
+            yield sse_event("message", {"text": reply.intro})
+            try:
+                for line in reply.lines():
+                    yield sse_event("row", {"text": line})
+            except Exception as exc:
+                print(f"⚠️  Streamed reply failed: {exc}")
+                yield sse_event("error", {"text": "Sorry, the rest of this answer could not be loaded. Please try again."})
+        yield sse_event("done", {"model_version": model_version})
+    return events()
+
+def admin_authorized():
+    # Admin endpoints are disabled unless ADMIN_TOKEN is set in .env.
+    admin_token = os.environ.get("ADMIN_TOKEN")
+    return bool(admin_token) and secrets.compare_digest(request.headers.get("X-Admin-Token", ""), admin_token)
+
 # 5. Web Routes
 @app.route("/")
 def home():
     # Clear session on page load so they have to log in again if they refresh
+    snapshot_store.discard(session.get('sid'))
     session.clear() 
     return render_template("index.html")
 
 @app.route("/logout", methods=["POST"])
 def logout():
-    student_name = None
-    if 'logged_in_user' in session:
-        student = query_db('SELECT full_name FROM students WHERE matric_no = ?', [session['logged_in_user']], one=True)
-        if student:
-            student_name = student['full_name']
-    session.clear()
-    message = f"Goodbye, {student_name}! You have been logged out successfully." if student_name else "You have been logged out."
-    return jsonify({"reply": message})
+    return jsonify({"reply": log_out(session, "You have been logged out.")})
+
+@app.errorhandler(Overloaded)
+def overloaded(exc):
+    # Shed by admission control: answer at once instead of queueing
+    return (jsonify({"reply": admission.BUSY_REPLY}), 503,
+            {"Retry-After": str(admission.ADMISSION_RETRY_AFTER_SECONDS)})
 
 @app.route("/chat", methods=["POST"])
 def chat():
     user_message = request.json.get("message")
+    with admit() as ticket:
+        return jsonify(chat_payload(user_message, request.remote_addr, session, ticket))
 
-    # Allow students to log out by typing a command mid-conversation
-    if user_message and user_message.strip().lower() in ["logout", "log out", "sign out", "signout"]:
-        student_name = None
-        if 'logged_in_user' in session:
-            student = query_db('SELECT full_name FROM students WHERE matric_no = ?', [session['logged_in_user']], one=True)
-            if student:
-                student_name = student['full_name']
-        session.clear()
-        message = f"Goodbye, {student_name}! You have been logged out successfully." if student_name else "You are not currently logged in."
-        return jsonify({"reply": message})
-
-    bot_reply = get_bot_response(user_message)
-    return jsonify({"reply": bot_reply})
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    # Same conversation as /chat, sent as Server-Sent Events so long replies
+    # start to appear before the last database row has been read
+    user_message = request.json.get("message")
+    with admit() as ticket:
+        events = chat_events(user_message, request.remote_addr, session, ticket)
+    return Response(stream_with_context(events), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/ready")
+def ready():
+    # Load balancer health check: only route /chat here once the model is hot.
+    # The first probe starts loading it, in case PREDICTOR_WARMUP=1 did not
+    if not is_ready():
+        start_warmup()
+    report = get_startup_report()
+    return jsonify(report), (200 if is_ready() else 503)
+
+@app.route("/admin/invalidate-snapshot", methods=["POST"])
+def invalidate_snapshot():
+    # Called by the Bursary/Records systems after they change a student's data.
+    if not admin_authorized():
+        return jsonify({"error": "Forbidden"}), 403
+    matric_no = (request.get_json(silent=True) or {}).get("matric_no")
+    removed = invalidate_student_snapshot(matric_no.strip().upper() if matric_no else None)
+    return jsonify({"invalidated": removed})
+
+@app.route("/admin/revoke-sessions", methods=["POST"])
+def revoke_sessions():
+    # Ends every chat session logged in as one student, e.g. after a PIN reset.
+    if not admin_authorized():
+        return jsonify({"error": "Forbidden"}), 403
+    if server_sessions is None:
+        return jsonify({"error": "Sessions are stored in cookies; set SESSION_BACKEND to memory or sqlite."}), 409
+    matric_no = (request.get_json(silent=True) or {}).get("matric_no")
+    if not matric_no:
+        return jsonify({"error": "matric_no is required."}), 400
+    matric_no = matric_no.strip().upper()
+    invalidate_student_snapshot(matric_no)
+    return jsonify({"revoked": server_sessions.backend.revoke_user(matric_no)})
+
+@app.route("/admin/reload-model", methods=["POST"])
+def reload_model_route():
+    # Loads and warms up the model files on disk, then swaps them in; chats
+    # already in progress finish on the old bundle.
+    if not admin_authorized():
+        return jsonify({"error": "Forbidden"}), 403
+    try:
+        old_version, new_version = reload_model()
+    except Exception as exc:
+        return jsonify({"error": f"Reload failed, still serving the old model: {exc}"}), 500
+    return jsonify({"previous": old_version, "current": new_version, "reloaded": old_version != new_version})
+
+@app.route("/admin/rollback-model", methods=["POST"])
+def rollback_model_route():
+    if not admin_authorized():
+        return jsonify({"error": "Forbidden"}), 403
+    swapped = rollback_model()
+    if swapped is None:
+        return jsonify({"error": "No previous model to roll back to."}), 409
+    return jsonify({"previous": swapped[0], "current": swapped[1]})
+
+@app.route("/stats/model")
+def model_stats():
+    # Which model bundle is serving, and which one a rollback would restore
+    return jsonify(get_model_versions())
+
+@app.route("/metrics")
+def prometheus_metrics():
+    # Scraped by Prometheus: stage histograms, intents, fallbacks and auth failures
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/stats/slow-requests")
+def slow_requests():
+    # Recent requests slower than METRICS_SLOW_MS, with a per-stage breakdown
+    return jsonify({"threshold_ms": metrics.SLOW_REQUEST_MS, "requests": metrics.registry.slow_requests()})
+
+@app.route("/stats/sessions")
+def session_stats():
+    # Live session count and expiry/revocation counters of the server-side store
+    return jsonify({"enabled": server_sessions is not None,
+                    "stats": server_sessions.backend.stats() if server_sessions is not None else None})
+
+@app.route("/stats/fast-path")
+def fast_path_stats():
+    # How many messages were answered from known phrases without the model
+    return jsonify({"enabled": get_fast_path_stats() is not None, "stats": get_fast_path_stats()})
+
+@app.route("/stats/cascade")
+def cascade_stats():
+    # How many predictions the linear tier answered and how many reached the model
+    return jsonify({"enabled": get_cascade_stats() is not None, "stats": get_cascade_stats()})
+
+@app.route("/stats/retrieval")
+def retrieval_stats():
+    # How often the nearest-pattern fallback answered, suggested or found nothing
+    return jsonify({"enabled": get_retrieval_stats() is not None, "stats": get_retrieval_stats()})
+
+@app.route("/stats/admission")
+def admission_stats():
+    # In-flight requests, recent latency, current level and degradation decisions
+    return jsonify({"enabled": admission.controller.enabled, "stats": admission.controller.stats()})
+
+@app.route("/stats/batching")
+def batching_stats():
+    # Queue depth and batch-size histograms for tuning PREDICTOR_BATCH_* settings
+    return jsonify({"enabled": get_batching_stats() is not None, "stats": get_batching_stats()})
+
+@app.route("/stats/cache")
+def cache_stats():
+    # Hit/miss/eviction counters of the prediction result cache
+    return jsonify({"enabled": get_cache_stats() is not None, "stats": get_cache_stats()})
 
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
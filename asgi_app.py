@@ -0,0 +1,171 @@
+"""
+asgi_app.py — Async (ASGI) Serving Mode
+----------------------------------------
+Serves /chat and /logout from an asyncio event loop, so one process can hold
+thousands of idle student connections open. The blocking parts of a chat
+turn (model prediction, PIN checks and SQLite queries) run on a thread pool,
+which keeps the event loop free to accept and answer other requests.
+
+Conversation state is read from and written to the same signed "session"
+cookie that app.py uses (or, with SESSION_BACKEND=memory/sqlite, the same
+server-side session store), so awaiting_login, pending_action and
+logged_in_user behave exactly as in the Flask server, and a browser can move
+between the two. Every other path (the chat page, /ready, /stats/...) is
+passed through to the Flask app.
+
+    uvicorn asgi_app:application --host 0.0.0.0 --port 8000
+
+Requires: pip install uvicorn asgiref
+"""
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+
+from asgiref.wsgi import WsgiToAsgi
+
+import admission
+from admission import admit, Overloaded
+from app import app as flask_app, chat_payload, log_out, server_sessions
+
+ASGI_EXECUTOR_THREADS = int(os.environ.get("ASGI_EXECUTOR_THREADS", "32"))
+
+_executor = ThreadPoolExecutor(max_workers=ASGI_EXECUTOR_THREADS, thread_name_prefix="asgi-chat")
+_serializer = flask_app.session_interface.get_signing_serializer(flask_app) if server_sessions is None else None
+_cookie_name = flask_app.config["SESSION_COOKIE_NAME"]
+_flask_fallback = WsgiToAsgi(flask_app)
+
+
+def session_cookie(headers):
+    raw = headers.get(b"cookie")
+    if not raw:
+        return None
+    cookie = SimpleCookie()
+    cookie.load(raw.decode("latin-1"))
+    morsel = cookie.get(_cookie_name)
+    return morsel.value if morsel is not None else None
+
+
+def load_session(headers):
+    """
+    Returns (session id, state): the conversation as a plain dict (empty if
+    missing, invalid or expired) and, for server-side sessions, the id it is
+    stored under.
+    """
+    value = session_cookie(headers)
+    if server_sessions is not None:
+        state = server_sessions.load(value)
+        return (value if state else None), state
+    if value is None:
+        return None, {}
+    try:
+        return None, dict(_serializer.loads(value))
+    except Exception:
+        return None, {}
+
+
+def save_session(sid, state, original_state):
+    """Stores a changed session; returns the Set-Cookie header to send, or None."""
+    if state == original_state:
+        return None
+    if server_sessions is not None:
+        new_sid = server_sessions.store(sid, state, original_state.get('logged_in_user'))
+        if new_sid == sid:
+            return None
+        return session_cookie_header(new_sid)
+    return session_cookie_header(_serializer.dumps(state) if state else None)
+
+
+def session_cookie_header(value):
+    """Builds the Set-Cookie header that stores the cookie value (or deletes it when None)."""
+    attributes = "Path=/; HttpOnly; SameSite=Lax"
+    if flask_app.config["SESSION_COOKIE_SECURE"]:
+        attributes += "; Secure"
+    if value is None:
+        return f"{_cookie_name}=; Expires=Thu, 01 Jan 1970 00:00:00 GMT; Max-Age=0; {attributes}"
+    return f"{_cookie_name}={value}; {attributes}"
+
+
+async def read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def send_json(send, payload, status=200, cookie=None, extra_headers=()):
+    headers = [(b"content-type", b"application/json")] + list(extra_headers)
+    if cookie is not None:
+        headers.append((b"set-cookie", cookie.encode("latin-1")))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": json.dumps(payload).encode("utf-8")})
+
+
+async def chat_endpoint(scope, receive, send, headers):
+    try:
+        user_message = json.loads(await read_body(receive) or b"{}").get("message")
+    except (ValueError, AttributeError):
+        await send_json(send, {"error": "Request body must be JSON."}, status=400)
+        return
+
+    client_ip = scope["client"][0] if scope.get("client") else None
+
+    def chat_turn(ticket):
+        # Session reads and writes may hit SQLite, so they run off the event loop too
+        sid, state = load_session(headers)
+        original_state = dict(state)
+        payload = chat_payload(user_message, client_ip, state, ticket)
+        return payload, save_session(sid, state, original_state)
+
+    # Admitted before the thread pool, so requests waiting for a thread count as in flight
+    loop = asyncio.get_running_loop()
+    try:
+        with admit() as ticket:
+            payload, cookie = await loop.run_in_executor(_executor, chat_turn, ticket)
+    except Overloaded:
+        retry_after = str(admission.ADMISSION_RETRY_AFTER_SECONDS).encode()
+        await send_json(send, {"reply": admission.BUSY_REPLY}, status=503, extra_headers=[(b"retry-after", retry_after)])
+        return
+    await send_json(send, payload, cookie=cookie)
+
+
+async def logout_endpoint(scope, receive, send, headers):
+    await read_body(receive)
+
+    def logout_turn():
+        sid, state = load_session(headers)
+        original_state = dict(state)
+        reply = log_out(state, "You have been logged out.")
+        return reply, save_session(sid, state, original_state)
+
+    loop = asyncio.get_running_loop()
+    reply, cookie = await loop.run_in_executor(_executor, logout_turn)
+    await send_json(send, {"reply": reply}, cookie=cookie)
+
+
+ROUTES = {
+    ("POST", "/chat"): chat_endpoint,
+    ("POST", "/logout"): logout_endpoint,
+}
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                _executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    endpoint = ROUTES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+    if endpoint is None:
+        await _flask_fallback(scope, receive, send)
+        return
+    await endpoint(scope, receive, send, dict(scope["headers"]))
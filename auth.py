@@ -0,0 +1,160 @@
+"""
+auth.py — Student PIN Verification
+-----------------------------------
+Checking a PIN hash is the most CPU-expensive thing a chat request does, and
+when results are released hundreds of students log in at once. This module:
+
+- runs hash checks on a small, bounded worker pool so a login storm cannot
+  take every CPU away from ordinary chat requests
+- rate-limits login attempts per matric number and per client IP
+- applies a configurable hash policy (AUTH_HASH_METHOD) and upgrades older
+  hashes after a successful login, on the same pool and without making the
+  student wait for it
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from werkzeug.security import check_password_hash, generate_password_hash
+
+import metrics
+
+# Any method string accepted by werkzeug, e.g. "scrypt" or "pbkdf2:sha256:600000"
+HASH_METHOD = os.environ.get("AUTH_HASH_METHOD", "scrypt")
+AUTH_WORKERS = int(os.environ.get("AUTH_WORKERS", "2"))
+AUTH_MAX_PENDING = int(os.environ.get("AUTH_MAX_PENDING", "64"))
+AUTH_TIMEOUT_SECONDS = float(os.environ.get("AUTH_TIMEOUT", "10"))
+
+# Login attempts allowed per sliding window
+MATRIC_ATTEMPTS = int(os.environ.get("AUTH_MATRIC_ATTEMPTS", "5"))
+MATRIC_WINDOW_SECONDS = float(os.environ.get("AUTH_MATRIC_WINDOW", "300"))
+IP_ATTEMPTS = int(os.environ.get("AUTH_IP_ATTEMPTS", "30"))
+IP_WINDOW_SECONDS = float(os.environ.get("AUTH_IP_WINDOW", "60"))
+
+
+class AuthBusy(Exception):
+    """Raised when too many PIN checks are already waiting for a worker."""
+
+
+class RateLimiter:
+    """Sliding-window limiter: at most max_attempts per key within window seconds."""
+
+    def __init__(self, max_attempts, window_seconds):
+        self.max_attempts = max_attempts
+        self.window = window_seconds
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + window_seconds
+
+    def allow(self, key):
+        """Records an attempt for key; returns False if the key is over its limit."""
+        now = time.monotonic()
+        cutoff = now - self.window
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(cutoff)
+                self._next_sweep = now + self.window
+            attempts = self._attempts.setdefault(key, deque())
+            while attempts and attempts[0] <= cutoff:
+                attempts.popleft()
+            if len(attempts) >= self.max_attempts:
+                return False
+            attempts.append(now)
+            return True
+
+    def reset(self, key):
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def _sweep(self, cutoff):
+        # Forget keys with no recent attempts so memory stays bounded
+        stale = [key for key, attempts in self._attempts.items()
+                 if not attempts or attempts[-1] <= cutoff]
+        for key in stale:
+            del self._attempts[key]
+
+
+matric_limiter = RateLimiter(MATRIC_ATTEMPTS, MATRIC_WINDOW_SECONDS)
+ip_limiter = RateLimiter(IP_ATTEMPTS, IP_WINDOW_SECONDS)
+
+_executor = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="auth")
+_pending = threading.BoundedSemaphore(AUTH_MAX_PENDING)
+_policy_prefix = None
+
+
+def login_allowed(matric_no, client_ip=None):
+    """Checks both rate limits. The IP limit is checked first so one client
+    cannot lock other students out by guessing their matric numbers."""
+    if client_ip and not ip_limiter.allow(client_ip):
+        return False
+    return matric_limiter.allow(matric_no)
+
+
+def _check(pin_hash, pin):
+    try:
+        return check_password_hash(pin_hash, pin)
+    finally:
+        _pending.release()
+
+
+def verify_pin(pin_hash, pin):
+    """
+    Checks pin against pin_hash on the auth worker pool and returns True or
+    False. Raises AuthBusy instead of queueing when the pool is saturated,
+    or when the check has not finished within AUTH_TIMEOUT.
+    """
+    if not _pending.acquire(blocking=False):
+        raise AuthBusy()
+    try:
+        future = _executor.submit(_check, pin_hash, pin)
+    except BaseException:
+        _pending.release()
+        raise
+    try:
+        return future.result(timeout=AUTH_TIMEOUT_SECONDS)
+    except FutureTimeout:
+        raise AuthBusy() from None
+
+
+def _upgrade(pin_hash, pin, save):
+    try:
+        with metrics.span("rehash"):
+            if needs_rehash(pin_hash):
+                save(hash_pin(pin))
+    except Exception as exc:
+        print(f"⚠️  PIN hash upgrade failed: {exc}")
+    finally:
+        _pending.release()
+
+
+def upgrade_pin_hash(pin_hash, pin, save):
+    """
+    After a successful login: if pin_hash was made under an older
+    AUTH_HASH_METHOD, re-hashes pin on the worker pool and passes the new hash
+    to save(). Returns at once; when the pool is saturated the upgrade is
+    left for the student's next login.
+    """
+    if not _pending.acquire(blocking=False):
+        return
+    try:
+        _executor.submit(_upgrade, pin_hash, pin, save)
+    except BaseException:
+        _pending.release()
+        raise
+
+
+def hash_pin(pin):
+    """Hashes a PIN with the configured AUTH_HASH_METHOD."""
+    return generate_password_hash(pin, method=HASH_METHOD)
+
+
+def needs_rehash(pin_hash):
+    """True if pin_hash was made with different settings from AUTH_HASH_METHOD."""
+    global _policy_prefix
+    if _policy_prefix is None:
+        # werkzeug expands defaults (e.g. "scrypt" -> "scrypt:32768:8:1"), so
+        # learn the canonical prefix from one throwaway hash.
+        _policy_prefix = hash_pin("").split("$", 1)[0]
+    return pin_hash.split("$", 1)[0] != _policy_prefix
@@ -0,0 +1,8 @@
+"""
+Performance benchmarks for the Al-Hikmah Admin Bot.
+
+Run each benchmark from the project root so the model, tokenizer and
+university.db paths resolve, e.g.:
+
+    python -m benchmarks.bench_db
+"""
@@ -0,0 +1,134 @@
+"""
+bench_async.py — Sync (Flask) vs Async (ASGI) Load Test
+--------------------------------------------------------
+Starts the threaded Flask server (app.py) and the ASGI server (asgi_app.py
+under uvicorn) one after the other, and replays the same multi-turn student
+conversations (greeting, fee question, login, results, logout) against each
+at several concurrency levels. Optionally holds a number of idle keep-alive
+connections open during the run, the way real browsers do.
+
+    python -m benchmarks.bench_async --levels 8 32 128 --idle 500
+
+Requires: pip install uvicorn asgiref
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from database import DB_PATH
+
+CONVERSATION = ["hi", "what is my fee balance", "{matric}, 1234", "show my results", "logout"]
+
+SERVERS = {
+    "flask-sync": lambda port: [sys.executable, "-c",
+                                f"from app import app; app.run(port={port}, threaded=True)"],
+    "asgi": lambda port: [sys.executable, "-m", "uvicorn", "asgi_app:application",
+                          "--port", str(port), "--log-level", "warning"],
+}
+
+
+def start_server(name, port):
+    env = dict(os.environ, PREDICTOR_WARMUP="1",
+               AUTH_MATRIC_ATTEMPTS="1000000", AUTH_IP_ATTEMPTS="1000000")
+    env.setdefault("ADMISSION_MAX_IN_FLIGHT", "0")
+    env.setdefault("FLASK_SECRET_KEY", "benchmark-only-secret")
+    proc = subprocess.Popen(SERVERS[name](port), env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/ready")
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            pass
+        time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError(f"{name} server did not become ready on port {port}")
+
+
+def run_conversation(port, matric_no):
+    """Plays one student conversation; returns the latency of every turn."""
+    cookie = None
+    latencies = []
+    for message in CONVERSATION:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        headers = {"Content-Type": "application/json"}
+        if cookie:
+            headers["Cookie"] = cookie
+        started = time.perf_counter()
+        conn.request("POST", "/chat", json.dumps({"message": message.format(matric=matric_no)}), headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - started)
+        set_cookie = response.getheader("Set-Cookie")
+        if set_cookie:
+            cookie = set_cookie.split(";", 1)[0]
+        conn.close()
+    return latencies
+
+
+def hold_idle_connections(port, count):
+    sockets = []
+    for _ in range(count):
+        try:
+            sockets.append(socket.create_connection(("127.0.0.1", port), timeout=5))
+        except OSError:
+            break
+    return sockets
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sync Flask server with the ASGI server.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[8, 32, 128],
+                        help="concurrent conversations per run")
+    parser.add_argument("--conversations", type=int, default=200, help="conversations per run")
+    parser.add_argument("--idle", type=int, default=0, help="idle connections held open during each run")
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    with sqlite3.connect(DB_PATH) as conn:
+        matric_numbers = [row[0] for row in conn.execute('SELECT matric_no FROM students')]
+
+    results = {}
+    for name in SERVERS:
+        proc = start_server(name, args.port)
+        try:
+            for level in args.levels:
+                idle = hold_idle_connections(args.port, args.idle)
+                started = time.perf_counter()
+                with ThreadPoolExecutor(level) as pool:
+                    turns = [t for conv in pool.map(
+                        lambda n: run_conversation(args.port, matric_numbers[n % len(matric_numbers)]),
+                        range(args.conversations)) for t in conv]
+                elapsed = time.perf_counter() - started
+                for sock in idle:
+                    sock.close()
+                results[(name, level)] = (len(turns) / elapsed, statistics.median(turns),
+                                          percentile(turns, 99), len(idle))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    print(f"{'server':<12}{'concurrency':>12}{'idle conns':>12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for (name, level), (rps, p50, p99, idle) in results.items():
+        print(f"{name:<12}{level:>12}{idle:>12}{rps:>10.1f}{p50 * 1000:>10.1f}{p99 * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+bench_db.py — Connection Pool vs Connect-Per-Query Benchmark
+-------------------------------------------------------------
+Replays the queries of an authenticated chat turn (login lookup followed by
+the fee and result lookups) from several threads, first opening a fresh
+connection for every query (the original app.query_db behaviour) and then
+using the pooled connections from database.py.
+
+    python -m benchmarks.bench_db --threads 8 --seconds 5
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import threading
+import time
+
+from database import ConnectionPool, DB_PATH
+
+TURN_QUERIES = (
+    'SELECT * FROM students WHERE matric_no = ?',
+    'SELECT * FROM finances WHERE matric_no = ?',
+    'SELECT * FROM results WHERE matric_no = ? ORDER BY session DESC LIMIT 1',
+)
+
+
+def connect_per_query(query, args):
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    cur.execute(query, args)
+    rv = cur.fetchall()
+    conn.close()
+    return rv
+
+
+def make_pooled_query(pool):
+    def pooled_query(query, args):
+        with pool.connection() as conn:
+            return conn.execute(query, args).fetchall()
+    return pooled_query
+
+
+def run_turns(query_func, matric_numbers, threads, seconds):
+    """Runs chat turns from several threads and returns (turns, latencies)."""
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        local = []
+        rng = random.Random()
+        while time.perf_counter() < deadline:
+            matric_no = rng.choice(matric_numbers)
+            started = time.perf_counter()
+            for query in TURN_QUERIES:
+                query_func(query, [matric_no])
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return latencies
+
+
+def report(label, latencies, seconds):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(f"  {label:<20} {len(latencies) / seconds:10.1f} turns/s "
+          f"{len(latencies) * len(TURN_QUERIES) / seconds:10.1f} queries/s "
+          f"p50 {statistics.median(latencies) * 1000:7.3f} ms  p95 {p95 * 1000:7.3f} ms")
+    return len(latencies) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with sqlite3.connect(DB_PATH) as conn:
+        matric_numbers = [row[0] for row in conn.execute('SELECT matric_no FROM students')]
+
+    print(f"Authenticated-turn benchmark: {args.threads} threads, {args.seconds:.0f}s per mode, "
+          f"{len(matric_numbers)} students")
+    baseline = report("connect-per-query",
+                      run_turns(connect_per_query, matric_numbers, args.threads, args.seconds),
+                      args.seconds)
+
+    pool = ConnectionPool(DB_PATH, max_idle=args.threads)
+    pooled = report("connection pool",
+                    run_turns(make_pooled_query(pool), matric_numbers, args.threads, args.seconds),
+                    args.seconds)
+    pool.close_all()
+
+    print(f"  Speed-up: {pooled / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+bench_latency.py — Latency Benchmark Suite
+-------------------------------------------
+Measures how fast the bot answers, layer by layer, so speed regressions show
+up the same way accuracy regressions do in evaluate.py:
+
+- micro:   sanitize_input, tokenization + padding, predict_intent (cached,
+           uncached and answered by the fast path), the nearest-pattern
+           search (real index and one grown to RETRIEVAL_SCALE_ROWS
+           patterns) and every handle_database_action branch (fresh
+           database read and session snapshot)
+- startup: model load time from get_startup_report()
+- chat:    multi-turn student sessions (greeting, fee question, login,
+           results, hostel, logout) replayed through the Flask test client
+           at several concurrency levels
+
+Every result has p50/p95/p99 latency in milliseconds and throughput per
+second, and is saved as JSON. Given a stored baseline, the run fails if any
+latency grew or throughput fell by more than --tolerance:
+
+    python -m benchmarks.bench_latency --output bench.json
+    python -m benchmarks.bench_latency --baseline benchmarks/baseline.json --tolerance 0.25
+    python -m benchmarks.bench_latency --layers micro --save-baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Sessions log in many times from one address; lift the limits so the
+# benchmark measures response time rather than rejected or deferred attempts.
+os.environ.setdefault("FLASK_SECRET_KEY", "benchmark-only-secret")
+os.environ.setdefault("AUTH_MATRIC_ATTEMPTS", "1000000")
+os.environ.setdefault("AUTH_IP_ATTEMPTS", "1000000")
+os.environ.setdefault("ADMISSION_MAX_IN_FLIGHT", "0")
+
+import app as chat_app  # noqa: E402
+import predictor  # noqa: E402
+from database import DB_PATH  # noqa: E402
+from pattern_index import PatternIndex, normalize_rows  # noqa: E402
+
+LAYERS = ("micro", "startup", "chat")
+CONVERSATION = ["hi", "what is my fee balance", "{matric}, 1234", "show my results",
+                "where is my hostel", "logout"]
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+RETRIEVAL_SCALE_ROWS = 10240  # size of the synthetic pattern index
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def summarize(latencies, elapsed=None):
+    """p50/p95/p99 in milliseconds plus throughput (operations per second)."""
+    elapsed = elapsed if elapsed is not None else sum(latencies)
+    return {
+        "samples": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def time_calls(func, inputs, repeat, before=None):
+    """Calls func(item) repeat times over inputs; returns the latencies."""
+    latencies = []
+    for _ in range(repeat):
+        for item in inputs:
+            if before is not None:
+                before()
+            started = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def load_phrases():
+    with open("test_intents.json") as file:
+        data = json.load(file)
+    return [pattern for intent in data['intents']
+            for pattern in intent.get('test_patterns', intent.get('patterns', []))]
+
+
+def load_matric_numbers(limit):
+    with sqlite3.connect(DB_PATH) as conn:
+        return [row[0] for row in conn.execute('SELECT matric_no FROM students LIMIT ?', (limit,))]
+
+
+# --------------------------------------------------------
+# Layers
+# --------------------------------------------------------
+def bench_micro(repeat, matric_numbers):
+    phrases = load_phrases()
+    bundle = predictor.current_bundle()
+    clean = [predictor.sanitize_input(text) for text in phrases]
+    results = {
+        "sanitize_input": summarize(time_calls(predictor.sanitize_input, phrases, repeat)),
+        "tokenize_pad": summarize(time_calls(lambda text: bundle.encode([text]), clean, repeat)),
+    }
+
+    # Uncached runs the model for every call; cached repeats a warmed phrase.
+    # The fast path is switched off for both and timed on its own afterwards
+    cache = predictor._cache
+    fast_path, bundle.fast_path = bundle.fast_path, None
+    results["predict_intent.uncached"] = summarize(time_calls(
+        predictor.predict_intent, phrases, repeat, before=cache.clear if cache is not None else None))
+    for text in phrases:
+        predictor.predict_intent(text)
+    results["predict_intent.cached"] = summarize(time_calls(predictor.predict_intent, phrases, repeat))
+    bundle.fast_path = fast_path
+    if fast_path is not None:
+        with open(predictor.INTENTS_PATH) as file:
+            patterns = [pattern for intent in json.load(file)['intents'] for pattern in intent['patterns']]
+        results["predict_intent.fast_path"] = summarize(time_calls(predictor.predict_intent, patterns, repeat))
+
+    # The search alone, on query embeddings computed up front
+    index = bundle.pattern_index
+    if index is not None:
+        queries = list(bundle.embed(bundle.encode(clean)))
+        results["pattern_index.search"] = summarize(time_calls(index.search, queries, repeat))
+        results[f"pattern_index.search.{RETRIEVAL_SCALE_ROWS // 1024}k"] = summarize(time_calls(
+            scaled_pattern_index(index, RETRIEVAL_SCALE_ROWS).search, queries, repeat))
+
+    # Each database branch, first straight from SQLite, then from a warm
+    # per-session snapshot as follow-up questions are answered
+    for tag in chat_app.DATABASE_HANDLERS:
+        results[f"db.{tag}"] = summarize(time_calls(
+            lambda matric_no: chat_app.handle_database_action(tag, matric_no), matric_numbers, repeat))
+        for matric_no in matric_numbers:
+            chat_app.handle_database_action(tag, matric_no, f"bench-{matric_no}")
+        results[f"db.{tag}.snapshot"] = summarize(time_calls(
+            lambda matric_no: chat_app.handle_database_action(tag, matric_no, f"bench-{matric_no}"),
+            matric_numbers, repeat))
+    return results
+
+
+def scaled_pattern_index(index, rows):
+    """The real index grown to `rows` patterns by jittering copies of each intent's rows."""
+    rng = np.random.default_rng(0)
+    copies = -(-rows // len(index))
+    order = np.repeat(np.arange(len(index)), copies)[:rows]
+    embeddings = np.asarray(index.embeddings)[order]
+    embeddings = normalize_rows(embeddings + rng.normal(0, 0.05, embeddings.shape).astype(np.float32))
+    return PatternIndex(embeddings, [index.tags[row] for row in order], [index.patterns[row] for row in order],
+                        [index.texts[row] for row in order], index.embedder_version)
+
+
+def bench_startup():
+    timings = predictor.get_startup_report()["timings"]
+    return {f"startup.{stage}": {"samples": 1, "p50_ms": round(seconds * 1000, 4),
+                                 "p95_ms": round(seconds * 1000, 4), "p99_ms": round(seconds * 1000, 4)}
+            for stage, seconds in timings.items() if stage in ("total_load", "model_load", "tokenizer_load")}
+
+
+def run_conversation(matric_no, n):
+    """Plays one student session through the Flask test client; returns per-turn latencies."""
+    client = chat_app.app.test_client()
+    client.environ_base["REMOTE_ADDR"] = f"10.1.{n // 250 % 250}.{n % 250}"
+    latencies = []
+    for message in CONVERSATION:
+        started = time.perf_counter()
+        response = client.post("/chat", json={"message": message.format(matric=matric_no)})
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(f"/chat returned {response.status_code} for {message!r}")
+    return latencies
+
+
+def bench_chat(levels, sessions, matric_numbers):
+    results = {}
+    for level in levels:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(level) as pool:
+            turns = [latency for conversation in pool.map(
+                run_conversation,
+                (matric_numbers[n % len(matric_numbers)] for n in range(sessions)),
+                range(sessions)) for latency in conversation]
+        results[f"chat.concurrency_{level}"] = summarize(turns, time.perf_counter() - started)
+    return results
+
+
+# --------------------------------------------------------
+# Baseline comparison
+# --------------------------------------------------------
+def compare(results, baseline, tolerance, min_delta_ms):
+    """
+    Returns a list of human-readable regressions against the baseline. A
+    latency only counts as slower if it grew by more than tolerance and by
+    more than min_delta_ms, so microsecond-scale timer noise is ignored.
+    """
+    def slower(before_ms, now_ms):
+        return now_ms > before_ms * (1 + tolerance) and now_ms - before_ms > min_delta_ms
+
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for key in LATENCY_KEYS:
+            if previous.get(key) is not None and slower(previous[key], current[key]):
+                regressions.append(f"{name} {key}: {previous[key]:.3f} -> {current[key]:.3f}")
+        # Throughput is compared as time per operation, under the same rules
+        before, now = previous.get("throughput_per_s"), current.get("throughput_per_s")
+        if before and now and slower(1000.0 / before, 1000.0 / now):
+            regressions.append(f"{name} throughput_per_s: {before:.1f} -> {now:.1f}")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'benchmark':<42}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>12}")
+    for name, row in results.items():
+        ops = f"{row['throughput_per_s']:.1f}" if "throughput_per_s" in row else "-"
+        print(f"{name:<42}{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}{ops:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency benchmarks for the predictor, database and /chat.")
+    parser.add_argument("--layers", nargs="+", choices=LAYERS, default=list(LAYERS))
+    parser.add_argument("--repeat", type=int, default=5, help="passes over the inputs for micro benchmarks")
+    parser.add_argument("--students", type=int, default=50, help="students used for database and chat runs")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32], help="chat concurrency levels")
+    parser.add_argument("--sessions", type=int, default=64, help="chat sessions per concurrency level")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown before a result counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=0.25,
+                        help="ignore latency increases smaller than this many milliseconds")
+    parser.add_argument("--save-baseline", metavar="PATH", help="also store this run as the new baseline")
+    args = parser.parse_args()
+
+    matric_numbers = load_matric_numbers(args.students)
+    predictor.ensure_loaded()
+
+    results = {}
+    if "micro" in args.layers:
+        results.update(bench_micro(args.repeat, matric_numbers))
+    if "startup" in args.layers:
+        results.update(bench_startup())
+    if "chat" in args.layers:
+        results.update(bench_chat(args.levels, args.sessions, matric_numbers))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "backend": predictor.PREDICTOR_BACKEND,
+            "model_version": predictor.current_bundle().version,
+            "batching": predictor.get_batching_stats() is not None,
+            "cache": predictor.get_cache_stats() is not None,
+        },
+        "results": results,
+    }
+    print_table(results)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as handle:
+                json.dump(report, handle, indent=2)
+            print(f"Saved results to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)["results"]
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%} of {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} of {args.baseline}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+bench_login.py — Simulated Login Storm
+---------------------------------------
+Many students log in at once (through the Flask test client, so sessions,
+rate limits and the database are all exercised) while other students keep
+chatting. Reports login throughput and p50/p99 latency, and the p99 latency
+of the ordinary chat messages sent during the storm.
+
+    python -m benchmarks.bench_login --logins 400 --concurrency 32
+    python -m benchmarks.bench_login --inline    # hash on the request thread, as before
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# The storm uses many matric numbers and IPs; lift the limits so that the
+# benchmark measures hashing cost rather than rejected or deferred attempts.
+os.environ.setdefault("FLASK_SECRET_KEY", "benchmark-only-secret")
+os.environ.setdefault("AUTH_MATRIC_ATTEMPTS", "1000000")
+os.environ.setdefault("AUTH_IP_ATTEMPTS", "1000000")
+os.environ.setdefault("ADMISSION_MAX_IN_FLIGHT", "0")
+
+import app as chat_app  # noqa: E402
+from database import DB_PATH  # noqa: E402
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def one_login(matric_no, n):
+    client = chat_app.app.test_client()
+    client.environ_base["REMOTE_ADDR"] = f"10.0.{n // 250}.{n % 250}"
+    client.post("/chat", json={"message": "what is my fee balance"})
+    started = time.perf_counter()
+    reply = client.post("/chat", json={"message": f"{matric_no}, 1234"}).json["reply"]
+    return time.perf_counter() - started, reply.startswith("Login successful")
+
+
+def chat_while(stop, latencies):
+    client = chat_app.app.test_client()
+    while not stop.is_set():
+        started = time.perf_counter()
+        client.post("/chat", json={"message": "hi"})
+        latencies.append(time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated login storm against the chat app.")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--chatters", type=int, default=4, help="threads sending ordinary messages")
+    parser.add_argument("--inline", action="store_true",
+                        help="check hashes on the request thread instead of the auth pool")
+    args = parser.parse_args()
+
+    if args.inline:
+        from werkzeug.security import check_password_hash
+        chat_app.verify_pin = check_password_hash
+
+    with sqlite3.connect(DB_PATH) as conn:
+        matric_numbers = [row[0] for row in conn.execute('SELECT matric_no FROM students')]
+
+    # Load the model and warm the prediction cache before timing anything
+    chat_app.app.test_client().post("/chat", json={"message": "hi"})
+
+    chat_latencies = []
+    stop = threading.Event()
+    chatters = [threading.Thread(target=chat_while, args=(stop, chat_latencies))
+                for _ in range(args.chatters)]
+    for t in chatters:
+        t.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(one_login,
+                                (matric_numbers[n % len(matric_numbers)] for n in range(args.logins)),
+                                range(args.logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for t in chatters:
+        t.join()
+
+    login_latencies = [latency for latency, _ in results]
+    succeeded = sum(ok for _, ok in results)
+    mode = "inline hashing" if args.inline else "auth worker pool"
+    print(f"Login storm: {args.logins} logins, {args.concurrency} concurrent, {mode}")
+    print(f"  Successful logins: {succeeded}/{args.logins}")
+    print(f"  Throughput:        {args.logins / elapsed:8.1f} logins/s")
+    print(f"  Login p50 / p99:   {statistics.median(login_latencies) * 1000:8.1f} / "
+          f"{percentile(login_latencies, 99) * 1000:8.1f} ms")
+    if chat_latencies:
+        print(f"  Chat p50 / p99:    {statistics.median(chat_latencies) * 1000:8.1f} / "
+              f"{percentile(chat_latencies, 99) * 1000:8.1f} ms  ({len(chat_latencies)} messages)")
+
+
+if __name__ == "__main__":
+    main()
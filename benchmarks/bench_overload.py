@@ -0,0 +1,259 @@
+"""
+bench_overload.py — Latency Beyond Capacity
+--------------------------------------------
+Starts the threaded Flask server (app.py) with a slowed-down model: every
+model call takes --model-delay-ms longer and only one runs at a time, as if
+inference shared a busy accelerator. It measures the server's capacity with
+a closed loop of --clients concurrent students, then offers --overload times
+that rate as an open loop, where requests go out on a fixed schedule whatever
+the server does, once with admission control off (ADMISSION_MAX_IN_FLIGHT=0)
+and once on. Latency is counted from the moment a request was due, so time
+spent waiting behind a slow server is included. The delay keeps the server,
+not the load generator, the bottleneck when both share a small machine.
+
+The traffic is a mix of known FAQ phrases (fast path), new phrasings that
+need the model, record lookups by logged-in students and logins. The report
+gives p50/p99 over all replies and over 200 replies only, the share shed
+with 503, goodput, and the admission controller's decisions.
+
+    PREDICTOR_BACKEND=numpy python -m benchmarks.bench_overload
+    PREDICTOR_BACKEND=numpy python -m benchmarks.bench_overload --overload 3 --seconds 20 --output overload.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from database import DB_PATH
+
+MIX = {"faq_known": 0.4, "faq_new": 0.4, "lookup": 0.15, "login": 0.05}
+LOOKUP_PHRASES = ["what is my fee balance", "What is my cumulative GPA?", "my hostel allocation",
+                  "List my courses", "show my payment history"]
+TIMEOUT_SECONDS = 30.0
+
+
+SLOW_MODEL = """
+import threading, time
+import predictor
+_predict, _one_at_a_time = predictor.ModelBundle.predict, threading.Lock()
+def predict(self, padded_batch):
+    with _one_at_a_time:
+        time.sleep({delay})
+        return _predict(self, padded_batch)
+predictor.ModelBundle.predict = predict
+from app import app
+app.run(port={port}, threaded=True)
+"""
+
+
+def start_server(port, max_in_flight, model_delay_ms):
+    env = dict(os.environ, PREDICTOR_WARMUP="1", ADMISSION_MAX_IN_FLIGHT=str(max_in_flight),
+               AUTH_MATRIC_ATTEMPTS="1000000", AUTH_IP_ATTEMPTS="1000000")
+    env.setdefault("FLASK_SECRET_KEY", "benchmark-only-secret")
+    command = [sys.executable, "-c", SLOW_MODEL.format(delay=model_delay_ms / 1000.0, port=port)]
+    proc = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            status, _, _ = request(port, "GET", "/ready")
+            if status == 200:
+                return proc
+        except OSError:
+            pass
+        time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError(f"app.py did not become ready on port {port}")
+
+
+def request(port, method, path, message=None, cookie=None):
+    """Returns (status, JSON body, session cookie)."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=TIMEOUT_SECONDS)
+    headers = {"Content-Type": "application/json"}
+    if cookie:
+        headers["Cookie"] = cookie
+    try:
+        conn.request(method, path, json.dumps({"message": message}) if message is not None else None, headers)
+        response = conn.getresponse()
+        body = response.read()
+        set_cookie = response.getheader("Set-Cookie")
+    finally:
+        conn.close()
+    return (response.status, json.loads(body) if body else None,
+            set_cookie.split(";", 1)[0] if set_cookie else cookie)
+
+
+class Traffic:
+    """Builds one request of each kind; logged-in sessions are prepared up front."""
+
+    def __init__(self, port, matric_numbers, sessions=32, seed=0):
+        self.port = port
+        self.random = random.Random(seed)
+        self.matric_numbers = matric_numbers
+        with open("intents.json") as file:
+            intents = json.load(file)['intents']
+        self.known = [pattern for intent in intents if not intent.get('requires_auth')
+                      for pattern in intent['patterns']]
+        self.words = sorted({word.strip("?.,!").lower() for pattern in self.known for word in pattern.split()})
+        self.cookies = []
+        for matric_no in matric_numbers[:sessions]:
+            _, _, cookie = request(port, "POST", "/chat", "what is my fee balance")
+            _, _, cookie = request(port, "POST", "/chat", f"{matric_no}, 1234", cookie)
+            self.cookies.append(cookie)
+        self._lock = threading.Lock()
+
+    def pick(self):
+        with self._lock:
+            kind = self.random.choices(list(MIX), weights=list(MIX.values()))[0]
+            if kind == "faq_known":
+                return kind, self.random.choice(self.known), None
+            if kind == "faq_new":
+                # A fresh word combination misses the fast path and the cache
+                return kind, " ".join(self.random.sample(self.words, self.random.randint(3, 6))), None
+            if kind == "lookup":
+                return kind, self.random.choice(LOOKUP_PHRASES), self.random.choice(self.cookies)
+            return kind, self.random.choice(self.matric_numbers), None
+
+    def send(self, kind, message, cookie):
+        """Returns the HTTP status of the timed request."""
+        if kind == "login":
+            # The prompt is cheap; the timed part is sending the credentials
+            status, _, cookie = request(self.port, "POST", "/chat", "what is my fee balance")
+            if status != 200:
+                return status
+            message = f"{message}, 1234"
+        status, _, _ = request(self.port, "POST", "/chat", message, cookie)
+        return status
+
+
+def measure_capacity(traffic, clients, seconds):
+    """Requests per second with `clients` students each waiting for the previous reply."""
+    deadline = time.perf_counter() + seconds
+    count = 0
+    lock = threading.Lock()
+
+    def client():
+        nonlocal count
+        sent = 0
+        while time.perf_counter() < deadline:
+            if traffic.send(*traffic.pick()) == 200:
+                sent += 1
+        with lock:
+            count += sent
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return count / (time.perf_counter() - started)
+
+
+def open_loop(traffic, rate, seconds, max_threads):
+    """Sends `rate` requests per second for `seconds`; returns (kind, status, latency) per request."""
+    results = []
+    lock = threading.Lock()
+
+    def one(due, kind, message, cookie):
+        try:
+            status = traffic.send(kind, message, cookie)
+        except OSError:
+            status = "error"
+        latency = time.perf_counter() - due
+        with lock:
+            results.append((kind, status, latency))
+
+    interval = 1.0 / rate
+    with ThreadPoolExecutor(max_threads) as pool:
+        started = time.perf_counter()
+        for n in range(int(rate * seconds)):
+            due = started + n * interval
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(one, due, *traffic.pick())
+    return results
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def summarize(results, seconds):
+    latencies = [latency for _, _, latency in results]
+    ok = [latency for _, status, latency in results if status == 200]
+    shed = sum(1 for _, status, _ in results if status == 503)
+    failed = len(results) - len(ok) - shed
+    return {
+        "requests": len(results),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "ok_p99_ms": round(percentile(ok, 99) * 1000, 1),
+        "shed_pct": round(100.0 * shed / len(results), 1) if results else 0.0,
+        "failed": failed,
+        "goodput_per_s": round(len(ok) / seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p99 latency of /chat at a multiple of its capacity.")
+    parser.add_argument("--overload", type=float, default=3.0, help="offered load as a multiple of capacity")
+    parser.add_argument("--seconds", type=float, default=15.0, help="length of each open-loop run")
+    parser.add_argument("--capacity-seconds", type=float, default=5.0)
+    parser.add_argument("--model-delay-ms", type=float, default=100.0,
+                        help="added to every model call, which also run one at a time")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent students when measuring capacity")
+    parser.add_argument("--max-in-flight", type=int,
+                        default=int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "64")) or 64,
+                        help="ADMISSION_MAX_IN_FLIGHT for the run with admission control")
+    parser.add_argument("--threads", type=int, default=512, help="client threads for the open loop")
+    parser.add_argument("--port", type=int, default=5077)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    with sqlite3.connect(DB_PATH) as conn:
+        matric_numbers = [row[0] for row in conn.execute('SELECT matric_no FROM students')]
+
+    results = {}
+    capacity = None
+    for mode, max_in_flight in (("off", 0), ("on", args.max_in_flight)):
+        proc = start_server(args.port, max_in_flight, args.model_delay_ms)
+        try:
+            traffic = Traffic(args.port, matric_numbers)
+            if capacity is None:
+                capacity = measure_capacity(traffic, args.clients, args.capacity_seconds)
+                print(f"Capacity: {capacity:.1f} req/s with {args.clients} closed-loop clients; "
+                      f"offering {capacity * args.overload:.1f} req/s.")
+            runs = open_loop(traffic, capacity * args.overload, args.seconds, args.threads)
+            results[mode] = summarize(runs, args.seconds)
+            _, admission, _ = request(args.port, "GET", "/stats/admission")
+            results[mode]["decisions"] = admission["stats"]["decisions"] if admission["enabled"] else {}
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    print(f"{'admission':<11}{'requests':>9}{'p50 ms':>9}{'p99 ms':>10}{'200 p99 ms':>12}"
+          f"{'shed %':>8}{'failed':>8}{'goodput/s':>11}")
+    for mode, row in results.items():
+        print(f"{mode:<11}{row['requests']:>9}{row['p50_ms']:>9.1f}{row['p99_ms']:>10.1f}{row['ok_p99_ms']:>12.1f}"
+              f"{row['shed_pct']:>8.1f}{row['failed']:>8}{row['goodput_per_s']:>11.1f}")
+    for mode, row in results.items():
+        if row["decisions"]:
+            print(f"decisions ({mode}): " + ", ".join(f"{name} {count}" for name, count in row["decisions"].items()))
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"capacity_per_s": capacity, "overload": args.overload, "results": results}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+bench_workers.py — Memory and Throughput per Worker Count
+----------------------------------------------------------
+Starts serve.py with 1, 2, 4, ... workers, sends chat traffic for a few
+seconds, then reads every worker's memory from /proc. RSS counts shared pages
+in full for every process. PSS splits each shared page between the processes
+that map it, so the total PSS is what the machine really spends. Each worker
+count is run with the model preloaded in the parent (shared) and with every
+worker loading its own copy (per-worker).
+
+    PREDICTOR_BACKEND=numpy python -m benchmarks.bench_workers --levels 1 2 4
+    PREDICTOR_BACKEND=numpy python -m benchmarks.bench_workers --levels 1 2 4 --mmap
+
+Linux only (reads /proc/<pid>/smaps_rollup).
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+MESSAGES = ["hi", "where is the library", "how do i apply for hostel", "what is my fee balance"]
+MODES = {"shared": [], "per-worker": ["--no-preload"]}
+
+
+def memory_kb(pid):
+    """(rss, pss) of one process in KiB."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as handle:
+        for line in handle:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0])
+    return values["Rss"], values["Pss"]
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as handle:
+        return [int(child) for child in handle.read().split()]
+
+
+def wait_until_ready(port, workers, proc, timeout=180):
+    """Waits until every worker answers /ready with 200 (each loads or shares the model)."""
+    deadline = time.time() + timeout
+    consecutive = 0
+    while time.time() < deadline and proc.poll() is None:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/ready")
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            ready = response.status == 200 and len(child_pids(proc.pid)) >= workers
+        except OSError:
+            ready = False
+        # Fresh connections land on random workers, so ask several times in a row
+        consecutive = consecutive + 1 if ready else 0
+        if consecutive >= workers * 5:
+            return
+        time.sleep(0.05 if ready else 0.5)
+    raise RuntimeError(f"serve.py did not become ready on port {port}")
+
+
+def send_traffic(port, seconds, clients):
+    count = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        nonlocal count
+        sent = 0
+        while time.perf_counter() < deadline:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            conn.request("POST", "/chat", json.dumps({"message": MESSAGES[sent % len(MESSAGES)]}),
+                         {"Content-Type": "application/json"})
+            conn.getresponse().read()
+            conn.close()
+            sent += 1
+        with lock:
+            count += sent
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return count / (time.perf_counter() - started)
+
+
+def run(workers, mode, args):
+    command = [sys.executable, "serve.py", "--workers", str(workers), "--port", str(args.port)] + MODES[mode]
+    if args.mmap:
+        command.append("--mmap")
+    env = dict(os.environ)
+    env.setdefault("FLASK_SECRET_KEY", "benchmark-only-secret")
+    proc = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(args.port, workers, proc)
+        rps = send_traffic(args.port, args.seconds, args.clients)
+        pids = child_pids(proc.pid)
+        worker_memory = [memory_kb(pid) for pid in pids]
+        parent_rss, parent_pss = memory_kb(proc.pid)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+    total_pss = parent_pss + sum(pss for _, pss in worker_memory)
+    mean_rss = sum(rss for rss, _ in worker_memory) / len(worker_memory)
+    mean_pss = sum(pss for _, pss in worker_memory) / len(worker_memory)
+    return rps, mean_rss, mean_pss, total_pss, parent_rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS/PSS and throughput of serve.py by worker count.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4], help="worker counts to try")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--mmap", action="store_true", help="pass --mmap to serve.py")
+    parser.add_argument("--seconds", type=float, default=5.0, help="traffic per run")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent HTTP clients")
+    parser.add_argument("--port", type=int, default=5066)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'workers':>8}{'req/s':>10}{'RSS/worker MB':>15}{'PSS/worker MB':>15}"
+          f"{'total PSS MB':>14}{'parent RSS MB':>15}")
+    for mode in args.modes:
+        for workers in args.levels:
+            rps, mean_rss, mean_pss, total_pss, parent_rss = run(workers, mode, args)
+            print(f"{mode:<12}{workers:>8}{rps:>10.1f}{mean_rss / 1024:>15.1f}{mean_pss / 1024:>15.1f}"
+                  f"{total_pss / 1024:>14.1f}{parent_rss / 1024:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
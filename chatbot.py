@@ -5,7 +5,7 @@ Runs the Al-Hikmah Admin Bot as a command-line chatbot.
 All AI logic is handled by predictor.py.
 """
 
-from predictor import predict_intent, get_text_response, CONFIDENCE_THRESHOLD
+from predictor import predict_intent, get_text_response, retrieve_intent, start_warmup, CONFIDENCE_THRESHOLD
 
 def chat_response(text):
     """Returns a bot response string for a given user input."""
@@ -17,16 +17,26 @@ def chat_response(text):
     if tag is None:
         return "Please enter a valid question."
 
-    if confidence > CONFIDENCE_THRESHOLD:
+    suggestions = []
+    if confidence <= CONFIDENCE_THRESHOLD:
+        tag, suggestions = retrieve_intent(text)
+
+    if tag:
         response = get_text_response(tag)
         if response:
             return response
 
+    if suggestions:
+        return "I am not entirely sure about that. Did you mean:\n" + "\n".join(
+            f"  - {pattern}" for _, _, pattern in suggestions)
     return "I am not entirely sure about that. Could you rephrase your question or contact the administrative office?"
 
 # --------------------------------------------------------
 # Terminal Chat Loop
 # --------------------------------------------------------
+# Load the model in the background while the student types their first question
+start_warmup()
+
 print("=======================================================")
 print("🎓 Advanced Al-Hikmah Admin Bot (Attention-Enabled) Ready!")
 print("=======================================================")
@@ -0,0 +1,105 @@
+"""
+database.py — Shared SQLite Connection Pool
+--------------------------------------------
+Opening a new sqlite3 connection for every query means re-reading the schema
+and throwing away SQLite's prepared statements each time. This module keeps a
+small pool of tuned connections that app.py borrows per request and returns
+on teardown.
+
+Every pooled connection is configured once with:
+- WAL journaling, so readers never block behind the occasional writer
+- synchronous=NORMAL, which is safe with WAL and avoids an fsync per commit
+- a memory-mapped read window and a larger page cache
+- a per-connection prepared-statement cache (sqlite3's cached_statements)
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = os.environ.get("UNIVERSITY_DB", "university.db")
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+STATEMENT_CACHE_SIZE = 128
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=67108864",   # 64 MB memory-mapped reads
+    "PRAGMA cache_size=-16000",    # ~16 MB page cache (negative = KiB)
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def connect(path=DB_PATH):
+    """Opens a single tuned connection (used by the pool and by scripts)."""
+    conn = sqlite3.connect(path, check_same_thread=False,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of SQLite connections. A connection is only ever used by
+    one thread at a time; at most max_idle connections are kept open between
+    requests, and extra ones are opened on demand during bursts.
+    """
+
+    def __init__(self, path=DB_PATH, max_idle=8):
+        self.path = path
+        self.max_idle = max_idle
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = set()
+        self._closed = False
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            conn = connect(self.path)
+            with self._lock:
+                self._open.add(conn)
+            return conn
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed or self._idle.qsize() >= self.max_idle:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+
+    def _discard(self, conn):
+        with self._lock:
+            self._open.discard(conn)
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Closes every connection; called when the application shuts down."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            connections, self._open = self._open, set()
+        for conn in connections:
+            conn.close()
+
+
+pool = ConnectionPool(DB_PATH, POOL_SIZE)
@@ -1,5 +1,9 @@
+import argparse
 import json
+import os
 import pickle
+import sys
+import time
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -12,20 +16,14 @@ from sklearn.metrics import (
     precision_recall_fscore_support
 )
 
+from numpy_model import NumpyIntentModel
 
-def evaluate_model():
-    print("Loading AI Model and Held-Out Test Data (unseen phrases)...")
+KERAS_MODEL_PATH = "advanced_chatbot_model.h5"
+COMPACT_MODEL_PATH = "advanced_chatbot_model.compact.npz"
 
-    # 1. Load the Model and Tokenizer
-    model = load_model("advanced_chatbot_model.h5")
 
-    with open("tokenizer.pickle", "rb") as handle:
-        saved_data = pickle.load(handle)
-        tokenizer = saved_data['tokenizer']
-        classes = saved_data['classes']
-        max_length = saved_data['max_length']
-
-    # 2. Load Held-Out Test Data
+def load_test_data():
+    """Returns the held-out test phrases, their expected tags and the intent count."""
     # IMPORTANT: We load from test_intents.json, NOT intents.json.
     # intents.json contains training data - testing on it only measures memorization.
     # test_intents.json contains fresh unseen phrases, giving honest generalization scores.
@@ -40,13 +38,30 @@ def evaluate_model():
         for pattern in patterns:
             x_texts.append(pattern)
             y_true.append(intent['tag'])
+    return x_texts, y_true, len(data['intents'])
+
+
+def evaluate_model():
+    print("Loading AI Model and Held-Out Test Data (unseen phrases)...")
+
+    # 1. Load the Model and Tokenizer
+    model = load_model(KERAS_MODEL_PATH)
+
+    with open("tokenizer.pickle", "rb") as handle:
+        saved_data = pickle.load(handle)
+        tokenizer = saved_data['tokenizer']
+        classes = saved_data['classes']
+        max_length = saved_data['max_length']
+
+    # 2. Load Held-Out Test Data
+    x_texts, y_true, num_intents = load_test_data()
 
     # 3. Process Text
     seq = tokenizer.texts_to_sequences(x_texts)
     padded = pad_sequences(seq, padding='post', maxlen=max_length)
 
     # 4. Make Predictions
-    print(f"Testing the model on {len(x_texts)} unseen phrases across {len(data['intents'])} intents...\n")
+    print(f"Testing the model on {len(x_texts)} unseen phrases across {num_intents} intents...\n")
     predictions = model.predict(padded, verbose=0)
 
     y_pred = []
@@ -154,5 +169,140 @@ def evaluate_model():
     print("\nEvaluation complete! Three graph images saved in your project folder.")
 
 
+def compare_compact_model(compact_path=COMPACT_MODEL_PATH, max_accuracy_drop=0.02, max_f1_drop=0.02):
+    """
+    Scores the compact variant against the full Keras model on the held-out
+    test set and reports size, load time and single-message latency for
+    both. Returns False if accuracy or F1 drops by more than the tolerance.
+    """
+    with open("tokenizer.pickle", "rb") as handle:
+        saved_data = pickle.load(handle)
+    x_texts, y_true, _ = load_test_data()
+    padded = pad_sequences(saved_data['tokenizer'].texts_to_sequences(x_texts),
+                           padding='post', maxlen=saved_data['max_length'])
+
+    variants = {
+        "full (Keras)": (KERAS_MODEL_PATH, load_model, lambda m, x: m.predict(x, verbose=0)),
+        "compact": (compact_path, NumpyIntentModel.load, lambda m, x: m.predict(x)),
+    }
+    report = {}
+    for name, (path, loader, predict) in variants.items():
+        started = time.perf_counter()
+        model = loader(path)
+        load_seconds = time.perf_counter() - started
+
+        y_pred = [saved_data['classes'][i] for i in predict(model, padded).argmax(axis=1)]
+        accuracy = accuracy_score(y_true, y_pred)
+        _, _, f1, _ = precision_recall_fscore_support(y_true, y_pred, average='weighted', zero_division=0)
+
+        # Latency of one message at a time, the way /chat calls the model
+        predict(model, padded[:1])
+        latencies = []
+        for row in range(len(padded)):
+            started = time.perf_counter()
+            predict(model, padded[row:row + 1])
+            latencies.append(time.perf_counter() - started)
+        report[name] = (os.path.getsize(path), load_seconds, float(np.median(latencies)), accuracy, f1)
+
+    print("=" * 78)
+    print(f"{'variant':<14}{'size KB':>10}{'load s':>10}{'p50 ms/msg':>12}{'accuracy':>11}{'F1':>9}")
+    print("-" * 78)
+    for name, (size, load_seconds, latency, accuracy, f1) in report.items():
+        print(f"{name:<14}{size / 1024:>10.0f}{load_seconds:>10.2f}{latency * 1000:>12.2f}"
+              f"{accuracy * 100:>10.2f}%{f1 * 100:>8.2f}%")
+    print("=" * 78)
+
+    _, _, _, full_accuracy, full_f1 = report["full (Keras)"]
+    _, _, _, compact_accuracy, compact_f1 = report["compact"]
+    accuracy_drop = full_accuracy - compact_accuracy
+    f1_drop = full_f1 - compact_f1
+    if accuracy_drop > max_accuracy_drop or f1_drop > max_f1_drop:
+        print(f"❌ Compact model rejected: accuracy drop {accuracy_drop * 100:.2f} pts "
+              f"(max {max_accuracy_drop * 100:.2f}), F1 drop {f1_drop * 100:.2f} pts (max {max_f1_drop * 100:.2f}).")
+        return False
+    print(f"✅ Compact model accepted: accuracy drop {accuracy_drop * 100:.2f} pts, F1 drop {f1_drop * 100:.2f} pts.")
+    return True
+
+
+def compare_cascade(margins=(0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8), max_accuracy_drop=0.02):
+    """
+    Scores the linear + neural cascade (PREDICTOR_CASCADE=1) against the
+    neural model alone on the held-out test set, for a range of margins.
+    Both tiers are timed one message at a time through predictor.py, so the
+    neural tier runs on the configured PREDICTOR_BACKEND. A cascade message
+    costs the linear tier, plus the neural model when it escalates. Returns
+    False if the configured PREDICTOR_CASCADE_MARGIN loses more accuracy than
+    the tolerance.
+    """
+    import predictor
+    from linear_model import LinearIntentModel
+
+    bundle = predictor.current_bundle()
+    linear = LinearIntentModel.load(predictor.LINEAR_MODEL_PATH)
+    x_texts, y_true, _ = load_test_data()
+    clean_texts = [predictor.sanitize_input(text) for text in x_texts]
+
+    # Every message through both tiers once, after a throwaway call of each
+    bundle.predict(bundle.encode(clean_texts[:1]))
+    linear.classify(bundle.tokenizer.words(clean_texts[0]))
+    neural_tags, neural_seconds, linear_results, linear_seconds = [], [], [], []
+    for clean_text in clean_texts:
+        started = time.perf_counter()
+        pred = bundle.predict(bundle.encode([clean_text]))[0]
+        neural_seconds.append(time.perf_counter() - started)
+        neural_tags.append(bundle.classes[int(np.argmax(pred))])
+
+        started = time.perf_counter()
+        tag_idx, _, margin = linear.classify(bundle.tokenizer.words(clean_text))
+        linear_seconds.append(time.perf_counter() - started)
+        linear_results.append((linear.classes[tag_idx], margin))
+    neural_seconds = np.array(neural_seconds)
+    linear_seconds = np.array(linear_seconds)
+
+    rows = [("neural only", accuracy_score(y_true, neural_tags), 1.0, neural_seconds.mean())]
+    for margin in sorted(set(margins) | {predictor.CASCADE_MARGIN}):
+        escalated = np.array([result_margin < margin for _, result_margin in linear_results])
+        y_pred = [neural if escalate else tag
+                  for (tag, _), neural, escalate in zip(linear_results, neural_tags, escalated)]
+        seconds = linear_seconds + np.where(escalated, neural_seconds, 0.0)
+        label = f"cascade @ {margin:.2f}" + (" *" if margin == predictor.CASCADE_MARGIN else "")
+        rows.append((label, accuracy_score(y_true, y_pred), escalated.mean(), seconds.mean()))
+
+    print("=" * 62)
+    print(f"{'tiers':<20}{'accuracy':>11}{'escalated':>12}{'mean ms/msg':>14}{'speed-up':>10}")
+    print("-" * 62)
+    for label, accuracy, escalated, seconds in rows:
+        print(f"{label:<20}{accuracy * 100:>10.2f}%{escalated * 100:>11.1f}%{seconds * 1000:>14.3f}"
+              f"{neural_seconds.mean() / seconds:>9.1f}x")
+    print("=" * 62)
+    print(f"  {len(x_texts)} test phrases, {bundle.backend} backend; * = PREDICTOR_CASCADE_MARGIN")
+
+    neural_accuracy = rows[0][1]
+    configured = next(row for row in rows if row[0].endswith("*"))
+    accuracy_drop = neural_accuracy - configured[1]
+    if accuracy_drop > max_accuracy_drop:
+        print(f"❌ The cascade at margin {predictor.CASCADE_MARGIN:.2f} loses {accuracy_drop * 100:.2f} accuracy "
+              f"points (max {max_accuracy_drop * 100:.2f}); raise PREDICTOR_CASCADE_MARGIN.")
+        return False
+    print(f"✅ The cascade at margin {predictor.CASCADE_MARGIN:.2f} answers {(1 - configured[2]) * 100:.1f}% "
+          f"of messages without the neural model, accuracy change {(configured[1] - neural_accuracy) * 100:+.2f} pts.")
+    return True
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the intent model on test_intents.json.")
+    parser.add_argument("--compare-compact", nargs="?", const=COMPACT_MODEL_PATH, metavar="PATH",
+                        help="compare the compact variant with the full model instead of drawing graphs")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.02,
+                        help="largest accepted accuracy loss of the compact variant or the cascade (0.02 = 2 points)")
+    parser.add_argument("--max-f1-drop", type=float, default=0.02,
+                        help="largest accepted weighted-F1 loss of the compact variant")
+    parser.add_argument("--cascade", action="store_true",
+                        help="compare the linear + neural cascade with the neural model alone")
+    args = parser.parse_args()
+
+    if args.cascade:
+        sys.exit(0 if compare_cascade(max_accuracy_drop=args.max_accuracy_drop) else 1)
+    if args.compare_compact:
+        sys.exit(0 if compare_compact_model(args.compare_compact, args.max_accuracy_drop, args.max_f1_drop) else 1)
     evaluate_model()
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+export_numpy_model.py — Export Keras Weights for the NumPy Backend
+-------------------------------------------------------------------
+Dumps the weights of advanced_chatbot_model.h5 into a compact .npz file that
+numpy_model.py can run without TensorFlow, then checks that the NumPy forward
+pass picks the same intent as Keras for every phrase in test_intents.json.
+
+train.py exports the weights at the end of every run. To export an existing
+advanced_chatbot_model.h5 by hand:
+
+    python export_numpy_model.py
+
+train.py --compact uses export_compact_model() to write the smaller,
+quantized variant (advanced_chatbot_model.compact.npz) in the same format.
+"""
+
+import json
+import os
+import pickle
+import sys
+import numpy as np
+from tensorflow.keras.models import load_model
+from tensorflow.keras.layers import Bidirectional, Dense, Embedding
+from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+from numpy_model import NumpyIntentModel, prune_embeddings, quantize_weights
+
+KERAS_MODEL_PATH = "advanced_chatbot_model.h5"
+TOKENIZER_PATH = "tokenizer.pickle"
+NUMPY_MODEL_PATH = "advanced_chatbot_model.npz"
+COMPACT_MODEL_PATH = "advanced_chatbot_model.compact.npz"
+
+
+def extract_weights(model):
+    """Maps the Keras layers onto the array names used by numpy_model.py."""
+    embedding = next(layer for layer in model.layers if isinstance(layer, Embedding))
+    bilstm = next(layer for layer in model.layers if isinstance(layer, Bidirectional))
+    hidden, output = [layer for layer in model.layers if isinstance(layer, Dense)]
+
+    fw_kernel, fw_recurrent, fw_bias = bilstm.forward_layer.get_weights()
+    bw_kernel, bw_recurrent, bw_bias = bilstm.backward_layer.get_weights()
+    dense_kernel, dense_bias = hidden.get_weights()
+    output_kernel, output_bias = output.get_weights()
+
+    return {
+        "embeddings": embedding.get_weights()[0],
+        "forward_kernel": fw_kernel,
+        "forward_recurrent_kernel": fw_recurrent,
+        "forward_bias": fw_bias,
+        "backward_kernel": bw_kernel,
+        "backward_recurrent_kernel": bw_recurrent,
+        "backward_bias": bw_bias,
+        "dense_kernel": dense_kernel,
+        "dense_bias": dense_bias,
+        "output_kernel": output_kernel,
+        "output_bias": output_bias,
+    }
+
+
+def verify_export(keras_model, numpy_model, tokenizer_path=TOKENIZER_PATH):
+    """Returns the list of test phrases where the two backends disagree."""
+    with open(tokenizer_path, "rb") as handle:
+        saved_data = pickle.load(handle)
+    with open("test_intents.json") as file:
+        data = json.load(file)
+
+    texts = [pattern for intent in data['intents']
+             for pattern in intent.get('test_patterns', intent.get('patterns', []))]
+    seq = saved_data['tokenizer'].texts_to_sequences(texts)
+    padded = pad_sequences(seq, padding='post', maxlen=saved_data['max_length'])
+
+    keras_pred = keras_model.predict(padded, verbose=0)
+    numpy_pred = numpy_model.predict(padded)
+    print(f"  Max probability difference: {np.abs(keras_pred - numpy_pred).max():.2e}")
+
+    keras_idx = keras_pred.argmax(axis=1)
+    numpy_idx = numpy_pred.argmax(axis=1)
+    return [texts[i] for i in np.flatnonzero(keras_idx != numpy_idx)]
+
+
+def export_compact_model(keras_model, tokenizer, dtype="int8", path=COMPACT_MODEL_PATH):
+    """
+    Writes keras_model with its embedding matrix pruned to the tokenizer's
+    vocabulary and its weights quantized to dtype. Returns the file size.
+    """
+    weights = quantize_weights(prune_embeddings(extract_weights(keras_model), tokenizer), dtype)
+    np.savez_compressed(path, **weights)
+    return os.path.getsize(path)
+
+
+def export_numpy_model(keras_model=None, path=NUMPY_MODEL_PATH, tokenizer_path=TOKENIZER_PATH):
+    """
+    Writes the weights of keras_model (advanced_chatbot_model.h5 if not given)
+    to path and checks them against Keras. Returns False if they disagree.
+    """
+    if keras_model is None:
+        print(f"Loading {KERAS_MODEL_PATH}...")
+        keras_model = load_model(KERAS_MODEL_PATH)
+
+    weights = extract_weights(keras_model)
+    np.savez_compressed(path, **weights)
+    print(f"✅ Weights exported to {path}")
+
+    print("Verifying NumPy backend against Keras on test_intents.json...")
+    mismatches = verify_export(keras_model, NumpyIntentModel.load(path), tokenizer_path)
+    if mismatches:
+        print(f"❌ {len(mismatches)} phrase(s) classified differently:")
+        for phrase in mismatches:
+            print(f"  \"{phrase}\"")
+        return False
+
+    print("✅ NumPy backend matches Keras on every test phrase.")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if export_numpy_model() else 1)
@@ -0,0 +1,110 @@
+"""
+linear_model.py — Sparse TF-IDF Linear Intent Classifier
+---------------------------------------------------------
+The cheap first tier of the prediction cascade (PREDICTOR_CASCADE=1 in
+predictor.py). A message becomes a bag of its words and word pairs, weighted
+by TF-IDF and L2-normalized, and one softmax layer scores the intents. With
+15 intents and a few hundred terms that is a handful of row lookups per
+message instead of an LSTM pass, so the neural model only has to see the
+messages this tier is unsure about.
+
+train.py fits it on the same intents.json patterns as the neural model and
+saves it to intent_linear_model.npz. Words are split exactly like the
+neural model's tokenizer (see vocab_tokenizer.py), so both tiers see the
+same tokens.
+"""
+
+import numpy as np
+
+LINEAR_MODEL_PATH = "intent_linear_model.npz"
+
+
+def extract_terms(words):
+    """Unigrams plus adjacent word pairs ("fee balance")."""
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def _softmax(logits):
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class LinearIntentModel:
+    """TF-IDF weighted bag of terms followed by a softmax layer."""
+
+    def __init__(self, vocabulary, idf, weights, bias, classes):
+        self.vocabulary = list(vocabulary)
+        self.index = {term: i for i, term in enumerate(self.vocabulary)}
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.classes = list(classes)
+
+    def vectorize(self, words):
+        """Returns (term indices, L2-normalized TF-IDF values) of the known terms."""
+        counts = {}
+        for term in extract_terms(words):
+            i = self.index.get(term)
+            if i is not None:
+                counts[i] = counts.get(i, 0) + 1
+        idx = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        values = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * self.idf[idx]
+        norm = np.sqrt(values @ values)
+        return idx, (values / norm if norm else values)
+
+    def predict(self, words):
+        """Class probabilities for one tokenized message."""
+        idx, values = self.vectorize(words)
+        return _softmax(values @ self.weights[idx] + self.bias)
+
+    def classify(self, words):
+        """(class index, confidence, margin over the runner-up) for one message."""
+        probs = self.predict(words)
+        second, first = np.argpartition(probs, -2)[-2:]
+        return int(first), float(probs[first]), float(probs[first] - probs[second])
+
+    def save(self, path=LINEAR_MODEL_PATH):
+        np.savez_compressed(path, vocabulary=np.array(self.vocabulary), idf=self.idf, weights=self.weights,
+                            bias=self.bias, classes=np.array(self.classes))
+
+    @classmethod
+    def load(cls, path=LINEAR_MODEL_PATH):
+        with np.load(path) as data:
+            return cls(data["vocabulary"].tolist(), data["idf"], data["weights"], data["bias"],
+                       data["classes"].tolist())
+
+
+def train_linear_model(tokenized_texts, labels, classes, l2=1e-4, steps=1000, learning_rate=5.0):
+    """
+    Fits the model on tokenized training texts and their intent tags with
+    full-batch gradient descent on the softmax cross-entropy. A few hundred
+    patterns train in well under a second.
+    """
+    term_lists = [extract_terms(words) for words in tokenized_texts]
+    vocabulary = sorted({term for terms in term_lists for term in terms})
+    index = {term: i for i, term in enumerate(vocabulary)}
+
+    counts = np.zeros((len(term_lists), len(vocabulary)), dtype=np.float32)
+    for row, terms in enumerate(term_lists):
+        for term in terms:
+            counts[row, index[term]] += 1
+    document_frequency = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(term_lists)) / (1 + document_frequency)) + 1.0
+
+    features = np.zeros_like(counts)
+    present = counts > 0
+    features[present] = 1.0 + np.log(counts[present])
+    features *= idf
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    features /= np.where(norms > 0, norms, 1.0)
+
+    targets = np.zeros((len(labels), len(classes)), dtype=np.float32)
+    targets[np.arange(len(labels)), [classes.index(label) for label in labels]] = 1.0
+
+    weights = np.zeros((len(vocabulary), len(classes)), dtype=np.float32)
+    bias = np.zeros(len(classes), dtype=np.float32)
+    for _ in range(steps):
+        error = (_softmax(features @ weights + bias) - targets) / len(labels)
+        weights -= learning_rate * (features.T @ error + l2 * weights)
+        bias -= learning_rate * error.sum(axis=0)
+    return LinearIntentModel(vocabulary, idf, weights, bias, classes)
@@ -0,0 +1,215 @@
+"""
+metrics.py — Request Timing and Prometheus Metrics
+---------------------------------------------------
+Lightweight instrumentation for the chat hot path. Code marks the stages of
+a request with span("stage"); each span adds its duration to a per-stage
+histogram and, while a request() is open on the same thread, to that
+request's breakdown. Requests slower than METRICS_SLOW_MS are kept (up to
+METRICS_SLOW_SAMPLES of them) with their per-stage timings so outliers can
+be inspected after the fact.
+
+Counters and histograms are plain dicts behind one lock, so recording costs
+a few microseconds and can stay on under load. render() produces the
+Prometheus text format served by /metrics. Set METRICS_ENABLED=0 to turn
+recording off entirely.
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+SLOW_REQUEST_MS = float(os.environ.get("METRICS_SLOW_MS", "500"))
+SLOW_SAMPLES = int(os.environ.get("METRICS_SLOW_SAMPLES", "50"))
+
+# Upper bounds in seconds, from a cached prediction up to a stalled login
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Help text for every metric; also fixes the order they are rendered in
+METRIC_HELP = {
+    "chatbot_requests_total": ("counter", "Chat requests handled, by route."),
+    "chatbot_request_seconds": ("histogram", "End-to-end time to answer a chat request."),
+    "chatbot_stage_seconds": ("histogram", "Time spent in each instrumented stage of a request."),
+    "chatbot_intent_total": ("counter", "Predicted intents, by confidence bucket."),
+    "chatbot_fallback_total": ("counter", "Replies that fell back to the 'not sure' message."),
+    "chatbot_auth_failures_total": ("counter", "Failed login attempts, by reason."),
+    "chatbot_degraded_total": ("counter", "Chat requests shed or answered in degraded mode, by decision."),
+    "chatbot_slow_requests_total": ("counter", "Requests slower than METRICS_SLOW_MS."),
+}
+
+
+class MetricsRegistry:
+    """Thread-safe counters and fixed-bucket histograms keyed by (name, labels)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS, slow_ms=SLOW_REQUEST_MS, slow_samples=SLOW_SAMPLES):
+        self.buckets = tuple(buckets)
+        self.slow_seconds = slow_ms / 1000.0
+        self._counters = {}
+        self._histograms = {}
+        self._slow = deque(maxlen=slow_samples)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def inc(self, name, labels=(), amount=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, labels, seconds):
+        key = (name, labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # One count per bucket plus +Inf, then the running sum
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+
+    def span(self, stage):
+        """Times the enclosed block as one stage of the current request."""
+        return _Span(self, stage)
+
+    def _record_span(self, stage, elapsed):
+        self.observe("chatbot_stage_seconds", (("stage", stage),), elapsed)
+        stages = getattr(self._local, "stages", None)
+        if stages is not None:
+            stages[stage] = stages.get(stage, 0.0) + elapsed
+
+    @contextmanager
+    def request(self, route):
+        """
+        Times a whole request and collects the spans run inside it. Yields a
+        dict the caller may fill with extra details for the slow-request log.
+        """
+        self._local.stages = stages = {}
+        details = {}
+        started = time.perf_counter()
+        try:
+            yield details
+        finally:
+            elapsed = time.perf_counter() - started
+            self._local.stages = None
+            labels = (("route", route),)
+            self.inc("chatbot_requests_total", labels)
+            self.observe("chatbot_request_seconds", labels, elapsed)
+            if elapsed >= self.slow_seconds:
+                self.inc("chatbot_slow_requests_total", labels)
+                sample = {
+                    "route": route,
+                    "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "total_ms": round(elapsed * 1000, 2),
+                    "stages_ms": {stage: round(seconds * 1000, 2) for stage, seconds in stages.items()},
+                }
+                sample.update(details)
+                with self._lock:
+                    self._slow.append(sample)
+
+    def slow_requests(self):
+        """The most recent slow requests with their per-stage breakdown, newest first."""
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def render(self):
+        """Renders every metric in the Prometheus text exposition format."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(counts), total) for key, (counts, total) in self._histograms.items()}
+
+        lines = []
+        for name, (kind, help_text) in METRIC_HELP.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+                continue
+            for (metric, labels), (counts, total) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+class _Span:
+    # A plain class rather than @contextmanager: spans sit on the hot path
+    # and this is several times cheaper to enter and exit
+    __slots__ = ("registry", "stage", "started")
+
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry._record_span(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _DisabledRegistry(MetricsRegistry):
+    """Drop-in registry that records nothing, used when METRICS_ENABLED=0."""
+
+    def inc(self, name, labels=(), amount=1):
+        pass
+
+    def observe(self, name, labels, seconds):
+        pass
+
+    def span(self, stage):
+        return nullcontext()
+
+    @contextmanager
+    def request(self, route):
+        yield {}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def confidence_bucket(confidence):
+    """Coarse label for a prediction's confidence, kept few to limit series."""
+    for bound in (0.45, 0.7, 0.9):
+        if confidence < bound:
+            return f"<{bound}"
+    return ">=0.9"
+
+
+registry = MetricsRegistry() if METRICS_ENABLED else _DisabledRegistry()
+span = registry.span
+request = registry.request
+
+
+def record_intent(tag, confidence):
+    registry.inc("chatbot_intent_total", (("intent", tag or "none"), ("confidence", confidence_bucket(confidence))))
+
+
+def record_fallback():
+    registry.inc("chatbot_fallback_total")
+
+
+def record_auth_failure(reason):
+    registry.inc("chatbot_auth_failures_total", (("reason", reason),))
+
+
+def record_degradation(decision):
+    registry.inc("chatbot_degraded_total", (("decision", decision),))
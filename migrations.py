@@ -0,0 +1,121 @@
+"""
+migrations.py — Versioned Schema Migrations for university.db
+--------------------------------------------------------------
+Each migration has a version number, a description and a list of SQL
+statements. apply_migrations() runs the ones the database has not seen yet,
+in order, and records them in the schema_migrations table.
+
+check_query_plans() runs EXPLAIN QUERY PLAN on every hot query the chatbot
+sends and reports any that would scan a whole table or sort rows in a temp
+B-tree instead of using an index.
+
+    python migrations.py           # apply pending migrations, then check
+    python migrations.py --check   # only check the query plans
+"""
+
+import sqlite3
+import sys
+
+from student_snapshot import SNAPSHOT_QUERIES, STREAM_QUERIES
+
+DB_PATH = "university.db"
+
+MIGRATIONS = [
+    (1, "Index matric_no lookups and the latest-result / latest-payment sorts", [
+        'CREATE INDEX IF NOT EXISTS idx_results_matric_session '
+        'ON results (matric_no, session)',
+        'CREATE INDEX IF NOT EXISTS idx_payments_matric_date '
+        'ON payments_history (matric_no, date)',
+        'CREATE INDEX IF NOT EXISTS idx_course_registration_matric '
+        'ON course_registration (matric_no)',
+        'CREATE INDEX IF NOT EXISTS idx_accommodation_matric '
+        'ON accommodation (matric_no)',
+    ]),
+]
+
+# Every query on the /chat hot path, with a sample parameter
+HOT_QUERIES = [
+    ('SELECT * FROM students WHERE matric_no = ?', ['22/03CYB059']),
+    ('SELECT full_name FROM students WHERE matric_no = ?', ['22/03CYB059']),
+] + [(query, ['22/03CYB059']) for query, _ in SNAPSHOT_QUERIES.values()] \
+    + [(query, ['22/03CYB059']) for query in STREAM_QUERIES.values()]
+
+
+def current_version(conn):
+    """Returns the highest applied migration version (0 for a new database)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    row = conn.execute('SELECT MAX(version) FROM schema_migrations').fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn):
+    """Applies pending migrations in order. Returns the list of versions applied."""
+    applied = []
+    current = current_version(conn)
+    conn.commit()
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        # IMMEDIATE takes the write lock up front, so two workers starting at
+        # the same time cannot both apply the same migration.
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if current_version(conn) >= version:
+                conn.rollback()
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute('INSERT INTO schema_migrations (version, description) VALUES (?, ?)',
+                         (version, description))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
+def check_query_plans(conn):
+    """
+    Returns a list of (query, plan detail) pairs for hot queries that scan a
+    table or need a temporary sort. An empty list means every query is indexed.
+    """
+    problems = []
+    for query, args in HOT_QUERIES:
+        for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', args):
+            detail = row[-1]
+            if detail.startswith('SCAN') or 'TEMP B-TREE' in detail:
+                problems.append((query, detail))
+    return problems
+
+
+def main():
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        if "--check" not in sys.argv[1:]:
+            applied = apply_migrations(conn)
+            if applied:
+                print(f"✅ Applied migration(s): {', '.join(str(v) for v in applied)}")
+            print(f"Schema version: {current_version(conn)}")
+
+        problems = check_query_plans(conn)
+    finally:
+        conn.close()
+
+    if problems:
+        print("❌ Hot queries that are not fully indexed:")
+        for query, detail in problems:
+            print(f"  {query}\n    -> {detail}")
+        return 1
+    print(f"✅ All {len(HOT_QUERIES)} hot queries use an index.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+numpy_model.py — Pure-NumPy Inference Backend
+----------------------------------------------
+Re-implements the forward pass of the trained intent model using only NumPy:
+
+    Embedding -> Bidirectional LSTM -> dot-product Attention
+              -> GlobalAveragePooling1D -> Dense (ReLU) -> Dense (softmax)
+
+Dropout is inactive at inference time, so it is skipped. The weights are read
+from the .npz file written by export_numpy_model.py, which means web workers
+using this backend never need to load the Keras model.
+
+The compact variant written by train.py --compact stores the same arrays as
+float16, or as int8 with a float32 scale per embedding row / kernel column.
+They are expanded back to float32 on load, so predict() is unchanged.
+
+unpack_weights() writes the weights as one float32 .npy file per array.
+Loading such a directory memory-maps the files read-only, so every worker
+process on the machine shares one copy of the weights through the page cache.
+"""
+
+import os
+
+import numpy as np
+
+# Array names stored in the exported .npz file
+WEIGHT_NAMES = (
+    "embeddings",
+    "forward_kernel", "forward_recurrent_kernel", "forward_bias",
+    "backward_kernel", "backward_recurrent_kernel", "backward_bias",
+    "dense_kernel", "dense_bias",
+    "output_kernel", "output_bias",
+)
+
+
+# int8 arrays are stored next to a "<name>__scale" array of float32 scales
+SCALE_SUFFIX = "__scale"
+QUANTIZE_DTYPES = ("float16", "int8")
+
+
+def quantize_weights(weights, dtype):
+    """
+    Shrinks a weights dict for storage. Biases stay float32 since they are
+    tiny; every other array becomes float16, or int8 with symmetric scales.
+    """
+    if dtype not in QUANTIZE_DTYPES:
+        raise ValueError(f"Unsupported weight dtype {dtype!r}; choose from {', '.join(QUANTIZE_DTYPES)}")
+    packed = {}
+    for name, array in weights.items():
+        array = np.asarray(array, dtype=np.float32)
+        if name.endswith("bias"):
+            packed[name] = array
+        elif dtype == "float16":
+            packed[name] = array.astype(np.float16)
+        else:
+            # One scale per token row of the embeddings, per output column of kernels
+            axis = 1 if name == "embeddings" else 0
+            scale = np.abs(array).max(axis=axis, keepdims=True) / 127.0
+            scale[scale == 0] = 1.0
+            packed[name] = np.round(array / scale).astype(np.int8)
+            packed[name + SCALE_SUFFIX] = scale.astype(np.float32)
+    return packed
+
+
+def dequantize_weights(packed):
+    """Inverse of quantize_weights(); plain float32 exports pass through unchanged."""
+    weights = {}
+    for name, array in packed.items():
+        if name.endswith(SCALE_SUFFIX):
+            continue
+        scale = packed.get(name + SCALE_SUFFIX)
+        weights[name] = array.astype(np.float32) * scale if scale is not None else array
+    return weights
+
+
+def prune_embeddings(weights, tokenizer):
+    """
+    Keeps only the embedding rows the tokenizer can actually produce: ids
+    above len(word_index), or at and above num_words, never occur.
+    """
+    used = len(tokenizer.word_index) + 1
+    if tokenizer.num_words:
+        used = min(used, tokenizer.num_words)
+    return dict(weights, embeddings=np.asarray(weights["embeddings"])[:used])
+
+
+def unpack_weights(path, directory):
+    """Expands an exported .npz into a directory of float32 .npy files for memory-mapping."""
+    with np.load(path) as data:
+        weights = dequantize_weights({name: data[name] for name in data.files})
+    os.makedirs(directory, exist_ok=True)
+    for name in WEIGHT_NAMES:
+        np.save(os.path.join(directory, name + ".npy"), np.asarray(weights[name], dtype=np.float32))
+    return directory
+
+
+def _sigmoid(x):
+    # tanh form is numerically stable for large negative inputs
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+class NumpyIntentModel:
+    """NumPy equivalent of advanced_chatbot_model.h5 for inference only."""
+
+    def __init__(self, weights):
+        missing = [name for name in WEIGHT_NAMES if name not in weights]
+        if missing:
+            raise ValueError(f"Exported model is missing arrays: {', '.join(missing)}")
+        for name in WEIGHT_NAMES:
+            setattr(self, name, np.asarray(weights[name], dtype=np.float32))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads weights from an .npz file written by export_numpy_model.py, or
+        memory-maps them from a directory written by unpack_weights().
+        """
+        if os.path.isdir(path):
+            return cls({name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+                        for name in WEIGHT_NAMES})
+        with np.load(path) as data:
+            return cls(dequantize_weights({name: data[name] for name in data.files}))
+
+    def _lstm(self, x, kernel, recurrent_kernel, bias, reverse=False):
+        # Keras packs the four gates as [input, forget, cell, output]
+        batch, steps, _ = x.shape
+        units = recurrent_kernel.shape[0]
+        projected = x @ kernel + bias
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, steps, units), dtype=np.float32)
+
+        time_steps = range(steps - 1, -1, -1) if reverse else range(steps)
+        for t in time_steps:
+            z = projected[:, t] + h @ recurrent_kernel
+            i = _sigmoid(z[:, :units])
+            f = _sigmoid(z[:, units:2 * units])
+            g = np.tanh(z[:, 2 * units:3 * units])
+            o = _sigmoid(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * np.tanh(c)
+            outputs[:, t] = h
+        return outputs
+
+    def embed(self, padded):
+        """
+        Takes a (batch, max_length) array of token ids and returns the
+        (batch, 2 * units) output of the GlobalAveragePooling1D layer.
+        """
+        x = self.embeddings[np.asarray(padded, dtype=np.int64)]
+
+        forward = self._lstm(x, self.forward_kernel, self.forward_recurrent_kernel, self.forward_bias)
+        backward = self._lstm(x, self.backward_kernel, self.backward_recurrent_kernel,
+                              self.backward_bias, reverse=True)
+        lstm_out = np.concatenate([forward, backward], axis=-1)
+
+        # Self-attention with query = value = key (no scaling, no mask)
+        scores = lstm_out @ lstm_out.transpose(0, 2, 1)
+        attention_out = _softmax(scores) @ lstm_out
+
+        return attention_out.mean(axis=1)
+
+    def predict(self, padded):
+        """
+        Takes a (batch, max_length) array of token ids and returns the
+        (batch, num_classes) softmax probabilities.
+        """
+        pooled = self.embed(padded)
+        hidden = np.maximum(pooled @ self.dense_kernel + self.dense_bias, 0.0)
+        return _softmax(hidden @ self.output_kernel + self.output_bias)
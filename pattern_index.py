@@ -0,0 +1,162 @@
+"""
+pattern_index.py — Nearest-Pattern Retrieval Index
+---------------------------------------------------
+When the model is not confident about a message, app.py asks this index for
+the closest training patterns instead of only asking the student to rephrase.
+Every intents.json pattern is stored as the model's pooled sentence embedding
+(the GlobalAveragePooling1D output), L2-normalized, in one float32 matrix
+with the rows of each intent next to each other. A query is one
+matrix-vector product for the cosine similarity to every pattern and one
+np.maximum.reduceat() for the best pattern of each intent.
+
+Given a directory, the matrix is saved there as a .npy file and
+memory-mapped read-only, so the workers of serve.py share one copy through
+the page cache. Rows are keyed by the sanitized pattern text and tied to the
+model and vocabulary files they were computed with: after an edit to
+intents.json only new patterns are embedded, while a retrained model
+re-embeds them all. Without a directory, or if it cannot be written, the
+index simply lives in memory.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+PATTERN_INDEX_DIR = "pattern_index"
+INDEX_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class PatternIndex:
+    """L2-normalized pattern embeddings grouped by intent, plus their texts."""
+
+    def __init__(self, embeddings, tags, patterns, texts, embedder_version):
+        self.embeddings = embeddings
+        self.tags = list(tags)
+        self.patterns = list(patterns)
+        self.texts = list(texts)
+        self.embedder_version = embedder_version
+        # First row of each run of equal tags, for np.maximum.reduceat
+        starts = [row for row, tag in enumerate(self.tags) if row == 0 or tag != self.tags[row - 1]]
+        self.intent_tags = [self.tags[row] for row in starts]
+        self.starts = np.array(starts, dtype=np.intp)
+        self.stops = np.append(self.starts[1:], len(self.tags))
+
+    def __len__(self):
+        return len(self.tags)
+
+    def search(self, query, k=3):
+        """
+        The k intents whose closest pattern is most similar to the query
+        embedding, best first, as (tag, cosine similarity, pattern) tuples.
+        """
+        query = normalize_rows(query).reshape(-1)
+        if not len(self.tags) or not query.any():
+            return []
+        scores = self.embeddings @ query
+        best = np.maximum.reduceat(scores, self.starts)
+        k = min(k, len(best))
+        top = np.argpartition(-best, k - 1)[:k]
+        results = []
+        for i in top[np.argsort(-best[top], kind="stable")].tolist():
+            row = self.starts[i] + int(np.argmax(scores[self.starts[i]:self.stops[i]]))
+            results.append((self.intent_tags[i], float(best[i]), self.patterns[row]))
+        return results
+
+    @classmethod
+    def load(cls, directory=PATTERN_INDEX_DIR, embedder_version=None):
+        """
+        Memory-maps a saved index. Returns None if there is none, or if it was
+        built with a different model (embedder_version) than the one given.
+        """
+        try:
+            with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as handle:
+                manifest = json.load(handle)
+            if manifest.get("format") != INDEX_FORMAT:
+                return None
+            if embedder_version is not None and manifest["embedder_version"] != embedder_version:
+                return None
+            embeddings = np.load(os.path.join(directory, manifest["matrix"]), mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None
+        if embeddings.shape[0] != len(manifest["texts"]):
+            return None
+        return cls(embeddings, manifest["tags"], manifest["patterns"], manifest["texts"],
+                   manifest["embedder_version"])
+
+    @classmethod
+    def build(cls, entries, embed, embedder_version, directory=PATTERN_INDEX_DIR):
+        """
+        Returns (index, embedded) for entries, a list of (tag, pattern,
+        sanitized text) with each intent's patterns together. Rows whose text
+        is already in the saved index for this embedder_version are reused;
+        embed(texts) is only called for the others, and `embedded` counts them.
+        directory=None keeps the index in memory only.
+        """
+        previous = cls.load(directory, embedder_version) if directory else None
+        if previous is not None and list(zip(previous.tags, previous.patterns, previous.texts)) == list(entries):
+            return previous, 0
+
+        known = {}
+        if previous is not None:
+            known = {text: row for row, text in enumerate(previous.texts)}
+        missing = list(dict.fromkeys(text for _, _, text in entries if text not in known))
+        fresh = normalize_rows(embed(missing)) if missing else None
+        fresh_rows = {text: row for row, text in enumerate(missing)}
+
+        dim = fresh.shape[1] if fresh is not None else previous.embeddings.shape[1]
+        matrix = np.empty((len(entries), dim), dtype=np.float32)
+        for row, (_, _, text) in enumerate(entries):
+            matrix[row] = fresh[fresh_rows[text]] if text in fresh_rows else previous.embeddings[known[text]]
+
+        tags, patterns, texts = (list(column) for column in zip(*entries)) if entries else ([], [], [])
+        index = None
+        if directory:
+            try:
+                _save(directory, matrix, tags, patterns, texts, embedder_version)
+                index = cls.load(directory, embedder_version)
+            except OSError as exc:
+                print(f"⚠️  Could not save the pattern index to {directory}/, keeping it in memory: {exc}")
+        if index is None:
+            index = cls(matrix, tags, patterns, texts, embedder_version)
+        return index, len(missing)
+
+
+def _save(directory, matrix, tags, patterns, texts, embedder_version):
+    """
+    Writes the matrix under a content-derived name, then points manifest.json
+    at it. Both are renamed into place, so a worker loading at the same time
+    sees either the old index or the new one, never a mix.
+    """
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256(embedder_version.encode())
+    digest.update(json.dumps(texts).encode())
+    matrix_name = f"embeddings-{digest.hexdigest()[:12]}.npy"
+    suffix = f".{os.getpid()}.tmp"
+
+    with open(os.path.join(directory, matrix_name + suffix), "wb") as handle:
+        np.save(handle, matrix)
+    os.replace(os.path.join(directory, matrix_name + suffix), os.path.join(directory, matrix_name))
+
+    manifest = {"format": INDEX_FORMAT, "embedder_version": embedder_version, "matrix": matrix_name,
+                "tags": tags, "patterns": patterns, "texts": texts}
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    with open(manifest_path + suffix, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, ensure_ascii=False)
+    os.replace(manifest_path + suffix, manifest_path)
+
+    # Processes that still map an older matrix keep it until they let go
+    for name in os.listdir(directory):
+        if name.startswith("embeddings-") and name.endswith(".npy") and name != matrix_name:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
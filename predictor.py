@@ -6,34 +6,413 @@ Both app.py (Flask web interface) and chatbot.py (terminal interface)
 import from here. Any bug fix or improvement only needs to be made once.
 """
 
+import os
 import json
 import random
-import pickle
+import hashlib
+import queue
+import shutil
+import threading
+import time
+from collections import OrderedDict
 import numpy as np
+
+from metrics import span
 import re
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.sequence import pad_sequences
 
 # --------------------------------------------------------
-# 1. Load the Advanced AI Brain (runs once on import)
+# 1. Load the Advanced AI Brain (lazily, on first prediction)
 # --------------------------------------------------------
-print("Loading Advanced AI Model with Attention Mechanism...")
-model = load_model("advanced_chatbot_model.h5")
+# Importing this module is cheap: the model, tokenizer and intents are only
+# loaded by ensure_loaded(), which runs on the first prediction or in the
+# background via start_warmup(). This lets app.py serve its static routes
+# while TensorFlow is still initialising.
+#
+# PREDICTOR_BACKEND=numpy runs the exported .npz weights with numpy_model.py
+# instead of loading the Keras model (see export_numpy_model.py).
+PREDICTOR_BACKEND = os.environ.get("PREDICTOR_BACKEND", "keras").lower()
+NUMPY_MODEL_PATH = os.environ.get("PREDICTOR_NUMPY_MODEL", "advanced_chatbot_model.npz")
+# When set (serve.py --mmap), every load unpacks NUMPY_MODEL_PATH into
+# <dir>/<digest of the .npz>/ and memory-maps the weights from there
+NUMPY_MMAP_DIR = os.environ.get("PREDICTOR_NUMPY_MMAP") or None
+
+if PREDICTOR_BACKEND not in ("keras", "numpy"):
+    raise RuntimeError(f"Unknown PREDICTOR_BACKEND '{PREDICTOR_BACKEND}'. Use 'keras' or 'numpy'.")
+
+KERAS_MODEL_PATH = "advanced_chatbot_model.h5"
+# train.py writes vocab.json next to tokenizer.pickle; serving only needs the
+# JSON vocabulary, so the numpy backend never imports TensorFlow
+VOCAB_PATH = os.environ.get("PREDICTOR_VOCAB", "vocab.json")
+# The TF-IDF linear model that answers first when PREDICTOR_CASCADE=1 (section 4c)
+LINEAR_MODEL_PATH = os.environ.get("PREDICTOR_LINEAR_MODEL", "intent_linear_model.npz")
+CASCADE_ENABLED = os.environ.get("PREDICTOR_CASCADE", "0") == "1"
+# What the last train.py run used (see --incremental). train.py writes it
+# last, after every other bundle file is in place
+TRAINING_MANIFEST = "training_manifest.json"
+
+intents_data = None
+
+_import_started = time.perf_counter()
+_load_lock = threading.Lock()
+_warmup_lock = threading.Lock()
+_ready = threading.Event()
+_warmup_thread = None
+_startup_timings = {}
+
+
+def _timed(stage, func, timings=None):
+    started = time.perf_counter()
+    result = func()
+    (_startup_timings if timings is None else timings)[stage] = time.perf_counter() - started
+    return result
 
-with open("tokenizer.pickle", "rb") as handle:
-    saved_data = pickle.load(handle)
-    tokenizer = saved_data['tokenizer']
-    classes = saved_data['classes']
-    max_length = saved_data['max_length']
 
-with open("intents.json") as file:
-    intents_data = json.load(file)
+def _file_digest(*paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.isdir(path):
+            # A memory-mapped weights directory (see numpy_model.unpack_weights)
+            digest.update(_file_digest(*sorted(os.path.join(path, name) for name in os.listdir(path))).encode())
+            continue
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:12]
 
-print("✅ AI Model loaded successfully.\n")
+
+def _model_file_paths():
+    model_path = NUMPY_MODEL_PATH if PREDICTOR_BACKEND == "numpy" else KERAS_MODEL_PATH
+    if CASCADE_ENABLED:
+        return (model_path, VOCAB_PATH, LINEAR_MODEL_PATH)
+    return (model_path, VOCAB_PATH)
+
+
+def disk_model_version():
+    """The version a bundle loaded from the files on disk right now would have."""
+    return _file_digest(*_model_file_paths(), INTENTS_PATH)
+
+
+class ModelBundle:
+    """
+    Everything needed to turn text into an intent - model, tokenizer, class
+    list and max_length - loaded and swapped as one unit. The version is a
+    hash of the model, tokenizer and intents files, so every worker serving
+    the same files reports the same version.
+    """
+
+    def __init__(self, model, tokenizer, classes, max_length, version, intents_hash, backend):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.classes = classes
+        self.max_length = max_length
+        self.version = version
+        self.intents_hash = intents_hash
+        self.backend = backend
+        self.loaded_at = time.time()
+        self.fast_path = None
+        self.linear = None
+        self.pattern_index = None
+        self._embedder = None
+
+    @classmethod
+    def load(cls, timings=None):
+        timings = {} if timings is None else timings
+        version = _timed("version_hash", disk_model_version, timings)
+        model = _timed("model_load", _load_model, timings)
+        saved_data = _timed("tokenizer_load", _load_tokenizer, timings)
+        bundle = cls(model, saved_data['tokenizer'], saved_data['classes'], saved_data['max_length'],
+                     version, _file_digest(INTENTS_PATH), PREDICTOR_BACKEND)
+        if CASCADE_ENABLED:
+            bundle.linear = _timed("linear_model_load", _load_linear_model, timings)
+            if bundle.linear.classes != bundle.classes:
+                raise ValueError(f"{LINEAR_MODEL_PATH} was trained on different intents than the model; "
+                                 "retrain both with train.py")
+        if FAST_PATH_ENABLED:
+            bundle.fast_path = _timed("fast_path_build", lambda: FastPathIndex.build(bundle), timings)
+        if RETRIEVAL_ENABLED:
+            bundle.pattern_index = _timed("pattern_index_build", lambda: _build_pattern_index(bundle), timings)
+        return bundle
+
+    def encode(self, clean_texts):
+        """Tokenizes and pads already-sanitized texts into a (n, max_length) array."""
+        return self.tokenizer.encode(clean_texts, self.max_length)
+
+    def predict(self, padded_batch):
+        if self.backend == "numpy":
+            return self.model.predict(padded_batch)
+        return self.model.predict(padded_batch, verbose=0)
+
+    def embed(self, padded_batch):
+        """Pooled sentence embeddings: the output of the GlobalAveragePooling1D layer."""
+        if self.backend == "numpy":
+            return self.model.embed(padded_batch)
+        if self._embedder is None:
+            from tensorflow.keras.layers import GlobalAveragePooling1D
+            from tensorflow.keras.models import Model
+            pooling = next(layer for layer in self.model.layers if isinstance(layer, GlobalAveragePooling1D))
+            self._embedder = Model(self.model.input, pooling.output)
+        return self._embedder.predict(padded_batch, verbose=0)
+
+    def warm_up(self):
+        """One throwaway forward pass so the first real request is not slow."""
+        self.predict(np.zeros((1, self.max_length), dtype=np.int32))
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "backend": self.backend,
+            "classes": len(self.classes),
+            "max_length": self.max_length,
+            "intents_hash": self.intents_hash,
+            "fast_path_phrases": len(self.fast_path.entries) if self.fast_path is not None else None,
+            "cascade": self.linear is not None,
+            "retrieval_patterns": len(self.pattern_index) if self.pattern_index is not None else None,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.loaded_at)),
+        }
+
+
+def _load_model():
+    if PREDICTOR_BACKEND == "numpy":
+        from numpy_model import NumpyIntentModel
+        if NUMPY_MMAP_DIR:
+            return NumpyIntentModel.load(_unpacked_weights(NUMPY_MMAP_DIR))
+        return NumpyIntentModel.load(NUMPY_MODEL_PATH)
+    from tensorflow.keras.models import load_model
+    return load_model(KERAS_MODEL_PATH)
+
+
+def _unpacked_weights(root):
+    """
+    Returns <root>/<digest>/ holding NUMPY_MODEL_PATH unpacked to .npy files,
+    unpacking it first if no worker has yet. Each retrained .npz gets its own
+    directory, so a reload never maps the weights of an older model.
+    """
+    from numpy_model import unpack_weights
+    directory = os.path.join(root, _file_digest(NUMPY_MODEL_PATH))
+    if not os.path.isdir(directory):
+        staging = f"{directory}.{os.getpid()}.tmp"
+        unpack_weights(NUMPY_MODEL_PATH, staging)
+        try:
+            os.rename(staging, directory)
+            print(f"📦 Unpacked {NUMPY_MODEL_PATH} to {directory}/ for memory-mapping.")
+        except OSError:
+            # Another worker unpacked the same weights first
+            shutil.rmtree(staging, ignore_errors=True)
+    # Older unpacked weights are no longer needed: workers still serving them
+    # keep their mappings after the files are removed
+    for name in os.listdir(root):
+        if name != os.path.basename(directory) and not name.endswith(".tmp"):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return directory
+
+
+def _load_tokenizer():
+    from vocab_tokenizer import load_vocab
+    return load_vocab(VOCAB_PATH)
+
+
+def _load_linear_model():
+    from linear_model import LinearIntentModel
+    return LinearIntentModel.load(LINEAR_MODEL_PATH)
+
+
+_bundle = None
+_previous_bundle = None
+_served = threading.local()
+
+
+def ensure_loaded():
+    """
+    Loads the first model bundle and the intents exactly once. Safe to call
+    from many threads at the same time; later calls return immediately.
+    """
+    global _bundle
+    if _ready.is_set():
+        return
+    with _load_lock:
+        if _ready.is_set():
+            return
+        print(f"Loading Advanced AI Model with Attention Mechanism ({PREDICTOR_BACKEND} backend)...")
+        started = time.perf_counter()
+        with span("model_load"):
+            bundle = ModelBundle.load(_startup_timings)
+            _timed("intents_load", get_intent_registry)
+            _timed("warmup_prediction", bundle.warm_up)
+        _bundle = bundle
+        _startup_timings["total_load"] = time.perf_counter() - started
+        _startup_timings["ready_after_import"] = time.perf_counter() - _import_started
+        _ready.set()
+        print(f"✅ AI Model {bundle.version} loaded successfully in {_startup_timings['total_load']:.2f}s.\n")
+
+
+def current_bundle():
+    """Returns the model bundle currently serving predictions."""
+    ensure_loaded()
+    return _bundle
+
+
+def is_ready():
+    """True once the model, tokenizer and intents are loaded and warmed up."""
+    return _ready.is_set()
+
+
+def start_warmup():
+    """
+    Loads everything on a background thread so the first real /chat
+    request does not pay the cost. Returns the warm-up thread.
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is not None:
+            return _warmup_thread
+        _warmup_thread = threading.Thread(target=ensure_loaded, name="predictor-warmup", daemon=True)
+        _warmup_thread.start()
+        return _warmup_thread
+
+
+def get_startup_report():
+    """Returns the startup timings (in seconds) recorded so far."""
+    return {
+        "backend": PREDICTOR_BACKEND,
+        "ready": is_ready(),
+        "model_version": _bundle.version if _bundle is not None else None,
+        "timings": {stage: round(seconds, 4) for stage, seconds in _startup_timings.items()},
+    }
+
+# --------------------------------------------------------
+# 1b. Hot Reload and Rollback
+# --------------------------------------------------------
+# A retrained model is loaded and warmed up in the background, then swapped
+# in with a single assignment. Requests that already hold the old bundle
+# finish on it; new requests use the new one. The previous bundle is kept in
+# memory so rollback_model() is instant.
+#
+# The watcher does not look at the model files themselves: train.py renames
+# them into place one by one, so for a moment the new vocabulary could sit
+# next to the old weights. It reloads when training_manifest.json, which
+# train.py writes last, or intents.json changes.
+WATCH_INTERVAL_SECONDS = float(os.environ.get("PREDICTOR_WATCH_INTERVAL", "5"))
+
+_reload_lock = threading.Lock()
+_watcher_thread = None
+
+
+def reload_model():
+    """
+    Loads the model, tokenizer and intents files from disk as a new bundle
+    and swaps it in. Returns (old_version, new_version); the versions are
+    equal, and nothing is loaded, when the files have not changed.
+    """
+    global _bundle, _previous_bundle
+    ensure_loaded()
+    with _reload_lock:
+        old = _bundle
+        if disk_model_version() == old.version:
+            get_intent_registry()
+            return old.version, old.version
+        timings = {}
+        bundle = ModelBundle.load(timings)
+        get_intent_registry()
+        bundle.warm_up()
+        _previous_bundle, _bundle = old, bundle
+        if _cache is not None:
+            _cache.clear()
+        print(f"🔄 Model bundle {old.version} -> {bundle.version} "
+              f"(loaded in {sum(timings.values()):.2f}s).")
+        return old.version, bundle.version
+
+
+def rollback_model():
+    """
+    Swaps the previous bundle back in. Returns (old_version, new_version),
+    or None if there is nothing to roll back to.
+    """
+    global _bundle, _previous_bundle
+    with _reload_lock:
+        if _previous_bundle is None:
+            return None
+        _previous_bundle, _bundle = _bundle, _previous_bundle
+        if _cache is not None:
+            _cache.clear()
+        print(f"↩️  Model bundle rolled back {_previous_bundle.version} -> {_bundle.version}.")
+        return _previous_bundle.version, _bundle.version
+
+
+def get_model_versions():
+    """Describes the serving bundle and the one kept for rollback."""
+    return {
+        "current": _bundle.describe() if _bundle is not None else None,
+        "previous": _previous_bundle.describe() if _previous_bundle is not None else None,
+    }
+
+
+def _file_signature(paths):
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _watch_model_files(interval):
+    paths = (TRAINING_MANIFEST, INTENTS_PATH)
+    last_seen = _file_signature(paths)
+    pending = None
+    while True:
+        time.sleep(interval)
+        signature = _file_signature(paths)
+        if signature == last_seen:
+            pending = None
+            continue
+        # Only reload once the files have stopped changing for one interval,
+        # so a half-saved intents.json is never picked up.
+        if signature != pending:
+            pending = signature
+            continue
+        try:
+            reload_model()
+            last_seen = signature
+        except Exception as exc:
+            print(f"⚠️  Model reload failed, still serving {_bundle.version}: {exc}")
+            last_seen = signature
+        pending = None
+
+
+def start_model_watcher(interval=WATCH_INTERVAL_SECONDS):
+    """Starts a background thread that hot-reloads the model when its files change."""
+    global _watcher_thread
+    with _warmup_lock:
+        if _watcher_thread is None:
+            _watcher_thread = threading.Thread(target=_watch_model_files, args=(interval,),
+                                               name="predictor-model-watcher", daemon=True)
+            _watcher_thread.start()
+        return _watcher_thread
+
+
+def reset_served_version():
+    _served.version = None
+
+
+def served_version():
+    """
+    The version of the bundle that answered this thread's most recent
+    prediction since reset_served_version(), or the current version if
+    no prediction was needed.
+    """
+    version = getattr(_served, "version", None)
+    if version is None and _bundle is not None:
+        version = _bundle.version
+    return version
 
 # --------------------------------------------------------
 # 2. Input Sanitization
 # --------------------------------------------------------
+_UNWANTED_CHARS = re.compile(r'[^a-zA-Z0-9\s\?\.,\'/]')
+
+
 def sanitize_input(text):
     """
     Strips characters that are not needed for NLP while preserving:
@@ -42,44 +421,661 @@ def sanitize_input(text):
     - Forward slash for matric number format e.g. 22/03CYB059
     - Apostrophes for contractions
     """
-    return re.sub(r'[^a-zA-Z0-9\s\?\.,\'/]', '', text)
+    return _UNWANTED_CHARS.sub('', text)
+
 
 # --------------------------------------------------------
-# 3. Core Prediction Function
+# 3. Micro-Batching Engine (opt-in)
 # --------------------------------------------------------
-def predict_intent(text):
+# Under concurrent load every /chat request would otherwise call
+# model.predict() on a batch of one. When PREDICTOR_BATCHING=1 the
+# requests are queued and a single worker thread runs them together.
+BATCHING_ENABLED = os.environ.get("PREDICTOR_BATCHING", "0") == "1"
+BATCH_MAX_SIZE = int(os.environ.get("PREDICTOR_BATCH_MAX_SIZE", "32"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("PREDICTOR_BATCH_MAX_WAIT_MS", "5"))
+
+
+class _PendingPrediction:
+    """One caller's padded row waiting for its slot in a batch."""
+
+    __slots__ = ("bundle", "row", "result", "error", "done")
+
+    def __init__(self, bundle, row):
+        self.bundle = bundle
+        self.row = row
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class MicroBatcher:
     """
-    Takes a raw user input string and returns a (tag, confidence) tuple.
-    Returns (None, 0.0) if the input is empty after sanitization.
+    Collects concurrent prediction requests into a single padded batch.
+
+    A batch is dispatched as soon as it holds max_batch_size rows, or when
+    max_wait_ms has passed since its first row arrived. Each caller blocks
+    until its own row of the output is ready. Rows are run on the model
+    bundle their caller started with, so a batch that straddles a hot reload
+    is split between the old and new bundles.
+    """
+
+    def __init__(self, run_batch, max_batch_size=32, max_wait_ms=5.0):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._batches = 0
+        self._requests = 0
+        self._batch_sizes = {}
+        self._queue_depths = {}
+
+    def submit(self, bundle, row):
+        """Queues one padded row and returns its prediction vector."""
+        self._ensure_worker()
+        item = _PendingPrediction(bundle, row)
+        self._queue.put(item)
+        item.done.wait()
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="predictor-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self._record(len(batch), self._queue.qsize())
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item.bundle), []).append(item)
+            for items in groups.values():
+                try:
+                    preds = self.run_batch(items[0].bundle, np.stack([item.row for item in items]))
+                    for item, pred in zip(items, preds):
+                        item.result = pred
+                except Exception as exc:
+                    for item in items:
+                        item.error = exc
+                finally:
+                    for item in items:
+                        item.done.set()
+
+    def _record(self, batch_size, depth):
+        # Queue depth is bucketed by powers of two: 0, 1, 2, 4, 8, ...
+        bucket = 0 if depth == 0 else 1 << (depth.bit_length() - 1)
+        with self._lock:
+            self._batches += 1
+            self._requests += batch_size
+            self._batch_sizes[batch_size] = self._batch_sizes.get(batch_size, 0) + 1
+            self._queue_depths[bucket] = self._queue_depths.get(bucket, 0) + 1
+
+    def stats(self):
+        """Returns a snapshot of queue depth and batch-size histograms."""
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "requests": self._requests,
+                "mean_batch_size": (self._requests / self._batches) if self._batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "queue_depth_histogram": dict(sorted(self._queue_depths.items())),
+            }
+
+
+def _run_model(bundle, padded_batch):
+    return bundle.predict(padded_batch)
+
+
+_batcher = MicroBatcher(_run_model, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS) if BATCHING_ENABLED else None
+
+
+def get_batching_stats():
+    """Returns the batcher's statistics, or None when batching is disabled."""
+    return _batcher.stats() if _batcher is not None else None
+
+# --------------------------------------------------------
+# 4. Prediction Result Cache
+# --------------------------------------------------------
+# Students send the same few questions thousands of times a day. Results are
+# cached on the model version plus the padded token-id sequence, so "Hostel?"
+# and "hostel" share an entry. The cache empties itself when the model or
+# vocabulary file changes, and whenever a new bundle is swapped in.
+CACHE_SIZE = int(os.environ.get("PREDICTOR_CACHE_SIZE", "1024"))
+CACHE_TTL_SECONDS = float(os.environ.get("PREDICTOR_CACHE_TTL", "300"))
+CACHE_CHECK_INTERVAL = 2.0  # seconds between checks of the files on disk
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache with a per-entry time-to-live. Entries are dropped
+    whenever the (mtime, size) signature of the watched files changes.
+    """
+
+    def __init__(self, max_size=1024, ttl_seconds=300.0, watched_paths=()):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.watched_paths = tuple(watched_paths)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._signature = self._file_signature()
+        self._next_check = time.monotonic() + CACHE_CHECK_INTERVAL
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _file_signature(self):
+        return _file_signature(self.watched_paths)
+
+    def _check_files(self, now):
+        # Called with the lock held; stat() at most once per check interval
+        if now < self._next_check:
+            return
+        self._next_check = now + CACHE_CHECK_INTERVAL
+        signature = self._file_signature()
+        if signature != self._signature:
+            self._signature = signature
+            self._entries.clear()
+            self.invalidations += 1
+
+    def get(self, key):
+        """Returns the cached value for key, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            self._check_files(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+_cache = PredictionCache(CACHE_SIZE, CACHE_TTL_SECONDS, _model_file_paths()) if CACHE_SIZE > 0 else None
+
+
+def get_cache_stats():
+    """Returns the prediction cache counters, or None when caching is disabled."""
+    return _cache.stats() if _cache is not None else None
+
+# --------------------------------------------------------
+# 4b. Fast Path for Known Phrases
+# --------------------------------------------------------
+# Most messages are a training pattern, or nearly one ("Hi", "hostel",
+# "school fees please"). Every bundle indexes the intents.json patterns by
+# their normalized word sequence, with filler words left out, together with
+# the model's own answer for that pattern. predict_intent() answers those
+# with one dict lookup and skips the model. A pattern is only indexed when
+# the model agrees with its intents.json tag above CONFIDENCE_THRESHOLD;
+# the others are listed in get_fast_path_stats() under "disagreements".
+FAST_PATH_ENABLED = os.environ.get("PREDICTOR_FAST_PATH", "1") == "1"
+FAST_PATH_FILLER_WORDS = frozenset(("please", "pls", "plz", "kindly", "the", "a", "an"))
+
+
+class FastPathIndex:
+    """Normalized word sequence -> (tag, confidence) for one bundle's patterns."""
+
+    def __init__(self, entries, disagreements):
+        self.entries = entries
+        self.disagreements = disagreements
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(tokenizer, clean_text):
+        return tuple(word for word in tokenizer.words(clean_text) if word not in FAST_PATH_FILLER_WORDS)
+
+    @classmethod
+    def build(cls, bundle):
+        with open(INTENTS_PATH) as file:
+            intents = json.load(file)['intents']
+        tags_by_key = {}
+        text_by_key = {}
+        for intent in intents:
+            for pattern in intent.get('patterns', ()):
+                clean_text = sanitize_input(pattern)
+                key = cls.key(bundle.tokenizer, clean_text)
+                if key:
+                    tags_by_key.setdefault(key, set()).add(intent['tag'])
+                    text_by_key.setdefault(key, clean_text)
+
+        # Phrases used by more than one intent are left to the model
+        keys = [key for key, tags in tags_by_key.items() if len(tags) == 1]
+        entries = {}
+        disagreements = []
+        if keys:
+            preds = bundle.predict(bundle.encode([text_by_key[key] for key in keys]))
+            for key, pred in zip(keys, preds):
+                tag_idx = int(np.argmax(pred))
+                tag, confidence = bundle.classes[tag_idx], float(pred[tag_idx])
+                (expected,) = tags_by_key[key]
+                if tag == expected and confidence > CONFIDENCE_THRESHOLD:
+                    entries[key] = (tag, confidence)
+                else:
+                    disagreements.append({"phrase": text_by_key[key], "intent": expected,
+                                          "model": tag, "confidence": round(confidence, 4)})
+        return cls(entries, disagreements)
+
+    def lookup(self, key):
+        result = self.entries.get(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "phrases": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "disagreements": list(self.disagreements),
+            }
+
+
+def get_fast_path_stats():
+    """Hit-rate counters of the serving bundle's fast path, or None when it is disabled."""
+    if not FAST_PATH_ENABLED or _bundle is None or _bundle.fast_path is None:
+        return None
+    return dict(_bundle.fast_path.stats(), model_version=_bundle.version)
+
+# --------------------------------------------------------
+# 4c. Tiered Cascade (opt-in)
+# --------------------------------------------------------
+# With PREDICTOR_CASCADE=1 a message the fast path does not know goes to the
+# TF-IDF linear model first (linear_model.py, ~50 µs). Its answer is kept when
+# the top intent beats the runner-up by at least CASCADE_MARGIN; only the
+# uncertain rest escalates to the neural model. The default margin keeps the
+# linear tier's confidence above CONFIDENCE_THRESHOLD, so an accepted answer
+# never turns into the fallback reply. Tune it with: python evaluate.py --cascade
+CASCADE_MARGIN = float(os.environ.get("PREDICTOR_CASCADE_MARGIN", "0.5"))
+
+
+class CascadeStats:
+    """How many predictions each tier of the cascade answered."""
+
+    def __init__(self):
+        self.linear = 0
+        self.escalated = 0
+        self._lock = threading.Lock()
+
+    def record(self, escalated):
+        with self._lock:
+            if escalated:
+                self.escalated += 1
+            else:
+                self.linear += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.linear + self.escalated
+            return {
+                "margin": CASCADE_MARGIN,
+                "answered_by_linear": self.linear,
+                "escalated_to_model": self.escalated,
+                "escalation_rate": (self.escalated / total) if total else 0.0,
+            }
+
+
+_cascade_stats = CascadeStats() if CASCADE_ENABLED else None
+
+
+def get_cascade_stats():
+    """Per-tier counters of the cascade, or None when it is disabled."""
+    return _cascade_stats.stats() if _cascade_stats is not None else None
+
+# --------------------------------------------------------
+# 4d. Nearest-Pattern Fallback
+# --------------------------------------------------------
+# When the model's confidence is at or below CONFIDENCE_THRESHOLD, app.py
+# calls retrieve_intent() before giving up. The message's pooled embedding is
+# compared with every intents.json pattern (pattern_index.py). A pattern at
+# RETRIEVAL_ANSWER_SIMILARITY or closer answers as its intent; otherwise the
+# best pattern of the RETRIEVAL_SUGGESTIONS closest intents above
+# RETRIEVAL_SUGGEST_SIMILARITY is offered as "did you mean", leaving out
+# small talk (RETRIEVAL_NO_SUGGEST) that nobody means to ask. The index is
+# rebuilt with each bundle. It is kept in memory unless RETRIEVAL_INDEX_DIR is
+# set; then it is saved there and memory-mapped, so workers share it and only
+# patterns not yet seen with this model are re-embedded.
+RETRIEVAL_ENABLED = os.environ.get("PREDICTOR_RETRIEVAL", "1") == "1"
+RETRIEVAL_INDEX_DIR = os.environ.get("PREDICTOR_RETRIEVAL_INDEX") or None
+RETRIEVAL_ANSWER_SIMILARITY = float(os.environ.get("PREDICTOR_RETRIEVAL_ANSWER", "0.9"))
+RETRIEVAL_SUGGEST_SIMILARITY = float(os.environ.get("PREDICTOR_RETRIEVAL_SUGGEST", "0.75"))
+RETRIEVAL_SUGGESTIONS = 3
+RETRIEVAL_NO_SUGGEST = {"greeting", "goodbye"}
+
+
+def _build_pattern_index(bundle):
+    from pattern_index import PatternIndex
+    with open(INTENTS_PATH) as file:
+        intents = json.load(file)['intents']
+    entries = [(intent['tag'], pattern, sanitize_input(pattern))
+               for intent in intents for pattern in intent.get('patterns', ())]
+    entries = [entry for entry in entries if entry[2].strip()]
+    # Only the model and vocabulary decide what a pattern embeds to
+    embedder_version = _file_digest(*_model_file_paths()[:2])
+    index, embedded = PatternIndex.build(entries, lambda texts: bundle.embed(bundle.encode(texts)),
+                                         embedder_version, RETRIEVAL_INDEX_DIR)
+    if embedded:
+        print(f"🔎 Pattern index: embedded {embedded} new pattern(s), {len(index)} in total.")
+    return index
+
+
+class RetrievalStats:
+    """How the nearest-pattern fallback ended for each message it saw."""
+
+    def __init__(self):
+        self.counts = {"answered": 0, "suggested": 0, "unmatched": 0}
+        self._lock = threading.Lock()
+
+    def record(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts, answer_similarity=RETRIEVAL_ANSWER_SIMILARITY,
+                        suggest_similarity=RETRIEVAL_SUGGEST_SIMILARITY)
+
+
+_retrieval_stats = RetrievalStats() if RETRIEVAL_ENABLED else None
+
+
+def retrieve_intent(text):
+    """
+    Returns (tag, suggestions) for a message the model was unsure about. tag
+    is set when a pattern is close enough to answer as its intent; otherwise
+    suggestions lists up to RETRIEVAL_SUGGESTIONS (tag, similarity, pattern)
+    tuples, best first, never small talk. Both are empty when nothing is close.
     """
     clean_text = sanitize_input(text)
+    bundle = current_bundle()
+    if bundle.pattern_index is None or not clean_text.strip():
+        return None, []
+    with span("retrieval"):
+        query = bundle.embed(bundle.encode([clean_text]))[0]
+        nearest = bundle.pattern_index.search(query, RETRIEVAL_SUGGESTIONS + len(RETRIEVAL_NO_SUGGEST))
+    if nearest and nearest[0][1] >= RETRIEVAL_ANSWER_SIMILARITY:
+        _retrieval_stats.record("answered")
+        return nearest[0][0], []
+    suggestions = [match for match in nearest
+                   if match[1] >= RETRIEVAL_SUGGEST_SIMILARITY and match[0] not in RETRIEVAL_NO_SUGGEST]
+    suggestions = suggestions[:RETRIEVAL_SUGGESTIONS]
+    _retrieval_stats.record("suggested" if suggestions else "unmatched")
+    return None, suggestions
+
+
+def get_retrieval_stats():
+    """Outcome counters of the nearest-pattern fallback, or None when it is disabled."""
+    if _retrieval_stats is None:
+        return None
+    return dict(_retrieval_stats.stats(), patterns=len(_bundle.pattern_index) if _bundle is not None else None)
+
+# --------------------------------------------------------
+# 5. Core Prediction Function
+# --------------------------------------------------------
+# What predict_intent(allow_model=False) returns when only the model could
+# answer. Compare with `is`; it still unpacks as (tag, confidence).
+MODEL_UNAVAILABLE = (None, None)
+
+
+def predict_intent(text, allow_model=True):
+    """
+    Takes a raw user input string and returns a (tag, confidence) tuple.
+    Returns (None, 0.0) if the input is empty after sanitization. With
+    allow_model=False (app.py under overload) only the fast path, the linear
+    tier and the prediction cache may answer, and MODEL_UNAVAILABLE is
+    returned when the model would be needed or has not finished loading.
+    """
+    with span("sanitize"):
+        clean_text = sanitize_input(text)
     if not clean_text.strip():
         return None, 0.0
+    if not allow_model and not is_ready():
+        return MODEL_UNAVAILABLE
+
+    # Hold on to one bundle for the whole prediction, even if a hot reload
+    # swaps in a new one halfway through
+    bundle = current_bundle()
+    _served.version = bundle.version
+    if bundle.fast_path is not None:
+        with span("fast_path"):
+            known = bundle.fast_path.lookup(FastPathIndex.key(bundle.tokenizer, clean_text))
+        if known is not None:
+            return known
+
+    if bundle.linear is not None:
+        with span("linear"):
+            tag_idx, confidence, margin = bundle.linear.classify(bundle.tokenizer.words(clean_text))
+        escalated = margin < CASCADE_MARGIN
+        _cascade_stats.record(escalated)
+        if not escalated:
+            return bundle.classes[tag_idx], confidence
+
+    with span("tokenize"):
+        padded = bundle.encode([clean_text])
 
-    seq = tokenizer.texts_to_sequences([clean_text])
-    padded = pad_sequences(seq, padding='post', maxlen=max_length)
+    cache_key = (bundle.version, tuple(padded[0].tolist()))
+    if _cache is not None:
+        cached = _cache.get(cache_key)
+        if cached is not None:
+            return cached
+    if not allow_model:
+        return MODEL_UNAVAILABLE
 
-    pred = model.predict(padded, verbose=0)[0]
+    with span("model"):
+        if _batcher is not None:
+            pred = _batcher.submit(bundle, padded[0])
+        else:
+            pred = bundle.predict(padded)[0]
     tag_idx = np.argmax(pred)
     confidence = float(pred[tag_idx])
-    tag = classes[tag_idx]
+    tag = bundle.classes[tag_idx]
 
+    if _cache is not None:
+        _cache.put(cache_key, (tag, confidence))
     return tag, confidence
 
+
+PREDICT_BATCH_SIZE = 1024  # rows per model call in predict_intents()
+
+
+def predict_intents(texts, top_k=1, batch_size=PREDICT_BATCH_SIZE):
+    """
+    Batch version of predict_intent() for offline scoring. Returns one
+    (tag, confidence, top) tuple per text, where top lists the top_k
+    (tag, confidence) pairs best first. Texts that are empty after
+    sanitization give (None, 0.0, []). Bypasses the cache and micro-batcher.
+    """
+    clean_texts = [sanitize_input(text) for text in texts]
+    keep = np.fromiter((bool(text.strip()) for text in clean_texts), dtype=bool, count=len(clean_texts))
+    results = [(None, 0.0, [])] * len(clean_texts)
+    if not keep.any():
+        return results
+
+    bundle = current_bundle()
+    padded = bundle.encode([text for text, ok in zip(clean_texts, keep) if ok])
+    preds = np.concatenate([bundle.predict(padded[start:start + batch_size])
+                            for start in range(0, len(padded), batch_size)])
+
+    top_k = max(1, min(top_k, preds.shape[1]))
+    top_idx = np.argsort(-preds, axis=1, kind="stable")[:, :top_k]
+    top_conf = np.take_along_axis(preds, top_idx, axis=1).tolist()
+    classes = bundle.classes
+    for row, position in enumerate(np.flatnonzero(keep)):
+        top = [(classes[idx], conf) for idx, conf in zip(top_idx[row].tolist(), top_conf[row])]
+        results[position] = (top[0][0], top[0][1], top)
+    return results
+
 # --------------------------------------------------------
-# 4. Standard Text Response (for non-database intents)
+# 6. Intent Registry and Standard Text Responses
 # --------------------------------------------------------
+# intents.json is indexed once into a tag -> responses dict and a frozenset
+# of tags marked "requires_auth": true, so routing a reply is a dict lookup
+# however many intents there are. The registry reloads itself when
+# intents.json changes on disk, without restarting the workers.
+INTENTS_PATH = "intents.json"
+INTENTS_CHECK_INTERVAL = 2.0  # seconds between checks of intents.json
+
+
+class IntentRegistry:
+    """Read-only index of intents.json. Replaced as a whole on reload."""
+
+    def __init__(self, intents_data):
+        self.intents_data = intents_data
+        self.responses = {intent['tag']: tuple(intent.get('responses', ()))
+                          for intent in intents_data['intents']}
+        self.auth_tags = frozenset(intent['tag'] for intent in intents_data['intents']
+                                   if intent.get('requires_auth'))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as file:
+            return cls(json.load(file))
+
+
+_registry = None
+_registry_signature = None
+_registry_next_check = 0.0
+_registry_lock = threading.Lock()
+
+
+def _intents_signature():
+    stat = os.stat(INTENTS_PATH)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_intent_registry():
+    """Returns the current IntentRegistry, reloading it if intents.json changed."""
+    global _registry, _registry_signature, _registry_next_check, intents_data
+    now = time.monotonic()
+    if _registry is not None and now < _registry_next_check:
+        return _registry
+    with _registry_lock:
+        if _registry is not None and now < _registry_next_check:
+            return _registry
+        _registry_next_check = now + INTENTS_CHECK_INTERVAL
+        signature = _intents_signature()
+        if signature != _registry_signature:
+            try:
+                registry = IntentRegistry.from_file(INTENTS_PATH)
+            except (OSError, ValueError, KeyError) as exc:
+                if _registry is None:
+                    raise
+                # Keep serving the previous version if the new file is broken
+                print(f"⚠️  Could not reload {INTENTS_PATH}: {exc}")
+            else:
+                if _registry is not None:
+                    print(f"🔄 Reloaded {INTENTS_PATH} ({len(registry.responses)} intents).")
+                _registry = registry
+                intents_data = registry.intents_data
+            _registry_signature = signature
+        return _registry
+
+
+def requires_auth(tag):
+    """True if the intent is marked "requires_auth" in intents.json."""
+    return tag in get_intent_registry().auth_tags
+
+
 def get_text_response(tag):
     """
     Looks up a tag in intents.json and returns a random response.
     Returns None if the tag is not found.
     """
-    for intent in intents_data['intents']:
-        if intent['tag'] == tag:
-            return random.choice(intent['responses'])
+    responses = get_intent_registry().responses.get(tag)
+    if responses:
+        return random.choice(responses)
     return None
 
 # --------------------------------------------------------
-# 5. Confidence Threshold
+# 7. Confidence Threshold
 # --------------------------------------------------------
-CONFIDENCE_THRESHOLD = 0.45
\ No newline at end of file
+CONFIDENCE_THRESHOLD = 0.45
+
+
+if __name__ == "__main__":
+    # Built-in startup timing report: python predictor.py
+    started = time.perf_counter()
+    predict_intent("hello")
+    first_prediction = time.perf_counter() - started
+    report = get_startup_report()
+    print("Startup timing report")
+    print("-" * 40)
+    print(f"  Backend:           {report['backend']}")
+    for stage, seconds in report['timings'].items():
+        print(f"  {stage + ':':<19}{seconds * 1000:9.1f} ms")
+    print(f"  {'first_prediction:':<19}{first_prediction * 1000:9.1f} ms")
+    fast_path = get_fast_path_stats()
+    if fast_path is not None:
+        print(f"  Fast path:         {fast_path['phrases']} phrases, "
+              f"{len(fast_path['disagreements'])} where the model disagrees with intents.json")
+        for item in fast_path['disagreements']:
+            print(f"    \"{item['phrase']}\": {item['intent']} in intents.json, model says "
+                  f"{item['model']} ({item['confidence']:.2f})")
@@ -0,0 +1,202 @@
+"""
+score_transcripts.py — Offline Transcript Scoring
+--------------------------------------------------
+Re-scores chat logs with the current model for audits. Reads messages from a
+JSONL or CSV file (or stdin) in fixed-size chunks, classifies each chunk with
+one vectorised predict_intents() call, and streams (text, tag, confidence,
+top-k) rows back out. Only a few chunks are held in memory at once, so
+millions of lines can be scored.
+
+    python score_transcripts.py logs/2025-11.jsonl -o scored.jsonl
+    python score_transcripts.py chats.csv --field message --top-k 3 --workers 4 -o scored.csv
+    cat logs/*.jsonl | python score_transcripts.py > scored.jsonl
+
+Progress and the final throughput are printed to stderr. Lines that are
+not valid JSON or not a JSON object, CSV rows the csv module cannot parse,
+and records whose --field is missing or not a string are skipped and
+counted, by reason, instead of stopping the run.
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import predictor
+
+OUTPUT_FIELDS = ["text", "tag", "confidence", "top_k"]
+PROGRESS_INTERVAL = 5.0  # seconds between progress lines
+
+
+def _message(record, field, skipped):
+    """The string in record[field], or None after counting why there is none."""
+    if not isinstance(record, dict):
+        skipped["not an object"] += 1
+        return None
+    value = record.get(field)
+    if value is None:
+        skipped[f"missing '{field}'"] += 1
+        return None
+    if not isinstance(value, str):
+        skipped[f"'{field}' not a string"] += 1
+        return None
+    return value
+
+
+def read_messages(stream, fmt, field, skipped):
+    """
+    Yields the message text of every JSONL line or CSV row in stream.
+    Records that cannot be parsed, are not an object, or have no string in
+    field are counted in skipped, by reason.
+    """
+    if fmt == "csv":
+        rows = csv.DictReader(stream)
+        while True:
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            except csv.Error:
+                skipped["unreadable CSV row"] += 1
+                continue
+            text = _message(row, field, skipped)
+            if text is not None:
+                yield text
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            skipped["invalid JSON"] += 1
+            continue
+        text = _message(record, field, skipped)
+        if text is not None:
+            yield text
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_model():
+    """Loads the model, sending its start-up messages to stderr so they
+    cannot end up in scored output written to stdout."""
+    with contextlib.redirect_stdout(sys.stderr):
+        predictor.ensure_loaded()
+
+
+def score_chunk(texts, top_k):
+    """Scores one chunk; returns rows ready to be written out."""
+    return [(text, tag, round(confidence, 6), [[t, round(c, 6)] for t, c in top])
+            for text, (tag, confidence, top) in zip(texts, predictor.predict_intents(texts, top_k))]
+
+
+def write_rows(out, fmt, rows, writer=None):
+    if fmt == "csv":
+        for text, tag, confidence, top in rows:
+            writer.writerow([text, tag or "", confidence, json.dumps(top)])
+        return
+    for row in rows:
+        out.write(json.dumps(dict(zip(OUTPUT_FIELDS, row)), ensure_ascii=False))
+        out.write("\n")
+
+
+def guess_format(path, explicit):
+    if explicit:
+        return explicit
+    return "csv" if path and path.lower().endswith(".csv") else "jsonl"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score chat transcripts with the intent model.")
+    parser.add_argument("input", nargs="?", help="JSONL or CSV file (default: stdin)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="input format (default: from file extension)")
+    parser.add_argument("--output-format", choices=["jsonl", "csv"], help="output format (default: from file extension)")
+    parser.add_argument("--field", default="message", help="JSON key or CSV column holding the message")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=4096, help="messages per model call")
+    parser.add_argument("--workers", type=int, default=1, help="processes scoring chunks in parallel")
+    args = parser.parse_args()
+
+    in_fmt = guess_format(args.input, args.format)
+    out_fmt = guess_format(args.output, args.output_format)
+    source = open(args.input, newline="", encoding="utf-8") if args.input else io.TextIOWrapper(
+        sys.stdin.buffer, encoding="utf-8", newline="")
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    writer = csv.writer(out) if out_fmt == "csv" else None
+    if writer:
+        writer.writerow(OUTPUT_FIELDS)
+
+    if args.workers <= 1:
+        load_model()
+    started = time.perf_counter()
+    scored = 0
+    skipped = Counter()
+    next_report = started + PROGRESS_INTERVAL
+
+    def report(final=False):
+        nonlocal next_report
+        now = time.perf_counter()
+        if not final and now < next_report:
+            return
+        next_report = now + PROGRESS_INTERVAL
+        elapsed = now - started
+        label = "Done" if final else "Progress"
+        print(f"{label}: {scored:,} messages in {elapsed:.1f}s ({scored / max(elapsed, 1e-9):,.0f} msg/s)",
+              file=sys.stderr)
+
+    chunks = chunked(read_messages(source, in_fmt, args.field, skipped), args.chunk_size)
+    try:
+        if args.workers <= 1:
+            for texts in chunks:
+                rows = score_chunk(texts, args.top_k)
+                write_rows(out, out_fmt, rows, writer)
+                scored += len(rows)
+                report()
+        else:
+            # At most two chunks per worker are queued or waiting to be
+            # written, which keeps memory flat and the output in input order
+            with ProcessPoolExecutor(args.workers, initializer=load_model) as pool:
+                pending = deque()
+                for texts in chunks:
+                    pending.append(pool.submit(score_chunk, texts, args.top_k))
+                    if len(pending) >= args.workers * 2:
+                        rows = pending.popleft().result()
+                        write_rows(out, out_fmt, rows, writer)
+                        scored += len(rows)
+                        report()
+                while pending:
+                    rows = pending.popleft().result()
+                    write_rows(out, out_fmt, rows, writer)
+                    scored += len(rows)
+                    report()
+    finally:
+        if args.input:
+            source.close()
+        if args.output:
+            out.close()
+    report(final=True)
+    if skipped:
+        print(f"Skipped {sum(skipped.values()):,} malformed record(s): "
+              + ", ".join(f"{count:,} {reason}" for reason, count in skipped.items()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    # Keep TensorFlow's start-up chatter out of the progress output
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    main()
@@ -0,0 +1,151 @@
+"""
+serve.py — Multi-Process Server
+--------------------------------
+Runs app.py on several worker processes that share one listening socket.
+The model bundle is loaded once in the parent before the workers are forked,
+so its weights are shared copy-on-write instead of being loaded once per
+worker. With --mmap the weights are also unpacked to float32 .npy files and
+memory-mapped read-only, so they stay shared even after a worker reloads its
+model or when several servers run on one machine. Each reload maps the
+weights of the .npz it finds, unpacked into a directory of their own.
+
+Logins keep working whichever worker answers, because the conversation state
+lives in Flask's signed session cookie and every worker uses the same
+FLASK_SECRET_KEY, or with SESSION_BACKEND=sqlite in a session table that all
+workers share. SESSION_BACKEND=memory keeps sessions inside one process, so
+it only suits --workers 1. Dead workers are restarted; Ctrl+C or SIGTERM stops them all.
+
+    PREDICTOR_BACKEND=numpy python serve.py --workers 4 --port 8000
+    PREDICTOR_BACKEND=numpy python serve.py --workers 4 --mmap
+
+TensorFlow does not survive fork(), so with the keras backend every worker
+loads its own copy of the model after it starts. Linux/macOS only.
+"""
+
+import argparse
+import os
+import random
+import signal
+import socket
+import sys
+import time
+
+MMAP_DIR = "advanced_chatbot_model.weights"
+
+
+def prepare_mmap_weights(directory):
+    """
+    Makes every model load, including hot reloads, memory-map its weights
+    from directory/. PREDICTOR_NUMPY_MODEL keeps naming the .npz; predictor.py
+    unpacks each new version of it into its own subdirectory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    os.environ["PREDICTOR_NUMPY_MMAP"] = directory
+
+
+def run_worker(listener, host, port, watch_model):
+    """Body of one forked worker: serve requests on the shared socket until killed."""
+    from werkzeug.serving import make_server
+    import predictor
+    from app import app
+
+    # Forked children start with the parent's random state; give each its own
+    random.seed()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if not predictor.is_ready():
+        predictor.start_warmup()
+    if watch_model:
+        predictor.start_model_watcher()
+    server = make_server(host, port, app, threaded=True, fd=listener.fileno())
+    server.serve_forever()
+
+
+def spawn_worker(listener, host, port, watch_model):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(listener, host, port, watch_model)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the chatbot from several worker processes.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--mmap", action="store_true",
+                        help=f"memory-map the numpy backend's weights from {MMAP_DIR}/")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="let every worker load its own model (for memory comparisons)")
+    args = parser.parse_args()
+
+    if os.environ.get("SESSION_BACKEND", "cookie").lower() == "memory" and args.workers > 1:
+        print("⚠️  SESSION_BACKEND=memory keeps sessions per worker, so logins will be lost between "
+              "workers. Use SESSION_BACKEND=sqlite to share them.")
+
+    backend = os.environ.get("PREDICTOR_BACKEND", "keras")
+    preload = not args.no_preload
+    if backend != "numpy":
+        if preload:
+            print("⚠️  The keras backend cannot be shared across fork(); each worker loads its own model. "
+                  "Use PREDICTOR_BACKEND=numpy to share the weights.")
+        preload = False
+    elif args.mmap:
+        prepare_mmap_weights(MMAP_DIR)
+
+    # Threads do not survive fork(), so the parent loads synchronously and
+    # each worker starts its own warm-up (if needed) and model watcher
+    watch_model = os.environ.get("PREDICTOR_WATCH_MODEL", "0") == "1"
+    os.environ["PREDICTOR_WATCH_MODEL"] = "0"
+    os.environ["PREDICTOR_WARMUP"] = "0"
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((args.host, args.port))
+    listener.listen(1024)
+
+    import app  # noqa: F401  (checks FLASK_SECRET_KEY before any worker starts)
+    import predictor
+    if preload:
+        predictor.ensure_loaded()
+
+    workers = {spawn_worker(listener, args.host, args.port, watch_model) for _ in range(args.workers)}
+    print(f"🚀 Serving on http://{args.host}:{args.port} with {args.workers} workers "
+          f"({'shared' if preload else 'per-worker'} model, parent pid {os.getpid()}).")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f"⚠️  Worker {pid} exited with status {status}; starting a replacement.")
+            time.sleep(0.5)
+            workers.add(spawn_worker(listener, args.host, args.port, watch_model))
+    listener.close()
+
+
+if __name__ == "__main__":
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py needs os.fork(); on Windows run app.py or asgi_app.py instead.")
+    main()
@@ -0,0 +1,302 @@
+"""
+session_store.py — Server-Side Chat Sessions
+---------------------------------------------
+By default the conversation state (awaiting_login, pending_action,
+logged_in_user) travels in Flask's signed session cookie, so every /chat
+request decodes, verifies, re-signs and re-sends it, and a session cannot be
+ended from the server. With SESSION_BACKEND=memory or sqlite the state stays
+on the server instead and the cookie only carries a random session id:
+
+- memory: an in-process LRU map. The fastest option, but each process has its
+  own sessions, so use it with app.py, asgi_app.py or serve.py --workers 1.
+- sqlite: a table in SESSION_DB shared by every worker process on the machine.
+
+Sessions expire SESSION_TTL seconds after they were last used, and a
+background sweeper deletes expired ones every SESSION_SWEEP_INTERVAL seconds.
+Clearing a session (logout, or loading the chat page) deletes it from the
+store at once, and revoke_user() ends every session of one student. A
+session gets a new id whenever its student logs in or out, so an id handed
+out before login (session fixation) is worthless afterwards.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from database import ConnectionPool, connect
+
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "cookie").lower()
+SESSION_TTL_SECONDS = float(os.environ.get("SESSION_TTL", "1800"))
+SESSION_MAX = int(os.environ.get("SESSION_MAX", "100000"))
+SESSION_DB_PATH = os.environ.get("SESSION_DB", "sessions.db")
+SESSION_SWEEP_INTERVAL = float(os.environ.get("SESSION_SWEEP_INTERVAL", "60"))
+
+if SESSION_BACKEND not in ("cookie", "memory", "sqlite"):
+    raise RuntimeError(f"Unknown SESSION_BACKEND '{SESSION_BACKEND}'. Use 'cookie', 'memory' or 'sqlite'.")
+
+
+def new_session_id():
+    return secrets.token_urlsafe(24)
+
+
+# --------------------------------------------------------
+# 1. Storage Backends
+# --------------------------------------------------------
+# Both backends store plain dicts and look sessions up by id in O(1). A read
+# pushes the expiry forward, so a session only expires after SESSION_TTL
+# seconds of inactivity.
+class MemorySessionBackend:
+    """Thread-safe, size-bounded LRU map of session id -> (state, expires_at)."""
+
+    name = "memory"
+
+    def __init__(self, ttl_seconds=1800.0, max_sessions=100000):
+        self.ttl = ttl_seconds
+        self.max_sessions = max_sessions
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evicted = 0
+        self.revoked = 0
+
+    def get(self, sid):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[sid]
+                self.expired += 1
+                return None
+            self._entries[sid] = (entry[0], now + self.ttl)
+            self._entries.move_to_end(sid)
+            return dict(entry[0])
+
+    def save(self, sid, state):
+        with self._lock:
+            self._entries[sid] = (dict(state), time.monotonic() + self.ttl)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def delete(self, sid):
+        with self._lock:
+            if self._entries.pop(sid, None) is not None:
+                self.revoked += 1
+
+    def revoke_user(self, matric_no):
+        """Ends every session logged in as matric_no; returns how many there were."""
+        with self._lock:
+            doomed = [sid for sid, (state, _) in self._entries.items()
+                      if state.get('logged_in_user') == matric_no]
+            for sid in doomed:
+                del self._entries[sid]
+            self.revoked += len(doomed)
+            return len(doomed)
+
+    def sweep(self):
+        """Deletes expired sessions; returns how many were removed."""
+        now = time.monotonic()
+        with self._lock:
+            # Reads move entries to the end, but the TTL is fixed, so expiry
+            # order matches LRU order and the sweep can stop at the first live one
+            removed = 0
+            while self._entries:
+                sid, (_, expires_at) = next(iter(self._entries.items()))
+                if expires_at > now:
+                    break
+                del self._entries[sid]
+                removed += 1
+            self.expired += removed
+            return removed
+
+    def stats(self):
+        with self._lock:
+            return {"backend": self.name, "sessions": len(self._entries), "ttl_seconds": self.ttl,
+                    "max_sessions": self.max_sessions, "expired": self.expired,
+                    "evicted": self.evicted, "revoked": self.revoked}
+
+
+class SQLiteSessionBackend:
+    """
+    Sessions in one SQLite table, keyed by id, so every worker process sees
+    the same sessions. Expiry uses wall-clock time because several processes
+    share the table; a read only rewrites expires_at once half the TTL has
+    passed, so most requests cost a single primary-key lookup.
+    """
+
+    name = "sqlite"
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS sessions (
+            sid TEXT PRIMARY KEY,
+            state TEXT NOT NULL,
+            matric_no TEXT,
+            expires_at REAL NOT NULL
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)",
+        "CREATE INDEX IF NOT EXISTS idx_sessions_matric_no ON sessions (matric_no)",
+    )
+
+    def __init__(self, path=SESSION_DB_PATH, ttl_seconds=1800.0, pool_size=4):
+        self.path = path
+        self.ttl = ttl_seconds
+        self.pool = ConnectionPool(path, pool_size)
+        # A throwaway connection, so the pool is still empty when serve.py
+        # forks its workers: SQLite connections must not cross fork()
+        conn = connect(path)
+        try:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, sid):
+        now = time.time()
+        with self.pool.connection() as conn:
+            row = conn.execute('SELECT state, expires_at FROM sessions WHERE sid = ?', (sid,)).fetchone()
+            if row is None or row['expires_at'] <= now:
+                return None
+            if row['expires_at'] - now < self.ttl / 2:
+                conn.execute('UPDATE sessions SET expires_at = ? WHERE sid = ?', (now + self.ttl, sid))
+                conn.commit()
+        return json.loads(row['state'])
+
+    def save(self, sid, state):
+        with self.pool.connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO sessions (sid, state, matric_no, expires_at) VALUES (?, ?, ?, ?)',
+                         (sid, json.dumps(state, separators=(",", ":")), state.get('logged_in_user'),
+                          time.time() + self.ttl))
+            conn.commit()
+
+    def delete(self, sid):
+        with self.pool.connection() as conn:
+            conn.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+            conn.commit()
+
+    def revoke_user(self, matric_no):
+        with self.pool.connection() as conn:
+            removed = conn.execute('DELETE FROM sessions WHERE matric_no = ?', (matric_no,)).rowcount
+            conn.commit()
+        return removed
+
+    def sweep(self):
+        with self.pool.connection() as conn:
+            removed = conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (time.time(),)).rowcount
+            conn.commit()
+        return removed
+
+    def stats(self):
+        with self.pool.connection() as conn:
+            count = conn.execute('SELECT COUNT(*) FROM sessions WHERE expires_at > ?', (time.time(),)).fetchone()[0]
+        return {"backend": self.name, "sessions": count, "ttl_seconds": self.ttl, "path": self.path}
+
+
+# --------------------------------------------------------
+# 2. Flask Session Interface
+# --------------------------------------------------------
+class ServerSession(CallbackDict, SessionMixin):
+    """Flask session whose contents live in a backend; only `sid` goes in the cookie."""
+
+    def __init__(self, initial=None, sid=None):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.user_at_open = self.get('logged_in_user')
+        self.modified = False
+
+
+class ServerSessionInterface(SessionInterface):
+    """
+    Stores Flask sessions in a backend. The cookie is only rewritten when a
+    session is created, deleted or changes hands (login or logout), so an
+    ongoing chat sends no Set-Cookie header at all.
+    """
+
+    def __init__(self, backend, sweep_interval=SESSION_SWEEP_INTERVAL):
+        self.backend = backend
+        self.sweep_interval = sweep_interval
+        self._sweeper_pid = None
+        self._sweeper_lock = threading.Lock()
+
+    # Shared with asgi_app.py, which handles the cookie itself
+    def load(self, sid):
+        """Returns the stored state for sid, or an empty dict if it is unknown or expired."""
+        self.start_sweeper()
+        state = self.backend.get(sid) if sid else None
+        return state if state is not None else {}
+
+    def store(self, sid, state, previous_user=None):
+        """
+        Saves state under sid and returns the id the cookie should now hold:
+        a new one for a new session, or None once an emptied session is deleted.
+        previous_user is the logged_in_user the session was loaded with; when
+        it changed, the state moves to a new id and the old one is deleted.
+        """
+        if sid and (not state or state.get('logged_in_user') != previous_user):
+            self.backend.delete(sid)
+            sid = None
+        if not state:
+            return None
+        sid = sid or new_session_id()
+        self.backend.save(sid, dict(state))
+        return sid
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        state = self.load(sid)
+        return ServerSession(state, sid if state else None)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session.modified:
+            return
+        sid = self.store(session.sid, session, session.user_at_open)
+        if sid is None:
+            if session.sid:
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if sid != session.sid:
+            response.set_cookie(name, sid, domain=domain, path=path,
+                                httponly=self.get_cookie_httponly(app),
+                                secure=self.get_cookie_secure(app),
+                                samesite=self.get_cookie_samesite(app))
+
+    def start_sweeper(self):
+        # Threads do not survive fork(), so every serve.py worker starts its own
+        if self._sweeper_pid == os.getpid() or self.sweep_interval <= 0:
+            return
+        with self._sweeper_lock:
+            if self._sweeper_pid == os.getpid():
+                return
+            self._sweeper_pid = os.getpid()
+            threading.Thread(target=self._sweep_forever, name="session-sweeper", daemon=True).start()
+
+    def _sweep_forever(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.backend.sweep()
+            except Exception as exc:
+                print(f"⚠️  Session sweep failed: {exc}")
+
+
+def create_session_interface(backend=SESSION_BACKEND):
+    """The interface for SESSION_BACKEND, or None to keep Flask's signed cookie."""
+    if backend == "memory":
+        return ServerSessionInterface(MemorySessionBackend(SESSION_TTL_SECONDS, SESSION_MAX))
+    if backend == "sqlite":
+        return ServerSessionInterface(SQLiteSessionBackend(SESSION_DB_PATH, SESSION_TTL_SECONDS))
+    return None
@@ -1,14 +1,218 @@
 import sqlite3
-from werkzeug.security import generate_password_hash
+from auth import hash_pin
+import argparse
 import random
+import time
+from migrations import apply_migrations, current_version
+
+# =========================================================
+# 🏛️ REFERENCE DATA FOR GENERATED STUDENTS
+# =========================================================
+
+# Mapped directly from the Al-Hikmah Website provided
+FACULTIES_DATA = {
+    'Faculty of Humanities and Social Sciences': [
+        ('History and International Studies', 'B.A (Hons) History and International Relations', 'HIR'),
+        ('Islamic Studies', 'B.A (Hons) Islamic Studies', 'ISS'),
+        ('Languages', 'B.A (Hons) English', 'ENG'),
+        ('Languages', 'B.A (Hons) Arabic', 'ARA'),
+        ('Mass Communication', 'B.Sc. (Hons) Mass Communication', 'MAC'),
+        ('Political and Public Administration', 'B.Sc. (Hons) Political Science', 'POL'),
+        ('Sociology', 'B.Sc. (Hons) Sociology', 'SOC')
+    ],
+    'Faculty of Management Sciences': [
+        ('Accounting', 'B.Sc. (Hons) Accounting', 'ACC'),
+        ('Banking and Finance', 'B.Sc. (Hons) Banking and Finance', 'BNK'),
+        ('Business Administration', 'B.Sc. (Hons) Business Administration', 'BUS'),
+        ('Economics', 'B.Sc. (Hons) Economics', 'ECO')
+    ],
+    'Faculty of Education': [
+        ('Education Management', 'B.Ed. Educational Management', 'EDM'),
+        ('Science Education', 'B.Sc. (Ed.) Computer Science', 'EDS'),
+        ('Arts and Social Science Education', 'B.A. (Ed.) English', 'EDA'),
+        ('Library and Information Science', 'BLIS Library and Information Science', 'LIS')
+    ],
+    'Faculty of Natural and Applied Sciences': [
+        ('Biological Sciences', 'B.Sc. (Hons) Microbiology', 'MCB'),
+        ('Biological Sciences', 'B.Sc. (Hons) Biochemistry', 'BCH'),
+        ('Chemical and Geological Sciences', 'B.Sc. (Hons) Industrial Chemistry', 'ICH'),
+        ('Chemical and Geological Sciences', 'B.Sc. (Hons) Geology', 'GLY'),
+        ('Physical Sciences', 'B.Sc. (Hons) Physics with Electronics', 'PWE'),
+        ('Physical Sciences', 'B.Sc. (Hons) Statistics', 'STA')
+    ],
+    'Faculty of Computing, Engineering and Technology': [
+        ('Computer Science', 'B.Sc. (Hons) Computer Science', 'CSC'),
+        ('Computer Science', 'B.Sc. (Hons) Cyber Security', 'CYB'),
+        ('Computer Science', 'B.Sc. (Hons) Software Engineering', 'SEN'),
+        ('Data Science', 'B.Sc. (Hons) Information Systems', 'IFS')
+    ],
+    'Faculty of Law': [
+        ('Law', 'LL.B. (Hons) Common Law', 'LAW'),
+        ('Law', 'LL.B. (Hons) Common and Islamic Law', 'CIL')
+    ],
+    'Faculty of Health Sciences': [
+        ('Public Health', 'B.Sc. (Hons) Public Health', 'PUH'),
+        ('Medical Laboratory', 'BMLS Medical Laboratory Science', 'MLS'),
+        ('Human Anatomy', 'B.Sc. (Hons) Human Anatomy', 'ANA'),
+        ('Human Physiology', 'B.Sc. (Hons) Human Physiology', 'PHY')
+    ],
+    'Faculty of Nursing Sciences': [
+        ('Nursing Science', 'B.NSc. Nursing Science', 'NSC')
+    ],
+    'College of Health Sciences': [
+        ('Medicine', 'MB;BS Bachelor of Medicine, Bachelor of Surgery', 'MBB')
+    ],
+    'Faculty of Agriculture': [
+        ('Agriculture', 'B.Agric Agriculture', 'AGR')
+    ]
+}
+FACULTY_NAMES = list(FACULTIES_DATA.keys())
+
+FIRST_NAMES = ['Aisha', 'Ibrahim', 'Fatima', 'Yusuf', 'Zainab', 'Abubakar', 'Maryam', 'Umar', 'Amina', 'Hassan', 'Chinedu', 'Oluwaseun', 'Ngozi', 'Adeola', 'Chukwudi', 'Nneka', 'Joy', 'Grace']
+LAST_NAMES = ['Adeyemi', 'Okafor', 'Bello', 'Abdullahi', 'Ogunleye', 'Mohammed', 'Suleiman', 'Bakare', 'Danladi', 'Olawale', 'Okonkwo', 'Adeleke', 'Lawal', 'Balogun', 'Ajayi']
+YEARS = ['21', '22', '23', '24', '25']
+
+COURSE_POOL = [
+    ('GST101', 'Use of English', 2), ('GST102', 'Nigerian Peoples and Culture', 2),
+    ('CSC201', 'Introduction to Programming', 3), ('CSC301', 'Data Structures', 3),
+    ('CYB301', 'Network Security', 3), ('SEN201', 'Software Engineering Principles', 3),
+    ('ACC201', 'Financial Accounting', 3), ('ECO201', 'Microeconomics', 3),
+    ('LAW201', 'Law of Contract', 4), ('MCB301', 'Microbiology Techniques', 3),
+    ('PUH201', 'Public Health Fundamentals', 3), ('NSC301', 'Nursing Practice', 4),
+    ('AGR201', 'Crop Science', 3), ('ENG201', 'Literature in English', 3),
+    ('PHY201', 'Human Physiology I', 3), ('BUS301', 'Business Management', 3),
+]
+
+HOSTELS = [
+    ('Male Hostel A', 'Block A'), ('Male Hostel B', 'Block B'),
+    ('Female Hostel A', 'Block C'), ('Female Hostel D', 'Block D')
+]
+
+ACTIVE_SESSION = '2025/2026'
+
+INSERT_SQL = {
+    'students': 'INSERT INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'finances': '''
+        INSERT INTO finances (matric_no, total_billed, amount_paid, balance, clearance_status)
+        VALUES (?, ?, ?, ?, ?)
+    ''',
+    'payments_history': 'INSERT INTO payments_history VALUES (?, ?, ?, ?, ?, ?, ?)',
+    'results': 'INSERT INTO results (matric_no, session, semester, gpa, cgpa) VALUES (?, ?, ?, ?, ?)',
+    'course_registration': '''
+        INSERT INTO course_registration (matric_no, course_code, course_title, units, semester, session, extra_unit_status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''',
+    'accommodation': '''
+        INSERT INTO accommodation (matric_no, hostel_name, room_number, status)
+        VALUES (?, ?, ?, ?)
+    ''',
+}
+
+
+def generate_student(rng, i, matric_numbers, pin_hash, rows):
+    """
+    Appends one random student's rows to the per-table lists in rows.
+    matric_numbers holds every number issued so far, so matric numbers stay
+    unique however many students are generated.
+    """
+    faculty = rng.choice(FACULTY_NAMES)
+    dept, prog, code = rng.choice(FACULTIES_DATA[faculty])
+
+    # Build a realistic Al-Hikmah Matric Number (e.g., 23/05MBB001)
+    while True:
+        year = rng.choice(YEARS)
+        middle_code = f"0{rng.randint(1, 9)}"
+        serial = f"{rng.randint(1, 999):03d}"
+        matric_no = f"{year}/{middle_code}{code}{serial}"
+        if matric_no not in matric_numbers:
+            matric_numbers.add(matric_no)
+            break
+
+    name = f"{rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)}"
+
+    # Medicine usually has 6 levels (100-600), others 4 or 5
+    if code == 'MBB':
+        level = rng.choice([100, 200, 300, 400, 500, 600])
+    else:
+        level = rng.choice([100, 200, 300, 400, 500])
+
+    status = rng.choice(['Registered', 'Failed: Outstanding Payment'])
+    rows['students'].append((matric_no, pin_hash, name, faculty, dept, prog, level, ACTIVE_SESSION, status))
+
+    # Finances (MBBS, Nursing, and Law generally have higher fees)
+    if 'Health' in faculty or 'Nursing' in faculty or 'Law' in faculty:
+        billed = rng.choice([1200000, 1500000, 1800000])
+    elif 'Computing' in faculty or 'Natural' in faculty:
+        billed = rng.choice([600000, 750000, 850000])
+    else:
+        billed = rng.choice([450000, 500000, 600000])
+
+    paid = billed if status == 'Registered' else billed - rng.choice([100000, 250000])
+    clearance = 'Cleared' if status == 'Registered' else 'Not Cleared - Outstanding Balance'
+    rows['finances'].append((matric_no, billed, paid, billed - paid, clearance))
+
+    # Results and fee payments for every session the student has studied,
+    # so the "latest result" and "last payment" lookups sort real history.
+    # A 400 Level student has sessions 2021/2022 up to 2024/2025.
+    cgpa = 0.0
+    target_cgpa = round(rng.uniform(2.0, 4.9), 2)
+    sessions = range(2025 - level // 100, 2025)
+    for k, start_year in enumerate(sessions):
+        session_name = f"{start_year}/{start_year + 1}"
+        gpa = round(rng.uniform(max(1.5, target_cgpa - 0.5), min(5.0, target_cgpa + 0.5)), 2)
+        cgpa = round((cgpa * k + gpa) / (k + 1), 2)
+        rows['results'].append((matric_no, session_name, '2nd Semester', gpa, cgpa))
+
+        # Tuition is paid in one or two instalments per session
+        instalments = rng.choice([1, 1, 2])
+        for n in range(instalments):
+            pay_year, month = (start_year, rng.randint(9, 12)) if n == 0 else (start_year + 1, rng.randint(1, 6))
+            rows['payments_history'].append(
+                (f'TXN-{pay_year}-{i}-{k}{n}', matric_no, 'Sundry & Tuition Fee', float(billed // instalments),
+                 f'{pay_year}-{month:02d}-15', f'RCPT-{serial}-{i}-{k}{n}', 'Successful'))
+
+    # Payment for the active session
+    rows['payments_history'].append(
+        (f'TXN-{year}-{rng.randint(1000, 9999)}-{i}', matric_no, 'Sundry & Tuition Fee', paid,
+         f'2025-{rng.randint(1, 12):02d}-15', f'RCPT-{serial}-{i}', 'Successful'))
+
+    # Course Registration (2-5 courses per student)
+    for (c_code, c_title, c_units) in rng.sample(COURSE_POOL, rng.randint(2, 5)):
+        rows['course_registration'].append(
+            (matric_no, c_code, c_title, c_units, '1st Semester', ACTIVE_SESSION, 'N/A'))
+
+    # Accommodation (70% of students get hostel, 30% do not)
+    if rng.random() < 0.70:
+        hostel = rng.choice(HOSTELS)
+        room = f"Room {rng.randint(1, 50)}{rng.choice(['A', 'B', 'C'])}"
+        rows['accommodation'].append((matric_no, hostel[0], room, 'Allocated'))
+    else:
+        rows['accommodation'].append((matric_no, 'N/A', 'N/A', 'Not Allocated - Apply on the portal'))
+
+
+def insert_rows(cursor, rows):
+    """Writes the buffered rows with one executemany per table, then empties the buffers."""
+    for table, table_rows in rows.items():
+        if table_rows:
+            cursor.executemany(INSERT_SQL[table], table_rows)
+            table_rows.clear()
+
+
+def create_mock_database(num_students=150, seed=None, db_path='university.db', chunk_size=10000):
+    started = time.perf_counter()
 
-def create_mock_database():
     # Connect to SQLite (creates university.db in your folder)
-    conn = sqlite3.connect('university.db')
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
+    # Bulk-load settings: the database is rebuilt from scratch, so skip the
+    # on-disk rollback journal and fsyncs. Indexes are added by the
+    # migrations once all rows are in.
+    cursor.execute('PRAGMA journal_mode=MEMORY')
+    cursor.execute('PRAGMA synchronous=OFF')
+
     # Drop tables if they exist so we can run this cleanly multiple times
-    tables = ['students', 'finances', 'payments_history', 'course_registration', 'accommodation', 'results']
+    tables = ['students', 'finances', 'payments_history', 'course_registration', 'accommodation', 'results', 'schema_migrations']
     for table in tables:
         cursor.execute(f'DROP TABLE IF EXISTS {table}')
 
@@ -98,8 +302,10 @@ def create_mock_database():
     # 🎓 INJECTING YOUR EXACT AL-HIKMAH MASTER PROFILE
     # =========================================================
     
-    # We hash the PIN '1234' for Cyber Security best practices
-    pin_hash = generate_password_hash("1234")
+    # We hash the PIN '1234' for Cyber Security best practices, using the
+    # AUTH_HASH_METHOD policy from auth.py. Hashing is deliberately slow, so
+    # it is done once and shared by every student.
+    pin_hash = hash_pin("1234")
     my_matric = "22/03CYB059"
 
     # Insert Your Student Demographics
@@ -140,168 +346,42 @@ def create_mock_database():
     # =========================================================
     # 🌍 GENERATING UNIVERSITY-WIDE STUDENTS (REAL DATA)
     # =========================================================
-    
-    # Mapped directly from the Al-Hikmah Website provided
-    faculties_data = {
-        'Faculty of Humanities and Social Sciences': [
-            ('History and International Studies', 'B.A (Hons) History and International Relations', 'HIR'),
-            ('Islamic Studies', 'B.A (Hons) Islamic Studies', 'ISS'),
-            ('Languages', 'B.A (Hons) English', 'ENG'),
-            ('Languages', 'B.A (Hons) Arabic', 'ARA'),
-            ('Mass Communication', 'B.Sc. (Hons) Mass Communication', 'MAC'),
-            ('Political and Public Administration', 'B.Sc. (Hons) Political Science', 'POL'),
-            ('Sociology', 'B.Sc. (Hons) Sociology', 'SOC')
-        ],
-        'Faculty of Management Sciences': [
-            ('Accounting', 'B.Sc. (Hons) Accounting', 'ACC'),
-            ('Banking and Finance', 'B.Sc. (Hons) Banking and Finance', 'BNK'),
-            ('Business Administration', 'B.Sc. (Hons) Business Administration', 'BUS'),
-            ('Economics', 'B.Sc. (Hons) Economics', 'ECO')
-        ],
-        'Faculty of Education': [
-            ('Education Management', 'B.Ed. Educational Management', 'EDM'),
-            ('Science Education', 'B.Sc. (Ed.) Computer Science', 'EDS'),
-            ('Arts and Social Science Education', 'B.A. (Ed.) English', 'EDA'),
-            ('Library and Information Science', 'BLIS Library and Information Science', 'LIS')
-        ],
-        'Faculty of Natural and Applied Sciences': [
-            ('Biological Sciences', 'B.Sc. (Hons) Microbiology', 'MCB'),
-            ('Biological Sciences', 'B.Sc. (Hons) Biochemistry', 'BCH'),
-            ('Chemical and Geological Sciences', 'B.Sc. (Hons) Industrial Chemistry', 'ICH'),
-            ('Chemical and Geological Sciences', 'B.Sc. (Hons) Geology', 'GLY'),
-            ('Physical Sciences', 'B.Sc. (Hons) Physics with Electronics', 'PWE'),
-            ('Physical Sciences', 'B.Sc. (Hons) Statistics', 'STA')
-        ],
-        'Faculty of Computing, Engineering and Technology': [
-            ('Computer Science', 'B.Sc. (Hons) Computer Science', 'CSC'),
-            ('Computer Science', 'B.Sc. (Hons) Cyber Security', 'CYB'),
-            ('Computer Science', 'B.Sc. (Hons) Software Engineering', 'SEN'),
-            ('Data Science', 'B.Sc. (Hons) Information Systems', 'IFS')
-        ],
-        'Faculty of Law': [
-            ('Law', 'LL.B. (Hons) Common Law', 'LAW'),
-            ('Law', 'LL.B. (Hons) Common and Islamic Law', 'CIL')
-        ],
-        'Faculty of Health Sciences': [
-            ('Public Health', 'B.Sc. (Hons) Public Health', 'PUH'),
-            ('Medical Laboratory', 'BMLS Medical Laboratory Science', 'MLS'),
-            ('Human Anatomy', 'B.Sc. (Hons) Human Anatomy', 'ANA'),
-            ('Human Physiology', 'B.Sc. (Hons) Human Physiology', 'PHY')
-        ],
-        'Faculty of Nursing Sciences': [
-            ('Nursing Science', 'B.NSc. Nursing Science', 'NSC')
-        ],
-        'College of Health Sciences': [
-            ('Medicine', 'MB;BS Bachelor of Medicine, Bachelor of Surgery', 'MBB')
-        ],
-        'Faculty of Agriculture': [
-            ('Agriculture', 'B.Agric Agriculture', 'AGR')
-        ]
-    }
-
-    first_names = ['Aisha', 'Ibrahim', 'Fatima', 'Yusuf', 'Zainab', 'Abubakar', 'Maryam', 'Umar', 'Amina', 'Hassan', 'Chinedu', 'Oluwaseun', 'Ngozi', 'Adeola', 'Chukwudi', 'Nneka', 'Joy', 'Grace']
-    last_names = ['Adeyemi', 'Okafor', 'Bello', 'Abdullahi', 'Ogunleye', 'Mohammed', 'Suleiman', 'Bakare', 'Danladi', 'Olawale', 'Okonkwo', 'Adeleke', 'Lawal', 'Balogun', 'Ajayi']
-    years = ['21', '22', '23', '24', '25']
-
-    # Generate 150 realistic students across ALL Al-Hikmah departments
-    for i in range(1, 151):
-        faculty = random.choice(list(faculties_data.keys()))
-        dept_info = random.choice(faculties_data[faculty])
-        dept = dept_info[0]
-        prog = dept_info[1]
-        code = dept_info[2]
-        
-        # Build a realistic Al-Hikmah Matric Number (e.g., 23/05MBB001)
-        year = random.choice(years)
-        middle_code = f"0{random.randint(1, 9)}"
-        serial = f"{random.randint(1, 999):03d}"
-        matric_no = f"{year}/{middle_code}{code}{serial}"
-        
-        name = f"{random.choice(last_names)}, {random.choice(first_names)}"
-        
-        # Medicine usually has 6 levels (100-600), others 4 or 5
-        if code == 'MBB':
-            level = random.choice([100, 200, 300, 400, 500, 600])
-        else:
-            level = random.choice([100, 200, 300, 400, 500])
-            
-        status = random.choice(['Registered', 'Failed: Outstanding Payment'])
-        
-        # Insert Student
-        cursor.execute('INSERT INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', 
-                       (matric_no, pin_hash, name, faculty, dept, prog, level, '2025/2026', status))
-        
-        # Insert Finances (MBBS, Nursing, and Law generally have higher fees)
-        if 'Health' in faculty or 'Nursing' in faculty or 'Law' in faculty:
-            billed = random.choice([1200000, 1500000, 1800000])
-        elif 'Computing' in faculty or 'Natural' in faculty:
-            billed = random.choice([600000, 750000, 850000])
-        else:
-            billed = random.choice([450000, 500000, 600000])
-            
-        paid = billed if status == 'Registered' else billed - random.choice([100000, 250000])
-        balance = billed - paid
-        clearance = 'Cleared' if status == 'Registered' else 'Not Cleared - Outstanding Balance'
-
-        # Insert Finances Record
-        cursor.execute('''
-            INSERT INTO finances (matric_no, total_billed, amount_paid, balance, clearance_status)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (matric_no, billed, paid, balance, clearance))
-        
-        cursor.execute('INSERT INTO payments_history VALUES (?, ?, ?, ?, ?, ?, ?)', 
-                       (f'TXN-{year}-{random.randint(1000,9999)}-{i}', matric_no, 'Sundry & Tuition Fee', paid, f'2025-{random.randint(1,12):02d}-15', f'RCPT-{serial}-{i}', 'Successful'))
-        
-        # Insert Results
-        cgpa = round(random.uniform(2.0, 4.9), 2)
-        gpa  = round(random.uniform(max(1.5, cgpa - 0.5), min(5.0, cgpa + 0.5)), 2)
-        cursor.execute('INSERT INTO results (matric_no, session, semester, gpa, cgpa) VALUES (?, ?, ?, ?, ?)', 
-                       (matric_no, '2024/2025', '2nd Semester', gpa, cgpa))
-
-        # Insert Course Registration (2-5 courses per student)
-        course_pool = [
-            ('GST101', 'Use of English', 2), ('GST102', 'Nigerian Peoples and Culture', 2),
-            ('CSC201', 'Introduction to Programming', 3), ('CSC301', 'Data Structures', 3),
-            ('CYB301', 'Network Security', 3), ('SEN201', 'Software Engineering Principles', 3),
-            ('ACC201', 'Financial Accounting', 3), ('ECO201', 'Microeconomics', 3),
-            ('LAW201', 'Law of Contract', 4), ('MCB301', 'Microbiology Techniques', 3),
-            ('PUH201', 'Public Health Fundamentals', 3), ('NSC301', 'Nursing Practice', 4),
-            ('AGR201', 'Crop Science', 3), ('ENG201', 'Literature in English', 3),
-            ('PHY201', 'Human Physiology I', 3), ('BUS301', 'Business Management', 3),
-        ]
-        num_courses = random.randint(2, 5)
-        chosen = random.sample(course_pool, num_courses)
-        for (c_code, c_title, c_units) in chosen:
-            cursor.execute('''
-                INSERT INTO course_registration (matric_no, course_code, course_title, units, semester, session, extra_unit_status)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (matric_no, c_code, c_title, c_units, '1st Semester', '2025/2026', 'N/A'))
-
-        # Insert Accommodation (70% of students get hostel, 30% do not)
-        hostels = [
-            ('Male Hostel A', 'Block A'), ('Male Hostel B', 'Block B'),
-            ('Female Hostel A', 'Block C'), ('Female Hostel D', 'Block D')
-        ]
-        if random.random() < 0.70:
-            hostel = random.choice(hostels)
-            room = f"Room {random.randint(1, 50)}{random.choice(['A','B','C'])}"
-            cursor.execute('''
-                INSERT INTO accommodation (matric_no, hostel_name, room_number, status)
-                VALUES (?, ?, ?, ?)
-            ''', (matric_no, hostel[0], room, 'Allocated'))
-        else:
-            cursor.execute('''
-                INSERT INTO accommodation (matric_no, hostel_name, room_number, status)
-                VALUES (?, ?, ?, ?)
-            ''', (matric_no, 'N/A', 'N/A', 'Not Allocated - Apply on the portal'))
-
-    # Commit changes and close
+
+    # Generate realistic students across ALL Al-Hikmah departments. Rows are
+    # buffered in memory and written with executemany, one transaction per chunk.
+    conn.commit()
+    rng = random.Random(seed)
+    matric_numbers = {my_matric}
+    rows = {table: [] for table in INSERT_SQL}
+    for i in range(1, num_students + 1):
+        generate_student(rng, i, matric_numbers, pin_hash, rows)
+        if i % chunk_size == 0:
+            insert_rows(cursor, rows)
+            conn.commit()
+    insert_rows(cursor, rows)
+
+    # Commit changes, add the lookup indexes (see migrations.py) and close
     conn.commit()
+    apply_migrations(conn)
+    schema_version = current_version(conn)
+    # The app's connections run in WAL mode (see database.py). Switching here
+    # stores it in the file header, so serving the file does not rewrite it.
+    conn.execute('PRAGMA journal_mode=WAL')
     conn.close()
     
     print("\n✅ SUCCESS: University-Wide Database Generated!")
-    print("🎓 150 Mock Students created across 10 Faculties and 30+ actual Al-Hikmah Departments.")
+    print(f"🎓 {num_students} Mock Students created across 10 Faculties and 30+ actual Al-Hikmah Departments "
+          f"in {time.perf_counter() - started:.1f}s.")
+    print(f"🗂️  Schema version {schema_version} with indexed matric_no lookups.")
     print(f"🔐 Master Profile Preserved: {my_matric} | PIN: 1234\n")
 
 if __name__ == "__main__":
-    create_mock_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Create university.db with mock student records.")
+    parser.add_argument("--students", type=int, default=150,
+                        help="number of generated students, in addition to the master profile (default: 150)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible data")
+    parser.add_argument("--db", default="university.db", help="database file to create (default: university.db)")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="students written per transaction (default: 10000)")
+    args = parser.parse_args()
+    create_mock_database(args.students, args.seed, args.db, args.chunk_size)
\ No newline at end of file
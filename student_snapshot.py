@@ -0,0 +1,136 @@
+"""
+student_snapshot.py — Consolidated Student Records
+---------------------------------------------------
+A logged-in student usually asks several personal questions in a row (fees,
+then results, then hostel...). Instead of one query per question, the first
+authenticated question loads a "snapshot" of every table for that matric
+number in a single read transaction, and later questions are answered from
+memory.
+
+Snapshots live in a server-side store keyed by the chat session, with a short
+time-to-live. invalidate() drops them early, e.g. when the Bursary or
+Records office updates a student's data.
+
+Full course lists and payment histories can be long, so /chat/stream does
+not snapshot them: iter_student_rows() yields them row by row straight from
+the SQLite cursor.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+SNAPSHOT_TTL_SECONDS = float(os.environ.get("SNAPSHOT_TTL", "60"))
+SNAPSHOT_MAX_SESSIONS = int(os.environ.get("SNAPSHOT_MAX_SESSIONS", "10000"))
+
+
+# Queries run for each snapshot: name -> (SQL, fetch a single row?)
+SNAPSHOT_QUERIES = {
+    'finance': ('SELECT * FROM finances WHERE matric_no = ?', True),
+    'latest_result': ('SELECT * FROM results WHERE matric_no = ? ORDER BY session DESC LIMIT 1', True),
+    'accommodation': ('SELECT * FROM accommodation WHERE matric_no = ?', True),
+    'courses': ('SELECT * FROM course_registration WHERE matric_no = ?', False),
+    'latest_payment': ('SELECT * FROM payments_history WHERE matric_no = ? ORDER BY date DESC LIMIT 1', True),
+}
+
+# Long lists streamed by /chat/stream: name -> SQL. Both follow an index, so
+# rows come back in order without a sort step (see migrations.py).
+STREAM_QUERIES = {
+    'courses': 'SELECT course_code, course_title, units, semester, session FROM course_registration '
+               'WHERE matric_no = ? ORDER BY id',
+    'payments': 'SELECT date, amount, payment_type, receipt_no, status FROM payments_history '
+                'WHERE matric_no = ? ORDER BY date DESC',
+}
+
+
+def load_student_snapshot(conn, matric_no):
+    """
+    Reads the finance, payment, course, accommodation and result records of
+    one student inside a single read transaction, so all five are consistent
+    with each other. Returns a dict of sqlite3.Row objects (or None / lists).
+    """
+    snapshot = {'matric_no': matric_no}
+    conn.execute('BEGIN')
+    try:
+        for name, (query, one) in SNAPSHOT_QUERIES.items():
+            cur = conn.execute(query, [matric_no])
+            snapshot[name] = cur.fetchone() if one else cur.fetchall()
+    finally:
+        conn.rollback()
+    return snapshot
+
+
+def iter_student_rows(conn, name, matric_no):
+    """Yields the rows of one STREAM_QUERIES query as SQLite steps through them, without fetchall()."""
+    cur = conn.execute(STREAM_QUERIES[name], [matric_no])
+    try:
+        yield from cur
+    finally:
+        cur.close()
+
+
+class SnapshotStore:
+    """
+    Thread-safe, size-bounded map of session id -> student snapshot. Entries
+    expire after ttl_seconds; the least recently used session is dropped when
+    max_sessions is exceeded.
+    """
+
+    def __init__(self, ttl_seconds=60.0, max_sessions=10000):
+        self.ttl = ttl_seconds
+        self.max_sessions = max_sessions
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id, matric_no):
+        """Returns the cached snapshot for this session, or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry[0]['matric_no'] != matric_no or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[session_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, session_id, snapshot):
+        with self._lock:
+            self._entries[session_id] = (snapshot, time.monotonic() + self.ttl)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+
+    def discard(self, session_id):
+        """Forgets one session's snapshot (used on logout)."""
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def invalidate(self, matric_no=None):
+        """
+        Drops every snapshot for matric_no, or all snapshots when matric_no
+        is None. Returns the number of snapshots removed.
+        """
+        with self._lock:
+            if matric_no is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            stale = [sid for sid, (snapshot, _) in self._entries.items()
+                     if snapshot['matric_no'] == matric_no]
+            for sid in stale:
+                del self._entries[sid]
+            return len(stale)
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._entries), "ttl_seconds": self.ttl,
+                    "hits": self.hits, "misses": self.misses}
+
+
+store = SnapshotStore(SNAPSHOT_TTL_SECONDS, SNAPSHOT_MAX_SESSIONS)
@@ -1,15 +1,83 @@
+import argparse
+import hashlib
 import json
+import os
 import pickle
+import sys
+import time
 import numpy as np
 import matplotlib.pyplot as plt
 import nltk
 from nltk.stem import WordNetLemmatizer
 import tensorflow as tf
-from tensorflow.keras.models import Model
+from tensorflow.keras.models import Model, load_model
 from tensorflow.keras.layers import Input, Embedding, LSTM, Dense, Dropout, Bidirectional, Attention, GlobalAveragePooling1D
 from tensorflow.keras.preprocessing.text import Tokenizer
 from tensorflow.keras.preprocessing.sequence import pad_sequences
 
+from numpy_model import QUANTIZE_DTYPES
+from export_numpy_model import COMPACT_MODEL_PATH, NUMPY_MODEL_PATH, export_compact_model, export_numpy_model
+from vocab_tokenizer import VOCAB_PATH, VocabTokenizer, save_vocab
+from linear_model import LINEAR_MODEL_PATH, train_linear_model
+from evaluate import load_test_data
+from predictor import TRAINING_MANIFEST, disk_model_version, sanitize_input
+
+KERAS_MODEL_PATH = "advanced_chatbot_model.h5"
+TOKENIZER_PATH = "tokenizer.pickle"
+
+parser = argparse.ArgumentParser(description="Train the intent classification model.")
+parser.add_argument("--compact", action="store_true",
+                    help=f"also train a smaller, quantized variant and save it to {COMPACT_MODEL_PATH}")
+parser.add_argument("--compact-only", action="store_true",
+                    help="train only the compact variant, reusing the existing tokenizer.pickle")
+parser.add_argument("--compact-dtype", choices=QUANTIZE_DTYPES, default="int8",
+                    help="storage type of the compact variant's weights")
+parser.add_argument("--compact-units", type=int, default=32,
+                    help="LSTM and Dense width of the compact variant (the full model uses 64)")
+parser.add_argument("--incremental", action="store_true",
+                    help="warm-start from the current model and vocabulary instead of training from scratch")
+parser.add_argument("--max-epochs", type=int, default=60,
+                    help="epoch limit of an incremental run (a full run always trains 200 epochs)")
+parser.add_argument("--min-epochs", type=int, default=5,
+                    help="epochs an incremental run always trains before it may stop early")
+parser.add_argument("--patience", type=int, default=5,
+                    help="stop an incremental run after this many epochs without a better test_intents.json accuracy")
+parser.add_argument("--batch-size", type=int,
+                    help="training batch size (default: 8 for a full run, 32 for an incremental one)")
+args = parser.parse_args()
+if args.incremental and args.compact_only:
+    parser.error("--incremental cannot be combined with --compact-only")
+batch_size = args.batch_size or (32 if args.incremental else 8)
+
+# Every bundle file is written under a ".staged" name and renamed into place
+# only once the whole run has succeeded, followed by TRAINING_MANIFEST, which
+# PREDICTOR_WATCH_MODEL=1 workers wait for. A worker never sees the new
+# vocabulary next to the old weights.
+staged_files = {}
+
+
+def staged(path):
+    """Temporary name for path until publish_bundle(); keeps the extension Keras and NumPy go by."""
+    root, ext = os.path.splitext(path)
+    staged_files[path] = f"{root}.staged{ext}"
+    return staged_files[path]
+
+
+def discard_staged():
+    for temp in staged_files.values():
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def publish_bundle(manifest):
+    """Renames the staged files into place, then writes the manifest. Returns the bundle version."""
+    for path, temp in staged_files.items():
+        os.replace(temp, path)
+    manifest["model_version"] = disk_model_version()
+    with open(TRAINING_MANIFEST + ".tmp", "w") as handle:
+        json.dump(manifest, handle, indent=2)
+    os.replace(TRAINING_MANIFEST + ".tmp", TRAINING_MANIFEST)
+    return manifest["model_version"]
 
 # Download required NLTK data
 nltk.download('punkt')
@@ -35,102 +103,329 @@ for intent in data['intents']:
 classes = sorted(list(set(training_labels)))
 num_classes = len(classes)
 
+
+def intent_fingerprints(data):
+    """Short hash of each intent's patterns; responses do not affect training."""
+    return {intent['tag']: hashlib.sha256(json.dumps(sorted(intent['patterns'])).encode()).hexdigest()[:12]
+            for intent in data['intents']}
+
+
+def load_manifest():
+    if not os.path.exists(TRAINING_MANIFEST):
+        return {}
+    with open(TRAINING_MANIFEST) as handle:
+        return json.load(handle)
+
+
+def extend_vocabulary(tokenizer, sentences):
+    """
+    Gives words the tokenizer has not seen the next free ids. Refitting would
+    renumber every word by frequency and scramble the trained embedding rows,
+    so existing ids are never changed. Returns the added words.
+    """
+    words = VocabTokenizer.from_keras(tokenizer).words
+    added = []
+    for sentence in sentences:
+        for word in words(sentence):
+            if word not in tokenizer.word_index:
+                index = len(tokenizer.word_index) + 1
+                tokenizer.word_index[word] = index
+                tokenizer.index_word[index] = word
+                added.append(word)
+    return added
+
+
+fingerprints = intent_fingerprints(data)
+if args.incremental:
+    previous_fingerprints = load_manifest().get('intents')
+    if previous_fingerprints is None:
+        print(f"⚠️  No {TRAINING_MANIFEST} from an earlier run; treating every intent as changed.")
+        previous_fingerprints = {}
+    added = sorted(set(fingerprints) - set(previous_fingerprints))
+    removed = sorted(set(previous_fingerprints) - set(fingerprints))
+    changed = sorted(tag for tag in set(fingerprints) & set(previous_fingerprints)
+                     if fingerprints[tag] != previous_fingerprints[tag])
+    if previous_fingerprints and not (added or removed or changed):
+        print("✅ No intent patterns changed since the last training run; nothing to retrain.")
+        sys.exit(0)
+    print(f"Intents changed since the last run: {len(changed)} changed, {len(added)} added, {len(removed)} removed.")
+    for label, tags in (("changed", changed), ("added", added), ("removed", removed)):
+        if tags:
+            print(f"  {label}: {', '.join(tags)}")
+
 # Tokenization and Embedding Prep
 vocab_size = 2000
 embedding_dim = 64
 
-tokenizer = Tokenizer(num_words=vocab_size, oov_token="<OOV>")
-tokenizer.fit_on_texts(training_sentences)
-sequences = tokenizer.texts_to_sequences(training_sentences)
+if args.compact_only:
+    # The compact variant must share the deployed tokenizer and class order
+    with open(TOKENIZER_PATH, "rb") as handle:
+        saved_data = pickle.load(handle)
+    tokenizer, classes, max_length = saved_data['tokenizer'], saved_data['classes'], saved_data['max_length']
+    sequences = tokenizer.texts_to_sequences(training_sentences)
+elif args.incremental:
+    with open(TOKENIZER_PATH, "rb") as handle:
+        saved_data = pickle.load(handle)
+    tokenizer, previous_classes = saved_data['tokenizer'], saved_data['classes']
+    new_words = extend_vocabulary(tokenizer, training_sentences)
+    print(f"Vocabulary extended by {len(new_words)} word(s){': ' + ', '.join(new_words) if new_words else ''}.")
+    if len(tokenizer.word_index) >= vocab_size:
+        print(f"⚠️  The vocabulary has outgrown {vocab_size} words; words past that are treated as unknown. "
+              "Run a full training to rebuild it.")
+    sequences = tokenizer.texts_to_sequences(training_sentences)
+    # The weights do not depend on the input length, so it can still grow
+    max_length = max(saved_data['max_length'], max(len(seq) for seq in sequences))
+else:
+    tokenizer = Tokenizer(num_words=vocab_size, oov_token="<OOV>")
+    tokenizer.fit_on_texts(training_sentences)
+    sequences = tokenizer.texts_to_sequences(training_sentences)
+    max_length = max([len(seq) for seq in sequences])
 
-max_length = max([len(seq) for seq in sequences])
 padded_sequences = pad_sequences(sequences, padding='post', maxlen=max_length)
 
 # Encode Labels
 training_labels_encoded = np.array([classes.index(label) for label in training_labels])
 
 # Save Tokenizer Data
-with open("tokenizer.pickle", "wb") as handle:
-    pickle.dump({'tokenizer': tokenizer, 'classes': classes, 'max_length': max_length}, handle, protocol=pickle.HIGHEST_PROTOCOL)
+if not args.compact_only:
+    with open(staged(TOKENIZER_PATH), "wb") as handle:
+        pickle.dump({'tokenizer': tokenizer, 'classes': classes, 'max_length': max_length}, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    # The serving side reads this plain JSON copy instead of the pickle
+    save_vocab(staged(VOCAB_PATH), tokenizer, classes, max_length)
 
 # --------------------------------------------------------
 # 2. Model Development (Seq2Seq Architecture with Attention)
 # --------------------------------------------------------
-print("Building the LSTM + Attention Architecture...")
+def build_model(embedding_dim=64, lstm_units=64, dense_units=64):
+    # Input Layer
+    inputs = Input(shape=(max_length,))
+
+    # Embedding Layer
+    # This satisfies the requirement for numerical representation using embedding techniques
+    x = Embedding(input_dim=vocab_size, output_dim=embedding_dim, input_length=max_length)(inputs)
+
+    # LSTM Encoder (Bidirectional to capture context from both directions)
+    lstm_out = Bidirectional(LSTM(lstm_units, return_sequences=True))(x)
+
+    # Attention Mechanism
+    # This allows the model to focus selectively on relevant portions of the input sequence
+    attention_out = Attention()([lstm_out, lstm_out])
+
+    # Pooling layer to flatten the data for the Dense layers
+    pooled_output = GlobalAveragePooling1D()(attention_out)
+
+    # Dense / Softmax Layer for Intent Recognition
+    x = Dense(dense_units, activation='relu')(pooled_output)
+    x = Dropout(0.5)(x)
+    outputs = Dense(num_classes, activation='softmax')(x)
 
-# Input Layer
-inputs = Input(shape=(max_length,))
+    # Compile Model
+    model = Model(inputs=inputs, outputs=outputs)
+    model.compile(loss='sparse_categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
+    return model
 
-# Embedding Layer
-# This satisfies the requirement for numerical representation using embedding techniques
-x = Embedding(input_dim=vocab_size, output_dim=embedding_dim, input_length=max_length)(inputs)
 
-# LSTM Encoder (Bidirectional to capture context from both directions)
-lstm_out = Bidirectional(LSTM(64, return_sequences=True))(x)
+def train_model(model):
+    # For small datasets (under 500 samples), EarlyStopping based on val_loss is
+    # unreliable because the validation set is too small to give a stable signal.
+    # Instead we train for a fixed 200 epochs and save the final model.
+    # The model will converge well before epoch 200 on this dataset size.
+    return model.fit(
+        padded_sequences,
+        training_labels_encoded,
+        epochs=200,
+        batch_size=batch_size,
+        verbose=1
+    )
 
-# Attention Mechanism
-# This allows the model to focus selectively on relevant portions of the input sequence
-attention_out = Attention()([lstm_out, lstm_out])
 
-# Pooling layer to flatten the data for the Dense layers
-pooled_output = GlobalAveragePooling1D()(attention_out)
+def warm_start(model, previous_model, previous_classes):
+    """
+    Copies every layer's weights from the previous model. Output units are
+    matched by intent name, so added intents start from fresh weights and
+    removed ones are dropped.
+    """
+    output_layer = model.layers[-1]
+    for layer, previous_layer in zip(model.layers, previous_model.layers):
+        weights = previous_layer.get_weights()
+        if layer is output_layer:
+            kernel, bias = layer.get_weights()
+            previous_kernel, previous_bias = weights
+            for i, tag in enumerate(classes):
+                if tag in previous_classes:
+                    j = previous_classes.index(tag)
+                    kernel[:, i], bias[i] = previous_kernel[:, j], previous_bias[j]
+            weights = [kernel, bias]
+        layer.set_weights(weights)
 
-# Dense / Softmax Layer for Intent Recognition
-x = Dense(64, activation='relu')(pooled_output)
-x = Dropout(0.5)(x)
-outputs = Dense(num_classes, activation='softmax')(x)
 
-# Compile Model
-model = Model(inputs=inputs, outputs=outputs)
-model.compile(loss='sparse_categorical_crossentropy', optimizer='adam', metrics=['accuracy'])
-model.summary()
+class HeldOutEarlyStopping(tf.keras.callbacks.Callback):
+    """
+    Stops an incremental run on the held-out test_intents.json accuracy.
+    test_intents.json may not cover new patterns, so an epoch only counts once
+    the changed intents' own patterns are classified correctly (at least
+    CHANGED_ACCURACY_TARGET of them). Training ends when the test accuracy
+    has not improved for `patience` such epochs; the best one is kept.
+    """
+
+    CHANGED_ACCURACY_TARGET = 0.95
+
+    def __init__(self, x_changed, y_changed, patience, min_epochs):
+        super().__init__()
+        self.x_changed = x_changed
+        self.y_changed = y_changed
+        self.patience = patience
+        self.min_epochs = min_epochs
+        self.best = None
+        self.best_weights = None
+        self.wait = 0
+
+    def on_epoch_end(self, epoch, logs=None):
+        logs = logs if logs is not None else {}
+        predicted = self.model.predict(self.x_changed, verbose=0).argmax(axis=1)
+        logs['changed_accuracy'] = changed_accuracy = float((predicted == self.y_changed).mean())
+        if epoch + 1 < self.min_epochs or changed_accuracy < self.CHANGED_ACCURACY_TARGET:
+            return
+        if self.best is None or logs['val_accuracy'] > self.best:
+            self.best = logs['val_accuracy']
+            self.best_weights = self.model.get_weights()
+            self.wait = 0
+            return
+        self.wait += 1
+        if self.wait >= self.patience:
+            self.model.stop_training = True
+
+    def on_train_end(self, logs=None):
+        if self.best_weights is None:
+            print(f"⚠️  The changed intents never reached {self.CHANGED_ACCURACY_TARGET:.0%} training accuracy "
+                  f"within --max-epochs; keeping the last epoch. Consider a full training run.")
+            return
+        self.model.set_weights(self.best_weights)
+        print(f"Kept the epoch with {self.best:.2%} accuracy on test_intents.json.")
+
+
+def train_incremental(model, changed_tags):
+    test_texts, test_tags, _ = load_test_data()
+    known = [(text, tag) for text, tag in zip(test_texts, test_tags) if tag in classes]
+    x_test = pad_sequences(tokenizer.texts_to_sequences([text for text, _ in known]),
+                           padding='post', maxlen=max_length)
+    y_test = np.array([classes.index(tag) for _, tag in known])
+    changed = np.isin(training_labels_encoded, [classes.index(tag) for tag in changed_tags])
+    early_stopping = HeldOutEarlyStopping(padded_sequences[changed], training_labels_encoded[changed],
+                                          args.patience, args.min_epochs)
+    return model.fit(
+        padded_sequences,
+        training_labels_encoded,
+        validation_data=(x_test, y_test),
+        epochs=args.max_epochs,
+        batch_size=batch_size,
+        callbacks=[early_stopping],
+        verbose=1
+    )
 
 # --------------------------------------------------------
 # 3. Model Training and Evaluation
 # --------------------------------------------------------
-print("Training the Deep Learning Model...")
-
-# For small datasets (under 500 samples), EarlyStopping based on val_loss is
-# unreliable because the validation set is too small to give a stable signal.
-# Instead we train for a fixed 200 epochs and save the final model.
-# The model will converge well before epoch 200 on this dataset size.
-history = model.fit(
-    padded_sequences,
-    training_labels_encoded,
-    epochs=200,
-    batch_size=8,
-    verbose=1
-)
-
-# Save the fully trained model
-model.save("advanced_chatbot_model.h5")
+if not args.compact_only:
+    print("Building the LSTM + Attention Architecture...")
+    model = build_model(embedding_dim)
+    model.summary()
+
+    training_started = time.perf_counter()
+    if args.incremental:
+        print(f"Warm-starting from {KERAS_MODEL_PATH}...")
+        warm_start(model, load_model(KERAS_MODEL_PATH), previous_classes)
+        history = train_incremental(model, changed + added if previous_fingerprints else classes)
+    else:
+        print("Training the Deep Learning Model...")
+        history = train_model(model)
+    training_seconds = time.perf_counter() - training_started
+    epochs_run = len(history.history['loss'])
+    print(f"⏱️  {'Incremental' if args.incremental else 'Full'} training took {training_seconds:.1f}s "
+          f"({epochs_run} epochs, batch size {batch_size}).")
+
+    # Save the fully trained model
+    model.save(staged(KERAS_MODEL_PATH))
 
 # --------------------------------------------------------
 # 4. Save Training History Graphs for Documentation
 # --------------------------------------------------------
-print("\nGenerating training history graphs...")
-
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-
-# Accuracy plot
-ax1.plot(history.history['accuracy'], label='Train Accuracy', color='royalblue')
-ax1.set_title('Model Accuracy Over Epochs', fontsize=13, fontweight='bold')
-ax1.set_xlabel('Epoch')
-ax1.set_ylabel('Accuracy')
-ax1.legend()
-ax1.grid(True, linestyle='--', alpha=0.6)
-
-# Loss plot
-ax2.plot(history.history['loss'], label='Train Loss', color='royalblue')
-ax2.set_title('Model Loss Over Epochs', fontsize=13, fontweight='bold')
-ax2.set_xlabel('Epoch')
-ax2.set_ylabel('Loss')
-ax2.legend()
-ax2.grid(True, linestyle='--', alpha=0.6)
-
-plt.tight_layout()
-plt.savefig('training_history.png', bbox_inches='tight')
-plt.close()
-
-print("✅ Training complete! Model saved to advanced_chatbot_model.h5")
-print("✅ Training history graph saved to training_history.png")
\ No newline at end of file
+def save_history_graphs(history):
+    print("\nGenerating training history graphs...")
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Accuracy plot
+    ax1.plot(history.history['accuracy'], label='Train Accuracy', color='royalblue')
+    ax1.set_title('Model Accuracy Over Epochs', fontsize=13, fontweight='bold')
+    ax1.set_xlabel('Epoch')
+    ax1.set_ylabel('Accuracy')
+    ax1.legend()
+    ax1.grid(True, linestyle='--', alpha=0.6)
+
+    # Loss plot
+    ax2.plot(history.history['loss'], label='Train Loss', color='royalblue')
+    ax2.set_title('Model Loss Over Epochs', fontsize=13, fontweight='bold')
+    ax2.set_xlabel('Epoch')
+    ax2.set_ylabel('Loss')
+    ax2.legend()
+    ax2.grid(True, linestyle='--', alpha=0.6)
+
+    plt.tight_layout()
+    plt.savefig('training_history.png', bbox_inches='tight')
+    plt.close()
+
+if not args.compact_only:
+    save_history_graphs(history)
+    print("✅ Training complete!")
+    print("✅ Training history graph saved to training_history.png")
+
+    # The first tier of PREDICTOR_CASCADE=1. It is cheap to fit, so every run
+    # retrains it from scratch on what predict_intent() will see: sanitized text
+    # split into words by the same tokenizer
+    linear_model = train_linear_model([VocabTokenizer.from_keras(tokenizer).words(sanitize_input(sentence))
+                                       for sentence in training_sentences], training_labels, classes)
+    linear_model.save(staged(LINEAR_MODEL_PATH))
+    print(f"✅ Linear cascade model trained ({len(linear_model.vocabulary)} terms)")
+
+    # Every run ends with a complete bundle: the numpy backend's weights are
+    # exported too, so either backend can load or hot-reload it
+    if not export_numpy_model(model, staged(NUMPY_MODEL_PATH), staged_files[TOKENIZER_PATH]):
+        discard_staged()
+        sys.exit(1)
+
+    manifest = {
+        "mode": "incremental" if args.incremental else "full",
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "training_seconds": round(training_seconds, 1),
+        "epochs": epochs_run,
+        "batch_size": batch_size,
+        "max_length": int(max_length),
+        "classes": classes,
+        "intents": fingerprints,
+    }
+
+# --------------------------------------------------------
+# 5. Compact Variant (optional)
+# --------------------------------------------------------
+# A narrower model for many-worker deployments, served by the numpy backend
+# with PREDICTOR_NUMPY_MODEL=advanced_chatbot_model.compact.npz. Its embedding
+# matrix is cut down to the words the tokenizer knows and its weights are
+# stored as int8 or float16. Check it with: python evaluate.py --compare-compact
+if args.compact or args.compact_only:
+    print(f"\nTraining the compact variant ({args.compact_units} units, {args.compact_dtype} weights)...")
+    compact_units = args.compact_units
+    compact_model = build_model(embedding_dim=compact_units, lstm_units=compact_units, dense_units=compact_units)
+    train_model(compact_model)
+    size = export_compact_model(compact_model, tokenizer, args.compact_dtype, staged(COMPACT_MODEL_PATH))
+    print(f"✅ Compact model trained ({size / 1024:.0f} KB)")
+    if args.compact_only:
+        manifest = dict(load_manifest(), compact_trained_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+
+# --------------------------------------------------------
+# 6. Publish the Bundle
+# --------------------------------------------------------
+version = publish_bundle(manifest)
+print(f"✅ Saved {', '.join(staged_files)} and {TRAINING_MANIFEST}.")
+print(f"✅ Model bundle {version} is ready; load it with POST /admin/reload-model "
+      "or PREDICTOR_WATCH_MODEL=1.")
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+vocab_tokenizer.py — Dependency-Free Tokenizer
+-----------------------------------------------
+Replaces the pickled Keras Tokenizer at serving time. train.py writes the
+vocabulary, class list and max_length to vocab.json, a plain JSON file that is
+safe to load and does not need TensorFlow. VocabTokenizer reproduces Keras'
+texts_to_sequences() + pad_sequences(padding='post') exactly:
+
+- lowercase, turn every character in `filters` into the split character,
+  split on it and drop empty strings (text_to_word_sequence)
+- ids at or above num_words, and unknown words, become the OOV id (or are
+  dropped when there is no OOV token)
+- sequences longer than max_length keep their last tokens (truncating='pre')
+
+To convert an existing tokenizer.pickle and check that both tokenizers agree
+on every pattern in intents.json and test_intents.json:
+
+    python vocab_tokenizer.py
+"""
+
+import json
+
+import numpy as np
+
+VOCAB_PATH = "vocab.json"
+VOCAB_FORMAT = 1
+
+
+class VocabTokenizer:
+    """Word -> id lookup with the same text normalization as the Keras Tokenizer."""
+
+    def __init__(self, word_index, num_words=None, oov_token=None,
+                 filters='!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n', lower=True, split=" "):
+        self.word_index = dict(word_index)
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self._table = str.maketrans({c: split for c in filters})
+        self._oov_id = self.word_index.get(oov_token) if oov_token is not None else None
+        # Ids past the num_words cutoff behave exactly like unknown words
+        self._lookup = {word: index for word, index in self.word_index.items()
+                        if not num_words or index < num_words}
+
+    @classmethod
+    def from_keras(cls, tokenizer):
+        return cls(tokenizer.word_index, tokenizer.num_words, tokenizer.oov_token,
+                   tokenizer.filters, tokenizer.lower, tokenizer.split)
+
+    def words(self, text):
+        """Same as Keras' text_to_word_sequence with this tokenizer's settings."""
+        if self.lower:
+            text = text.lower()
+        return [word for word in text.translate(self._table).split(self.split) if word]
+
+    def ids(self, text):
+        lookup, oov = self._lookup, self._oov_id
+        if oov is None:
+            return [lookup[word] for word in self.words(text) if word in lookup]
+        return [lookup.get(word, oov) for word in self.words(text)]
+
+    def texts_to_sequences(self, texts):
+        return [self.ids(text) for text in texts]
+
+    def encode(self, texts, max_length):
+        """Tokenizes straight into a zero-padded (len(texts), max_length) int32 array."""
+        padded = np.zeros((len(texts), max_length), dtype=np.int32)
+        for row, text in enumerate(texts):
+            ids = self.ids(text)[-max_length:]
+            padded[row, :len(ids)] = ids
+        return padded
+
+
+def save_vocab(path, tokenizer, classes, max_length):
+    """Writes a Keras or VocabTokenizer, with the class list and max_length, to JSON."""
+    num_words = tokenizer.num_words
+    data = {
+        "format": VOCAB_FORMAT,
+        "num_words": num_words,
+        "oov_token": tokenizer.oov_token,
+        "filters": tokenizer.filters,
+        "lower": tokenizer.lower,
+        "split": tokenizer.split,
+        "max_length": int(max_length),
+        "classes": list(classes),
+        # Words past the num_words cutoff can never be produced, so leave them out
+        "word_index": {word: index for word, index in tokenizer.word_index.items()
+                       if not num_words or index < num_words},
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_vocab(path=VOCAB_PATH):
+    """
+    Reads vocab.json. Returns the same dict shape that train.py pickles:
+    {'tokenizer': ..., 'classes': [...], 'max_length': n}.
+    """
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    if data.get("format") != VOCAB_FORMAT:
+        raise ValueError(f"{path} has unsupported vocabulary format {data.get('format')!r}")
+    tokenizer = VocabTokenizer(data["word_index"], data["num_words"], data["oov_token"],
+                               data["filters"], data["lower"], data["split"])
+    return {"tokenizer": tokenizer, "classes": data["classes"], "max_length": data["max_length"]}
+
+
+def convert_pickle(pickle_path="tokenizer.pickle", vocab_path=VOCAB_PATH):
+    """Converts tokenizer.pickle to vocab.json and checks both give identical ids."""
+    import pickle
+    from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+    with open(pickle_path, "rb") as handle:
+        saved_data = pickle.load(handle)
+    keras_tokenizer, max_length = saved_data['tokenizer'], saved_data['max_length']
+    save_vocab(vocab_path, keras_tokenizer, saved_data['classes'], max_length)
+    print(f"✅ Vocabulary exported to {vocab_path}")
+
+    texts = []
+    for source in ("intents.json", "test_intents.json"):
+        with open(source) as file:
+            for intent in json.load(file)['intents']:
+                texts.extend(intent.get('patterns', []) + intent.get('test_patterns', []))
+    # Inputs that exercise truncation, filters, OOV words and odd whitespace
+    texts += ["", "   ", "WHAT is my Fee-Balance?!", "hostel,,,fees...results", "tab\tand\nnewline",
+              "non\u00a0breaking\u2003space", "zzzz unknown qqqq words", " ".join(["fees"] * 25)]
+
+    expected = pad_sequences(keras_tokenizer.texts_to_sequences(texts), padding='post', maxlen=max_length)
+    actual = load_vocab(vocab_path)['tokenizer'].encode(texts, max_length)
+    mismatches = [texts[i] for i in np.flatnonzero((expected != actual).any(axis=1))]
+    if mismatches:
+        print(f"❌ {len(mismatches)} text(s) tokenized differently:")
+        for text in mismatches:
+            print(f"  {text!r}")
+        return False
+    print(f"✅ vocab.json matches the Keras tokenizer on {len(texts)} texts.")
+    return True
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if convert_pickle() else 1)